@@ -1,189 +1,40 @@
-import subprocess, math, os
+import asyncio, inspect, json, os, subprocess, time
 import gradio as gr
-from pathlib import Path
+import chd_backend
+import metrics
+import model_config
+from risk_core import (  # hesap çekirdeği (risk_core.py)
+    EGRI_EKSENLERI, cancer_group_en, chd_group_en, chd_grup, girdileri_hazirla, kanser_grup,
+    posthoc_hesapla, prevent_argumanlari, prevent_chd_10y, prevent_chd_10y_async, risk_egrileri,
+    senaryo_tablosu, skorla_async, skorla_senaryolar, skorla_toplu,
+)
 
 # =========================
-# 0) R 'preventr' Kurulumu
+# 0) Başlangıç: arka uç ısınması
 # =========================
-def ensure_preventr():
-    # Kurulu mu?
-    try:
-        subprocess.run(
-            ["Rscript", "-e",
-             'quit(save="no", status=ifelse(requireNamespace("preventr", quietly=TRUE), 0, 10))'],
-            check=True
-        )
-    except subprocess.CalledProcessError:
-        # Değilse kur
-        subprocess.run(
-            ["Rscript", "-e",
-             'options(repos=c(CRAN="https://cloud.r-project.org")); '
-             'install.packages("preventr", Ncpus=2)'],
-            check=True
-        )
-ensure_preventr()
-
-# =========================
-# 1) Yardımcı Fonksiyonlar
-# =========================
-def clamp(x, lo, hi): return max(lo, min(hi, x))
-
-def vki_hesapla_kg_m2(kilo_kg: float, boy_cm: float) -> float:
-    boy_m = boy_cm / 100.0
-    if boy_m <= 0: raise ValueError("Boy (cm) > 0 olmalı.")
-    return kilo_kg / (boy_m ** 2)
-
-def egfr_ckd_epi_2021(cinsiyet: str, yas: int, kreatinin_mg_dl: float) -> float:
-    s = (cinsiyet or "").strip().lower()
-    if s in ("erkek", "male"):
-        K = 0.9; alpha = -0.302
-    elif s in ("kadın", "kadin", "female"):
-        K = 0.7; alpha = -0.241
-    else:
-        raise ValueError("Cinsiyet 'erkek/kadın' veya 'male/female' olmalı.")
-    if yas < 18 or kreatinin_mg_dl <= 0: raise ValueError("Geçersiz yaş/kreatinin.")
-    oran = kreatinin_mg_dl / K
-    egfr = 142.0 * (min(oran, 1.0) ** alpha) * (max(oran, 1.0) ** -1.2) * (0.9938 ** yas)
-    if s in ("kadın", "kadin", "female"):
-        egfr *= 1.012
-    return egfr  # mL/dk/1.73m^2
-
-def chd_grup(y): return "düşük risk" if y < 5 else ("orta risk" if y < 20 else "belirgin risk")
-def kanser_grup(y): return "düşük risk" if y < 5 else ("orta risk" if y < 10 else "belirgin risk")
-def chd_group_en(y): return "low risk" if y < 5 else ("intermediate risk" if y < 20 else "high risk")
-def cancer_group_en(y): return "low risk" if y < 5 else ("intermediate risk" if y < 10 else "high risk")
-
-def _is_moderate_like(lbl: str) -> bool:
-    et = (lbl or "").strip().lower()
-    return et in {"hafif ya da orta", "hafif-orta", "hafif", "orta", "moderate"}
-
-def _is_none_like(lbl: str) -> bool:
-    et = (lbl or "").strip().lower()
-    return et in {"yok ya da yoka yakın","yok","yoka yakın","hiç","inaktif","sedanter",
-                  "none or very little","none","very little","inactive","sedentary"}
-
-def egzersiz_kategori_ve_carpanlar(siddet: str, dakika_hafta: float):
-    """
-    Kılavuz: ≥150 dk/hafta hafif-orta veya ≥75 dk/hafta ağır
-    Yüksek: kılavuzun ≥2 katı
-    Dönüş: (kategori, HR_CHD, HR_Kanser)
-    """
-    it = (siddet or "").strip().lower()
-    if _is_none_like(it):
-        return ("yetersiz", 1.00, 1.00)
-    if not (_is_moderate_like(it) or it in {"ağır", "vigorous"}):
-        raise ValueError("Egzersiz 'yok ya da yoka yakın/none', 'hafif ya da orta/moderate' veya 'ağır/vigorous' olmalı.")
-    m = max(0.0, float(dakika_hafta or 0))
-    is_moderate = _is_moderate_like(it)
-    kilavuz = 150.0 if is_moderate else 75.0
-    yuksek  = 300.0 if is_moderate else 150.0
-    if m >= yuksek:   return ("yüksek", 0.75, 0.89)   # CHD 0.75, Kanser 0.89
-    if m >= kilavuz:  return ("kılavuz", 0.84, 0.93)  # CHD 0.84, Kanser 0.93
-    return ("yetersiz", 1.00, 1.00)
-
-def yok_var_to01(v: str) -> int:
-    s = (v or "").strip().lower()
-    return 1 if s in ("var","yes") else 0  # 'yok'/'no' -> 0
-
-# =========================
-# 2) PREVENT-CHD (Rscript)
-# =========================
-R_SCRIPT_PATH = Path("chd_estimate.R")
-
-def prevent_chd_10y(cinsiyet_val, yas, total_chol, hdl, sbp, bp_ilac_01, sigara_01, diyabet_01, statin_01, vki, egfr):
-    yas        = int(clamp(yas, 30, 79))
-    total_chol = float(clamp(total_chol, 130, 320))
-    hdl        = float(clamp(hdl, 20, 100))
-    sbp        = float(clamp(sbp, 90, 180))
-    egfr       = float(clamp(egfr, 15, 140))
-    vki        = float(clamp(vki, 18.5, 39.9))
-    sex = "male" if (cinsiyet_val or "").strip().lower() in ("erkek","male") else "female"
-
-    args = ["Rscript", str(R_SCRIPT_PATH), str(yas), sex, f"{sbp:.6f}", str(int(bp_ilac_01)),
-            f"{total_chol:.6f}", f"{hdl:.6f}", str(int(statin_01)), str(int(diyabet_01)),
-            str(int(sigara_01)), f"{egfr:.6f}", f"{vki:.6f}"]
-    out = subprocess.check_output(args, text=True).strip()
-    chd_oran_0_1 = float(out)  # 0–1
-    if math.isnan(chd_oran_0_1):
-        raise ValueError("R dönen değer NaN.")
-    return clamp(chd_oran_0_1 * 100.0, 0.0, 100.0)
-
-# =======================================
-# 3) Meta-analiz temelli Kanser Riski
-# =======================================
-def kanser_taban(cinsiyet_val, yas):
-    c = (cinsiyet_val or "").strip().lower()
-    if c in ("erkek","male"):
-        if   yas < 40: return 0.2
-        elif yas < 50: return 0.8
-        elif yas < 60: return 1.8
-        elif yas < 70: return 3.5
-        else:          return 6.0
-    else:
-        if   yas < 40: return 0.15
-        elif yas < 50: return 0.6
-        elif yas < 60: return 1.5
-        elif yas < 70: return 3.0
-        else:          return 5.5
-
-def hr_bmi_cancer(bmi: float) -> float:
-    # ≥25 kg/m² üzerindeki her +5 kg/m² için ×1.10
-    if bmi <= 25.0:
-        return 1.00
-    return 1.10 ** ((bmi - 25.0) / 5.0)
-
-def hr_alkol(haftalik_ic):
-    d = max(0, float(haftalik_ic))
-    if d >= 22: return 1.39
-    if d >= 15: return 1.19
-    if d >= 8:  return 1.08
-    if d >= 1:  return 1.02
-    return 1.00
-
-def hr_sigara(sigara_01):
-    return 1.44 if int(sigara_01) == 1 else 1.00
-
-def hr_egzersiz(kategori: str):
-    k = (kategori or "").strip().lower()
-    if k == "yüksek":   return 0.89
-    if k == "kılavuz":  return 0.93
-    return 1.00  # yetersiz
-
-def kanser_riski_meta(cinsiyet_val, yas, bmi, aile_01, alkol_hafta, sigara_01, egzersiz_kategori):
-    temel = kanser_taban(cinsiyet_val, yas)
-    risk = (temel
-            * hr_bmi_cancer(bmi)
-            * hr_alkol(alkol_hafta)
-            * hr_sigara(sigara_01)
-            * hr_egzersiz(egzersiz_kategori))
-    if int(aile_01) == 1:
-        risk *= 2.0   # yakın akraba öyküsü → ×2
-    return min(risk, 25.0)  # demo güvenli tavan
-
-# =======================================
-# 4) CHD Post-hoc Modifikasyonlar
-# =======================================
-ALCOHOL_POSTHOC_CAP_PERCENT = 45.0
-
-def hr_bmi_chd(bmi: float) -> float:
-    # 25 kg/m² üzerindeki her +5 kg/m² için ×1.16; altı için 1.00
-    if bmi <= 25.0:
-        return 1.00
-    return 1.16 ** ((bmi - 25.0) / 5.0)
-
-def hr_alkol_chd(units_per_week: float) -> float:
-    # Eşik aralıklarında SABİT katsayı
-    x = max(0.0, float(units_per_week))
-    if x < 3:    return 1.00
-    if x < 7:    return 1.15
-    if x < 14:   return 1.50
-    if x < 21:   return 3.00
-    if x < 28:   return 10.00
-    return 40.00
+# VIVA10_STARTUP:
+#   "background" (varsayılan) -> sunucu hemen dinler; preventr kontrolü ve arka uç
+#                                ısınması ayrı iş parçacığında yürür (/ready ile izlenir)
+#   "blocking"                -> eski davranış: import sırasında bekler
+#   "off"                     -> ısınma yok; ilk hesaplama arka ucu başlatır
+# VIVA10_PREVENTR_CHECK=0 -> preventr imaj oluşturulurken doğrulandı, Rscript kontrolü atlanır
+STARTUP_MODE = os.getenv("VIVA10_STARTUP", "background")
+STARTUP_TIMES = {}  # first_byte_s / first_score_s: süreç başından itibaren saniye
+
+# Eşikler / çarpanlar / tavanlar model_config.json'dan (sürümlü, çalışırken yeniden yüklenir)
+model_config.aktif()
+
+_check = os.getenv("VIVA10_PREVENTR_CHECK", "1") != "0"
+if STARTUP_MODE == "blocking":
+    chd_backend.warm(_check)
+elif STARTUP_MODE == "background":
+    chd_backend.warm_in_background(_check)
 
 # =======================================
 # 5) UI Metinleri
 # =======================================
+DILLER = ("Türkçe", "English")
+
 def header_md_text(lang):
     if lang == "English":
         return (
@@ -214,6 +65,7 @@ def L(lang="Türkçe"):
             "hdl_label": "HDL (mg/dL)",
             "sbp_label": "Systolic Blood Pressure (mmHg)",
             "cre_label": "Serum Creatinine (mg/dL)",
+            "yesno_choices": ["no", "yes"],
             "bpmed_label": "Blood pressure medication",
             "statin_label": "Statin",
             "diabetes_label": "Diabetes",
@@ -224,6 +76,8 @@ def L(lang="Türkçe"):
             "ex_intensity_choices": ["none or very little","moderate","vigorous"],
             "ex_dur_label": "Exercise duration (min/week)",
             "calc_btn": "Calculate",
+            "whatif_btn": "What if? (risk reduction)",
+            "live_label": "Live update (recalculate as inputs change)",
             "res_chd": "Coronary heart disease (10 years)",
             "res_cancer": "Cancer (10 years)",
         }
@@ -238,6 +92,7 @@ def L(lang="Türkçe"):
             "hdl_label": "HDL (mg/dL)",
             "sbp_label": "Sistolik Tansiyon (mmHg)",
             "cre_label": "Serum Kreatinin (mg/dL)",
+            "yesno_choices": ["yok", "var"],
             "bpmed_label": "Tansiyon ilacı",
             "statin_label": "Statin",
             "diabetes_label": "Diyabet",
@@ -248,6 +103,8 @@ def L(lang="Türkçe"):
             "ex_intensity_choices": ["yok ya da yoka yakın","hafif ya da orta","ağır"],
             "ex_dur_label": "Egzersiz süresi (dk/hafta)",
             "calc_btn": "Hesapla",
+            "whatif_btn": "Ne olursa? (risk azaltma)",
+            "live_label": "Canlı güncelleme (girdiler değiştikçe hesapla)",
             "res_chd": "Koroner kalp hastalığı (10 yıl)",
             "res_cancer": "Kanser (10 yıl)",
         }
@@ -282,85 +139,144 @@ def status_text(lang, chd_low, ca_low):
 # =======================================
 # 6) Hesaplayıcı (Buton callback)
 # =======================================
-def hesapla(lang, cinsiyet, yas, kilo, boy_cm, total_chol, hdl, sbp, kreatinin,
-            bp_ilac, sigara, diyabet, statin, aile_kanser, alkol_hafta,
-            egzersiz_seviyesi, egzersiz_dk):
-    try:
-        # Kısıtlar
-        yas = int(clamp(yas, 30, 79))
-        kilo = float(clamp(kilo, 35, 200))
-        boy_cm = float(clamp(boy_cm, 120, 210))
-        total_chol = float(clamp(total_chol, 130, 320))
-        hdl = float(clamp(hdl, 20, 100))
-        sbp = float(clamp(sbp, 90, 180))
-        kreatinin = float(clamp(kreatinin, 0.30, 2.50))
-        alkol_hafta = float(clamp(alkol_hafta, 0, 35))
-
-        # Egzersiz süresi
-        if _is_none_like(egzersiz_seviyesi):
-            egzersiz_dk = 0.0
-        else:
-            egzersiz_dk = float(clamp(egzersiz_dk, 0, 600))
+def sonuc_md(lang, chd10_duz, kanser_duz):
+    # Etiketler
+    if lang == "English":
+        chd_label = chd_group_en(chd10_duz)
+        ca_label  = cancer_group_en(kanser_duz)
+        chd_title = L("English")["res_chd"]
+        ca_title  = L("English")["res_cancer"]
+    else:
+        chd_label = chd_grup(chd10_duz)
+        ca_label  = kanser_grup(kanser_duz)
+        chd_title = L("Türkçe")["res_chd"]
+        ca_title  = L("Türkçe")["res_cancer"]
 
-        # yok/var & no/yes → 0/1
-        bp_ilac_01  = yok_var_to01(bp_ilac)
-        sigara_01   = yok_var_to01(sigara)
-        diyabet_01  = yok_var_to01(diyabet)
-        statin_01   = yok_var_to01(statin)
-        aile_01     = yok_var_to01(aile_kanser)
+    # Durum mesajı
+    is_chd_low = chd10_duz < 5.0
+    is_ca_low  = kanser_duz < 5.0
+    durum = status_text(lang, is_chd_low, is_ca_low)
 
-        # Türevler
-        bmi = vki_hesapla_kg_m2(kilo, boy_cm)
-        egfr = clamp(egfr_ckd_epi_2021(cinsiyet, yas, kreatinin), 15, 140)
+    return (
+        f"**{chd_title}:** {chd10_duz:.2f}% — _{chd_label}_\n\n"
+        f"**{ca_title}:** {kanser_duz:.2f}% — _{ca_label}_\n\n"
+        f"---\n\n{durum}\n\n"
+        f"<sub>Model v{model_config.aktif().version}</sub>"
+    )
 
+# Sonuç her dil için ayrı bir Markdown bileşenine üretilir; hangisinin görüneceğini tarayıcı seçer,
+# dil değişince yeniden hesap gerekmez.
+def _sonuc_update(s):
+    STARTUP_TIMES.setdefault("first_score_s", time.monotonic() - chd_backend.T0)
+    with metrics.span("render"):
+        ozetler = [sonuc_md(lang, s["chd10"], s["kanser10"]) for lang in DILLER]
+    metrics.inc("viva10_hesapla_total", status="ok")
+    return tuple(gr.update(value=ozet, visible=True) for ozet in ozetler)
+
+def _hata_update(e):
+    metrics.inc("viva10_hesapla_total", status="error")
+    return (gr.update(value=f"⚠️ Hata/Error: {e}", visible=True),) * len(DILLER)
+
+@model_config.sabit
+def hesapla(cinsiyet, yas, kilo, boy_cm, total_chol, hdl, sbp, kreatinin,
+            bp_ilac, sigara, diyabet, statin, aile_kanser, alkol_hafta,
+            egzersiz_seviyesi, egzersiz_dk):
+    try:
+        g = girdileri_hazirla(cinsiyet, yas, kilo, boy_cm, total_chol, hdl, sbp, kreatinin,
+                              bp_ilac, sigara, diyabet, statin, aile_kanser, alkol_hafta,
+                              egzersiz_seviyesi, egzersiz_dk)
         # PREVENT-CHD taban (0–100 %)
-        chd10_taban = prevent_chd_10y(cinsiyet, yas, total_chol, hdl, sbp,
-                                      bp_ilac_01, sigara_01, diyabet_01, statin_01, bmi, egfr)
+        with metrics.span("prevent"):
+            chd10_taban = prevent_chd_10y(*prevent_argumanlari(g))
+        with metrics.span("posthoc"):
+            s = posthoc_hesapla(g, chd10_taban)
+        return _sonuc_update(s)
 
-        # ---- CHD Post-hoc: BMI ----
-        chd10_after_bmi = chd10_taban * hr_bmi_chd(bmi)
-
-        # ---- CHD Post-hoc: Alcohol (stepwise) + CAP at 45% ----
-        chd10_after_alcohol_raw = chd10_after_bmi * hr_alkol_chd(alkol_hafta)
-        chd10_after_alcohol = min(chd10_after_alcohol_raw, ALCOHOL_POSTHOC_CAP_PERCENT)
-
-        # Egzersiz kategorisi → HR'ler (CHD ve Kanser için ayrı)
-        kategori, hr_chd_ex, hr_kans = egzersiz_kategori_ve_carpanlar(egzersiz_seviyesi, egzersiz_dk)
+    except Exception as e:
+        return _hata_update(e)
 
-        # Egzersizi CHD'ye uygula ve genel sınırla
-        chd10_duz  = clamp(chd10_after_alcohol * hr_chd_ex, 0.0, 100.0)
-        # Nihai CHD sert tavan
-        chd10_duz = min(chd10_duz, 45.0)
+@model_config.sabit
+async def hesapla_async(cinsiyet, yas, kilo, boy_cm, total_chol, hdl, sbp, kreatinin,
+                        bp_ilac, sigara, diyabet, statin, aile_kanser, alkol_hafta,
+                        egzersiz_seviyesi, egzersiz_dk):
+    # hesapla ile aynı; R çağrısı olay döngüsünde beklenir (iptal edilebilir)
+    try:
+        g = girdileri_hazirla(cinsiyet, yas, kilo, boy_cm, total_chol, hdl, sbp, kreatinin,
+                              bp_ilac, sigara, diyabet, statin, aile_kanser, alkol_hafta,
+                              egzersiz_seviyesi, egzersiz_dk)
+        with metrics.span("prevent"):
+            chd10_taban = await prevent_chd_10y_async(*prevent_argumanlari(g))
+        with metrics.span("posthoc"):
+            s = posthoc_hesapla(g, chd10_taban)
+        return _sonuc_update(s)
 
-        # Kanser (BMI etkisi sürekli)
-        kanser_duz = kanser_riski_meta(cinsiyet, yas, bmi, aile_01, alkol_hafta, sigara_01, kategori)
+    except Exception as e:
+        return _hata_update(e)
 
-        # Etiketler
-        if lang == "English":
-            chd_label = chd_group_en(chd10_duz)
-            ca_label  = cancer_group_en(kanser_duz)
-            chd_title = L("English")["res_chd"]
-            ca_title  = L("English")["res_cancer"]
+# =======================================
+# 6a) Canlı güncelleme (girdi değiştikçe)
+# =======================================
+# Oturum durumu (gr.State) son PREVENT tabanını girdi anahtarıyla tutar. Yalnızca post-hoc
+# girdileri (alkol, egzersiz, aile öyküsü) değiştiyse R'a gidilmez; BMI ve eGFR her olayda
+# yeniden hesaplanır (mikrosaniyeler). Sürükleme sırasındaki olay birikimini olay bağlamasındaki
+# trigger_mode="always_last" sınırlar: çalışan hesap bitince bekleyenlerden yalnızca sonuncusu işlenir.
+LIVE_DEFAULT = os.getenv("VIVA10_LIVE", "0") == "1"
+
+@model_config.sabit
+async def canli_hesapla(canli, cinsiyet, yas, kilo, boy_cm, total_chol, hdl, sbp, kreatinin,
+                        bp_ilac, sigara, diyabet, statin, aile_kanser, alkol_hafta,
+                        egzersiz_seviyesi, egzersiz_dk, durum):
+    if not canli:
+        return gr.update(), gr.update(), durum
+    durum = dict(durum or {})
+    try:
+        g = girdileri_hazirla(cinsiyet, yas, kilo, boy_cm, total_chol, hdl, sbp, kreatinin,
+                              bp_ilac, sigara, diyabet, statin, aile_kanser, alkol_hafta,
+                              egzersiz_seviyesi, egzersiz_dk)
+        anahtar = prevent_argumanlari(g)
+        if durum.get("prevent_anahtar") == anahtar:
+            chd10_taban = durum["taban"]
+            metrics.inc("viva10_live_total", prevent="reused")
         else:
-            chd_label = chd_grup(chd10_duz)
-            ca_label  = kanser_grup(kanser_duz)
-            chd_title = L("Türkçe")["res_chd"]
-            ca_title  = L("Türkçe")["res_cancer"]
-
-        # Durum mesajı
-        is_chd_low = chd10_duz < 5.0
-        is_ca_low  = kanser_duz < 5.0
-        durum = status_text(lang, is_chd_low, is_ca_low)
-
-        ozet = (
-            f"**{chd_title}:** {chd10_duz:.2f}% — _{chd_label}_\n\n"
-            f"**{ca_title}:** {kanser_duz:.2f}% — _{ca_label}_\n\n"
-            f"---\n\n{durum}"
-        )
-        return gr.update(value=ozet, visible=True)
+            with metrics.span("prevent"):
+                chd10_taban = await prevent_chd_10y_async(*anahtar)
+            durum.update(prevent_anahtar=anahtar, taban=chd10_taban)
+            metrics.inc("viva10_live_total", prevent="computed")
+        with metrics.span("posthoc"):
+            s = posthoc_hesapla(g, chd10_taban)
+        return (*_sonuc_update(s), durum)
 
     except Exception as e:
-        return gr.update(value=f"⚠️ Hata/Error: {e}", visible=True)
+        return (*_hata_update(e), durum)
+
+# =======================================
+# 6b) Ne olursa? — arayüz tablosu
+# =======================================
+def senaryo_md(lang, s0, satirlar):
+    en = lang == "English"
+    if not satirlar:
+        return ("No modifiable risk factor left to improve among smoking, exercise, alcohol and BMI."
+                if en else "Sigara, egzersiz, alkol ve VKİ açısından iyileştirilecek bir risk faktörü yok.")
+    T = L(lang)
+    bas = (f"| {'Intervention' if en else 'Değişiklik'} | {T['res_chd']} | Δ | {T['res_cancer']} | Δ |\n"
+           f"|---|---|---|---|---|\n"
+           f"| _{'Current' if en else 'Şu anki durum'}_ | {s0['chd10']:.2f}% | | {s0['kanser10']:.2f}% | |\n")
+    return bas + "".join(
+        f"| {r['scenario'] if en else r['senaryo']} | {r['chd10']:.2f}% | −{r['chd_azalma']:.2f} "
+        f"| {r['kanser10']:.2f}% | −{r['kanser_azalma']:.2f} |\n" for r in satirlar)
+
+@model_config.sabit
+def senaryolari_goster(cinsiyet, yas, kilo, boy_cm, total_chol, hdl, sbp, kreatinin,
+                       bp_ilac, sigara, diyabet, statin, aile_kanser, alkol_hafta,
+                       egzersiz_seviyesi, egzersiz_dk):
+    try:
+        g = girdileri_hazirla(cinsiyet, yas, kilo, boy_cm, total_chol, hdl, sbp, kreatinin,
+                              bp_ilac, sigara, diyabet, statin, aile_kanser, alkol_hafta,
+                              egzersiz_seviyesi, egzersiz_dk)
+        s0, satirlar = senaryo_tablosu(g)
+        return tuple(gr.update(value=senaryo_md(lang, s0, satirlar), visible=True) for lang in DILLER)
+    except Exception as e:
+        return (gr.update(value=f"⚠️ Hata/Error: {e}", visible=True),) * len(DILLER)
 
 # =======================================
 # 7) Dil / Egzersiz UI Yardımcıları
@@ -409,152 +325,279 @@ EGZ_EXAMPLES_VIGOROUS_EN = """
 (_Guideline target:_ **≥75 min/week**)
 """
 
-def toggle_egzersiz_optionA(lang, sev, current_val):
-    sev_l = (sev or "").strip().lower()
-    is_tr = (lang != "English")
-    if _is_none_like(sev_l):
-        return (
-            gr.update(value="", visible=False),
-            gr.update(visible=False, value=0,
-                      label=L(lang)["ex_dur_label"])
-        )
-    elif _is_moderate_like(sev_l):
-        hint = EGZ_EXAMPLES_MODERATE_TR if is_tr else EGZ_EXAMPLES_MODERATE_EN
-        label = f"{L(lang)['ex_dur_label']} — {'ideal ≥150 dk' if is_tr else 'guideline ≥150 min'}"
-        return (
-            gr.update(value=hint, visible=True),
-            gr.update(visible=True, value=current_val, label=label)
-        )
-    else:  # ağır / vigorous
-        hint = EGZ_EXAMPLES_VIGOROUS_TR if is_tr else EGZ_EXAMPLES_VIGOROUS_EN
-        label = f"{L(lang)['ex_dur_label']} — {'ideal ≥75 dk' if is_tr else 'guideline ≥75 min'}"
-        return (
-            gr.update(value=hint, visible=True),
-            gr.update(visible=True, value=current_val, label=label)
-        )
-
-def apply_language(lang, cinsiyet_v, bp_ilac_v, statin_v, diyabet_v, sigara_v, aile_v, egz_sev_v):
-    T = L(lang)
-    def map_gender(v):
-        m = {"erkek":"male","kadın":"female","male":"male","female":"female"}
-        return m.get((v or "").lower(), T["gender_choices"][0])
-    def map_yesno(v):
-        m = {"yok":"no","var":"yes","no":"no","yes":"yes"}
-        return m.get((v or "").lower(), "no")
-    def map_ex(v):
-        m = {
-            "yok ya da yoka yakın":"none or very little",
-            "hafif ya da orta":"moderate",
-            "ağır":"vigorous",
-            "none or very little":"none or very little",
-            "moderate":"moderate",
-            "vigorous":"vigorous",
+# Dil ve egzersiz ipucu değişimi tarayıcıda yapılır (sunucu olayı yok). Aşağıdaki metinler
+# sayfa yüklenirken bir kez gönderilir; seçeneklerin iç değerleri dilden bağımsız (Türkçe)
+# kalır, yalnızca görünen etiketler değişir.
+CINSIYET_DEGERLERI = L("Türkçe")["gender_choices"]
+YOK_VAR_DEGERLERI = L("Türkçe")["yesno_choices"]
+EGZ_DEGERLERI = L("Türkçe")["ex_intensity_choices"]
+EGZ_MODLARI = dict(zip(EGZ_DEGERLERI, ("none", "moderate", "vigorous")))
+
+# elem_id -> L() anahtarı
+ETIKETLER = {
+    "cinsiyet": "gender_label", "yas": "age_label", "boy_cm": "height_label", "kilo": "weight_label",
+    "total_c": "tc_label", "hdl": "hdl_label", "sbp": "sbp_label", "kreatinin": "cre_label",
+    "bp_ilac": "bpmed_label", "statin": "statin_label", "diyabet": "diabetes_label",
+    "sigara": "smoking_label", "aile_kanser": "fhx_label", "alkol": "alcohol_label",
+    "egz_sev": "ex_intensity_label", "egz_dk": "ex_dur_label", "canli": "live_label",
+}
+SECENEKLER = {"cinsiyet": "gender_choices", "egz_sev": "ex_intensity_choices",
+              **{k: "yesno_choices" for k in ("bp_ilac", "statin", "diyabet", "sigara", "aile_kanser")}}
+BUTONLAR = {"btn": "calc_btn", "whatif_btn": "whatif_btn"}
+
+def secenekler(lang, elem_id):
+    """Radio için (görünen etiket, iç değer) çiftleri."""
+    degerler = {"cinsiyet": CINSIYET_DEGERLERI, "egz_sev": EGZ_DEGERLERI}.get(elem_id, YOK_VAR_DEGERLERI)
+    return list(zip(L(lang)[SECENEKLER[elem_id]], degerler))
+
+def istemci_metinleri():
+    metin = {}
+    for lang in DILLER:
+        T = L(lang)
+        tr = lang != "English"
+        metin[lang] = {
+            "etiket": {k: T[v] for k, v in ETIKETLER.items()},
+            "secenek": {k: T[v] for k, v in SECENEKLER.items()},
+            "buton": {k: T[v] for k, v in BUTONLAR.items()},
+            "egz_ek": {"moderate": f" — {'ideal ≥150 dk' if tr else 'guideline ≥150 min'}",
+                       "vigorous": f" — {'ideal ≥75 dk' if tr else 'guideline ≥75 min'}"},
         }
-        return m.get((v or "").lower(), T["ex_intensity_choices"][0])
-
-    if lang != "English":
-        def map_gender(v):
-            m = {"male":"erkek","female":"kadın","erkek":"erkek","kadın":"kadın"}
-            return m.get((v or "").lower(), T["gender_choices"][0])
-        def map_yesno(v):
-            m = {"no":"yok","yes":"var","yok":"yok","var":"var"}
-            return m.get((v or "").lower(), "yok")
-        def map_ex(v):
-            m = {
-                "none or very little":"yok ya da yoka yakın",
-                "moderate":"hafif ya da orta",
-                "vigorous":"ağır",
-                "yok ya da yoka yakın":"yok ya da yoka yakın",
-                "hafif ya da orta":"hafif ya da orta",
-                "ağır":"ağır",
-            }
-            return m.get((v or "").lower(), T["ex_intensity_choices"][0])
-
-    return (
-        gr.update(value=header_md_text(lang)),
-        gr.update(label=T["gender_label"], choices=T["gender_choices"], value=map_gender(cinsiyet_v)),
-        gr.update(label=T["age_label"]),
-        gr.update(label=T["height_label"]),
-        gr.update(label=T["weight_label"]),
-        gr.update(label=T["tc_label"]),
-        gr.update(label=T["hdl_label"]),
-        gr.update(label=T["sbp_label"]),
-        gr.update(label=T["cre_label"]),
-        gr.update(label=T["bpmed_label"], choices=(["yok","var"] if lang!="English" else ["no","yes"]), value=map_yesno(bp_ilac_v)),
-        gr.update(label=T["statin_label"], choices=(["yok","var"] if lang!="English" else ["no","yes"]), value=map_yesno(statin_v)),
-        gr.update(label=T["diabetes_label"], choices=(["yok","var"] if lang!="English" else ["no","yes"]), value=map_yesno(diyabet_v)),
-        gr.update(label=T["smoking_label"], choices=(["yok","var"] if lang!="English" else ["no","yes"]), value=map_yesno(sigara_v)),
-        gr.update(label=T["fhx_label"], choices=(["yok","var"] if lang!="English" else ["no","yes"]), value=map_yesno(aile_v)),
-        gr.update(label=T["alcohol_label"]),
-        gr.update(label=T["ex_intensity_label"], choices=T["ex_intensity_choices"], value=map_ex(egz_sev_v)),
-        gr.update(value=T["calc_btn"]),
-        gr.update(value="", visible=False),
-    )
+    return metin
+
+# Sayfa yüklenince bir kez çalışır; olaylar yalnızca window.viva10Dil(lang, egz) çağırır.
+# body[data-lang] / body[data-egz] CSS ile ilgili dildeki başlık, ipucu ve sonuç bloklarını seçer.
+ISTEMCI_JS = """
+() => {
+  window.VIVA10_METIN = %s;
+  window.VIVA10_EGZ = %s;
+  window.viva10Dil = (lang, egz) => {
+    const T = window.VIVA10_METIN[lang] || window.VIVA10_METIN["Türkçe"];
+    const mod = window.VIVA10_EGZ[egz] || "none";
+    document.body.dataset.lang = lang;
+    document.body.dataset.egz = mod;
+    const yaz = (el, metin) => { if (el && el.textContent !== metin) el.textContent = metin; };
+    for (const [id, metin] of Object.entries(T.etiket)) {
+      const kutu = document.getElementById(id);
+      if (!kutu) continue;
+      yaz(kutu.querySelector('[data-testid="block-info"]') || kutu.querySelector("label > span"),
+          id === "egz_dk" ? metin + (T.egz_ek[mod] || "") : metin);
+    }
+    for (const [id, etiketler] of Object.entries(T.secenek)) {
+      const kutu = document.getElementById(id);
+      if (!kutu) continue;
+      kutu.querySelectorAll('[data-testid$="-radio-label"] > span').forEach((s, i) => yaz(s, etiketler[i]));
+    }
+    for (const [id, metin] of Object.entries(T.buton)) yaz(document.getElementById(id), metin);
+  };
+}
+""" % (json.dumps(istemci_metinleri(), ensure_ascii=False), json.dumps(EGZ_MODLARI, ensure_ascii=False))
+
+DIL_DEGISTI_JS = "(lang, egz) => { window.viva10Dil && window.viva10Dil(lang, egz); return []; }"
+SINIF = {"Türkçe": "lang-tr", "English": "lang-en"}
 
 # Küçük ölçek CSS
 SCALE_CSS = """
 .app-scale { transform: scale(0.85); transform-origin: top center; }
 body { overflow-x: hidden; }
+body[data-lang="English"] .lang-tr, body:not([data-lang="English"]) .lang-en { display: none !important; }
+body:not([data-egz="moderate"]) .egz-moderate, body:not([data-egz="vigorous"]) .egz-vigorous,
+body:not([data-egz="moderate"]):not([data-egz="vigorous"]) #egz_dk { display: none !important; }
 """
 
 # =======================================
 # 8) Gradio Arayüz
 # =======================================
-with gr.Blocks(theme=gr.themes.Default(), css=SCALE_CSS) as demo:
-    lang = gr.Radio(choices=["Türkçe","English"], value="Türkçe", label="Dil / Language")
-    header_md = gr.Markdown(header_md_text("Türkçe"))
+with gr.Blocks(theme=gr.themes.Default(), css=SCALE_CSS, js=ISTEMCI_JS) as demo:
+    lang = gr.Radio(choices=list(DILLER), value="Türkçe", label="Dil / Language")
+    # Her iki dil de sayfada; görünürlük body[data-lang] ile (bkz. SCALE_CSS)
+    header_md = [gr.Markdown(header_md_text(d), elem_classes=[SINIF[d]]) for d in DILLER]
 
     with gr.Row():
         with gr.Column():
-            cinsiyet  = gr.Radio(choices=["erkek","kadın"], value="erkek", label=L("Türkçe")["gender_label"])
-            yas       = gr.Slider(30, 79, value=55, step=1,   label=L("Türkçe")["age_label"])
-            boy_cm    = gr.Slider(120,210, value=175, step=0.5,label=L("Türkçe")["height_label"])
-            kilo      = gr.Slider(35.0,200.0, value=80.0, step=0.1, label=L("Türkçe")["weight_label"])
-            total_c   = gr.Slider(130,320, value=200, step=1, label=L("Türkçe")["tc_label"])
-            hdl       = gr.Slider(20,100, value=50, step=1,   label=L("Türkçe")["hdl_label"])
-            sbp       = gr.Slider(90,180, value=120, step=1,  label=L("Türkçe")["sbp_label"])
-            kreatinin = gr.Slider(0.30,2.50, value=0.90, step=0.01, label=L("Türkçe")["cre_label"])
+            cinsiyet  = gr.Radio(choices=secenekler("Türkçe", "cinsiyet"), value="erkek", label=L("Türkçe")["gender_label"], elem_id="cinsiyet")
+            yas       = gr.Slider(30, 79, value=55, step=1,   label=L("Türkçe")["age_label"], elem_id="yas")
+            boy_cm    = gr.Slider(120,210, value=175, step=0.5,label=L("Türkçe")["height_label"], elem_id="boy_cm")
+            kilo      = gr.Slider(35.0,200.0, value=80.0, step=0.1, label=L("Türkçe")["weight_label"], elem_id="kilo")
+            total_c   = gr.Slider(130,320, value=200, step=1, label=L("Türkçe")["tc_label"], elem_id="total_c")
+            hdl       = gr.Slider(20,100, value=50, step=1,   label=L("Türkçe")["hdl_label"], elem_id="hdl")
+            sbp       = gr.Slider(90,180, value=120, step=1,  label=L("Türkçe")["sbp_label"], elem_id="sbp")
+            kreatinin = gr.Slider(0.30,2.50, value=0.90, step=0.01, label=L("Türkçe")["cre_label"], elem_id="kreatinin")
 
         with gr.Column():
-            bp_ilac     = gr.Radio(choices=["yok","var"], value="yok", label=L("Türkçe")["bpmed_label"])
-            statin      = gr.Radio(choices=["yok","var"], value="yok", label=L("Türkçe")["statin_label"])
-            diyabet     = gr.Radio(choices=["yok","var"], value="yok", label=L("Türkçe")["diabetes_label"])
-            sigara      = gr.Radio(choices=["yok","var"], value="yok", label=L("Türkçe")["smoking_label"])
-            aile_kanser = gr.Radio(choices=["yok","var"], value="yok", label=L("Türkçe")["fhx_label"])
-            alkol       = gr.Slider(0,35, value=0, step=1, label=L("Türkçe")["alcohol_label"])
+            bp_ilac     = gr.Radio(choices=secenekler("Türkçe", "bp_ilac"), value="yok", label=L("Türkçe")["bpmed_label"], elem_id="bp_ilac")
+            statin      = gr.Radio(choices=secenekler("Türkçe", "statin"), value="yok", label=L("Türkçe")["statin_label"], elem_id="statin")
+            diyabet     = gr.Radio(choices=secenekler("Türkçe", "diyabet"), value="yok", label=L("Türkçe")["diabetes_label"], elem_id="diyabet")
+            sigara      = gr.Radio(choices=secenekler("Türkçe", "sigara"), value="yok", label=L("Türkçe")["smoking_label"], elem_id="sigara")
+            aile_kanser = gr.Radio(choices=secenekler("Türkçe", "aile_kanser"), value="yok", label=L("Türkçe")["fhx_label"], elem_id="aile_kanser")
+            alkol       = gr.Slider(0,35, value=0, step=1, label=L("Türkçe")["alcohol_label"], elem_id="alkol")
 
             egz_sev   = gr.Radio(
-                choices=L("Türkçe")["ex_intensity_choices"],
+                choices=secenekler("Türkçe", "egz_sev"),
                 value="yok ya da yoka yakın",
-                label=L("Türkçe")["ex_intensity_label"]
+                label=L("Türkçe")["ex_intensity_label"],
+                elem_id="egz_sev"
             )
-            egz_hint  = gr.Markdown("", visible=False)
-            egz_dk    = gr.Slider(0,600, value=0, step=5, label=L("Türkçe")["ex_dur_label"], visible=False)
-
-            btn       = gr.Button(L("Türkçe")["calc_btn"], variant="primary", scale=2)
-            sonuc     = gr.Markdown("", visible=False)
-
-    lang.change(
-        apply_language,
-        inputs=[lang, cinsiyet, bp_ilac, statin, diyabet, sigara, aile_kanser, egz_sev],
-        outputs=[header_md, cinsiyet, yas, boy_cm, kilo, total_c, hdl, sbp, kreatinin,
-                 bp_ilac, statin, diyabet, sigara, aile_kanser, alkol, egz_sev, btn, sonuc]
+            # İpucu ve süre kaydırıcısı body[data-egz] ile gösterilir/gizlenir
+            egz_hint  = [gr.Markdown(metin, elem_classes=[SINIF[d], f"egz-{mod}"])
+                         for d, mod, metin in (("Türkçe", "moderate", EGZ_EXAMPLES_MODERATE_TR),
+                                               ("Türkçe", "vigorous", EGZ_EXAMPLES_VIGOROUS_TR),
+                                               ("English", "moderate", EGZ_EXAMPLES_MODERATE_EN),
+                                               ("English", "vigorous", EGZ_EXAMPLES_VIGOROUS_EN))]
+            egz_dk    = gr.Slider(0,600, value=0, step=5, label=L("Türkçe")["ex_dur_label"], elem_id="egz_dk")
+
+            canli     = gr.Checkbox(value=LIVE_DEFAULT, label=L("Türkçe")["live_label"], elem_id="canli")
+            btn       = gr.Button(L("Türkçe")["calc_btn"], variant="primary", scale=2, elem_id="btn")
+            sonuc     = [gr.Markdown("", visible=False, elem_classes=[SINIF[d]]) for d in DILLER]
+            whatif_btn = gr.Button(L("Türkçe")["whatif_btn"], variant="secondary", elem_id="whatif_btn")
+            senaryo   = [gr.Markdown("", visible=False, elem_classes=[SINIF[d]]) for d in DILLER]
+
+    # Dil ve egzersiz şiddeti: yalnızca istemci tarafı (fn=None -> kuyruğa/sunucuya gitmez)
+    for kaynak in (lang, egz_sev):
+        kaynak.change(fn=None, js=DIL_DEGISTI_JS, inputs=[lang, egz_sev], queue=False)
+
+    # VIVA10_ASYNC=0 -> eski senkron (iş parçacığı bloklayan) hesapla
+    btn.click(
+        fn=hesapla_async if os.getenv("VIVA10_ASYNC", "1") != "0" else hesapla,
+        inputs=[cinsiyet, yas, kilo, boy_cm, total_c, hdl, sbp, kreatinin,
+                bp_ilac, sigara, diyabet, statin, aile_kanser, alkol, egz_sev, egz_dk],
+        outputs=sonuc,
+        api_name="hesapla",  # loadtest.py olay uç noktasını bu adla bulur
+        concurrency_limit=int(os.getenv("VIVA10_UI_CONCURRENCY", "16")),
     )
 
-    egz_sev.change(toggle_egzersiz_optionA, inputs=[lang, egz_sev, egz_dk], outputs=[egz_hint, egz_dk])
+    # Canlı mod: her girdi değişiminde; always_last -> sürükleme sırasında biriken olaylardan yalnızca sonuncusu
+    canli_durum = gr.State({})
+    canli_girdiler = [cinsiyet, yas, kilo, boy_cm, total_c, hdl, sbp, kreatinin,
+                      bp_ilac, sigara, diyabet, statin, aile_kanser, alkol, egz_sev, egz_dk]
+    gr.on(
+        triggers=[canli.change] + [c.change for c in canli_girdiler],
+        fn=canli_hesapla,
+        inputs=[canli] + canli_girdiler + [canli_durum],
+        outputs=sonuc + [canli_durum],
+        trigger_mode="always_last",
+        show_progress="hidden",
+        concurrency_limit=int(os.getenv("VIVA10_UI_CONCURRENCY", "16")),
+    )
 
-    btn.click(
-        fn=hesapla,
-        inputs=[lang, cinsiyet, yas, kilo, boy_cm, total_c, hdl, sbp, kreatinin,
+    whatif_btn.click(
+        fn=senaryolari_goster,
+        inputs=[cinsiyet, yas, kilo, boy_cm, total_c, hdl, sbp, kreatinin,
                 bp_ilac, sigara, diyabet, statin, aile_kanser, alkol, egz_sev, egz_dk],
-        outputs=[sonuc],
+        outputs=senaryo,
+        concurrency_limit=int(os.getenv("VIVA10_UI_CONCURRENCY", "16")),
     )
 
 # Spaces otomatik başlatır; launch() gerekmez
-demo.queue()
+# VIVA10_QUEUE_MAX: kuyrukta bekleyebilecek en fazla istek (boş = sınırsız)
+demo.queue(max_size=int(os.getenv("VIVA10_QUEUE_MAX")) if os.getenv("VIVA10_QUEUE_MAX") else None)
 
-if __name__ == "__main__":
-    import os
-    demo.launch(server_name="0.0.0.0", server_port=int(os.getenv("PORT", "7860")), show_error=True)
+# =======================================
+# 9) HTTP Sunucu (Gradio + /api/score + /api/whatif + /api/trajectory + /ready + /model + /metrics + /stats)
+# =======================================
+# Gösterge kaynakları modül yüklenirken bir kez kaydedilir (create_server her çağrıda değil)
+metrics.register_gauges(lambda: {f"viva10_chd_async_{k}": v for k, v in chd_backend.async_stats().items()})
+metrics.register_gauges(lambda: {f"viva10_chd_cache_{k}": v for k, v in chd_backend.cache_stats().items()})
+
+def create_server():
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, PlainTextResponse
+
+    # JSON uç noktalarının ortak hata eşlemesi: 422 yalnızca girdi doğrulaması, arka uç hataları 5xx.
+    # Sıra önemli: PoolBusyError / RWorkerError / ChdBackendError birer RuntimeError'dır.
+    hata_kodlari = (
+        (chd_backend.PoolBusyError, 503),
+        (chd_backend.RWorkerError, 504),
+        (OSError, 503),  # Rscript / katsayı dosyası yok: arka uç kullanılamıyor
+        ((RuntimeError, subprocess.SubprocessError), 502),  # ChdBackendError dahil
+        ((ValueError, TypeError), 422),
+    )
 
+    async def _calistir(fn, *args, **kw):
+        """fn (async ya da senkron; senkron ise iş parçacığında) -> JSONResponse, hatalar eşlenmiş."""
+        try:
+            if inspect.iscoroutinefunction(fn):
+                sonuc = await fn(*args, **kw)
+            else:
+                sonuc = await asyncio.to_thread(fn, *args, **kw)
+        except Exception as e:
+            for tur, kod in hata_kodlari:
+                if isinstance(e, tur):
+                    return JSONResponse({"error": str(e)}, status_code=kod)
+            raise
+        return JSONResponse(sonuc)
+    server = FastAPI()
+
+    @server.middleware("http")
+    async def _ilk_bayt(request, call_next):
+        response = await call_next(request)
+        STARTUP_TIMES.setdefault("first_byte_s", time.monotonic() - chd_backend.T0)
+        return response
+
+    @server.get("/ready")
+    def ready():
+        durum = {"startup": STARTUP_MODE, **chd_backend.readiness(), **STARTUP_TIMES,
+                 "model_version": model_config.aktif().version}
+        hazir = durum["state"] == "ready" or (STARTUP_MODE == "off" and durum["state"] == "idle")
+        return JSONResponse(durum, status_code=200 if hazir else 503)
+
+    @server.get("/model")
+    def model():
+        # Etkin model sürümü; model_config.json değişince yeniden yüklenir
+        return model_config.durum()
+
+    @server.get("/metrics")
+    def prom_metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+    @server.get("/stats")
+    def stats():
+        # Asenkron CHD kuyruğu (bekleyen / işlenen / zaman aşımı / iptal) ve önbellek sayaçları
+        return {"chd_async": chd_backend.async_stats(), "chd_cache": chd_backend.cache_stats()}
+
+    @server.post("/api/whatif")
+    async def api_whatif(request: Request):
+        # Gövde: tek kayıt; yanıt mevcut durum + toplam azalmaya göre sıralı senaryolar
+        try:
+            veri = await request.json()
+        except ValueError:
+            return JSONResponse({"error": "Geçersiz JSON / Invalid JSON"}, status_code=400)
+        if not isinstance(veri, dict):
+            return JSONResponse({"error": "Obje bekleniyor."}, status_code=400)
+        return await _calistir(skorla_senaryolar, **veri)
+
+    @server.post("/api/trajectory")
+    async def api_trajectory(request: Request):
+        # Gövde: tek kayıt; ?axes=yas,sbp,total_chol (varsayılan: hepsi)
+        try:
+            veri = await request.json()
+        except ValueError:
+            return JSONResponse({"error": "Geçersiz JSON / Invalid JSON"}, status_code=400)
+        if not isinstance(veri, dict):
+            return JSONResponse({"error": "Obje bekleniyor."}, status_code=400)
+        eksenler = request.query_params.get("axes")
+        eksenler = tuple(e.strip() for e in eksenler.split(",") if e.strip()) if eksenler else tuple(EGRI_EKSENLERI)
+        return await _calistir(risk_egrileri, eksenler, **veri)
+
+    @server.post("/api/score")
+    async def api_score(request: Request):
+        # Gövde: tek kayıt (obje) ya da kayıt listesi; alan adları SKOR_VARSAYILAN ile aynı
+        try:
+            veri = await request.json()
+        except ValueError:
+            return JSONResponse({"error": "Geçersiz JSON / Invalid JSON"}, status_code=400)
+        if "draws" in request.query_params:
+            # Belirsizlik aralıkları ertelendi: HR güven aralıklarının kaynakları henüz belgelenmedi
+            return JSONResponse({"error": "draws desteklenmiyor: belirsizlik aralıkları ertelendi (HR güven aralıkları kaynaksız)."},
+                                status_code=422)
+        if isinstance(veri, dict):
+            # gövdede "draws" bilinmeyen alan olarak 422 döner
+            return await _calistir(skorla_async, **veri)
+        if isinstance(veri, list) and all(isinstance(r, dict) for r in veri):
+            return await _calistir(skorla_toplu, veri) if veri else JSONResponse([])
+        return JSONResponse({"error": "Obje ya da obje listesi bekleniyor."}, status_code=400)
+
+    return gr.mount_gradio_app(server, demo, path="/", show_error=True)
 
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(create_server(), host="0.0.0.0", port=int(os.getenv("PORT", "7860")))
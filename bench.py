@@ -0,0 +1,280 @@
+import argparse, json, os, platform, resource, statistics, subprocess, sys, threading, time, types
+from concurrent.futures import ThreadPoolExecutor
+
+# =========================================
+# VIVA10 performans ölçümü
+# =========================================
+# Örnek:
+#   python bench.py --backends pool,rscript --concurrency 1,4,8 --out bench.json
+#   python bench.py --baseline eski.json   # p50 gerilemesi varsa çıkış kodu 1
+#   python bench.py --backends "" --imports risk_core,app --max-import-ms 500 --max-import-rss-mb 80
+# Aşama ölçümleri risk_core üzerinden yapılır; hesapla için Gradio yerine sahte modül yüklenir,
+# böylece UI olmadan uçtan uca ölçülür. Import ölçümleri her modülü temiz bir süreçte yükler.
+
+def _gradio_stub():
+    class _Any:
+        def __init__(self, *a, **k): pass
+        def __call__(self, *a, **k): return _Any()
+        def __getattr__(self, ad): return _Any()
+        def __enter__(self): return self
+        def __exit__(self, *a): return False
+    gr = types.ModuleType("gradio")
+    gr.__getattr__ = lambda ad: _Any()
+    gr.update = lambda **k: k
+    return gr
+
+def _import_core():
+    import risk_core
+    return risk_core
+
+def _import_app():
+    sys.modules.setdefault("gradio", _gradio_stub())
+    os.environ.setdefault("VIVA10_STARTUP", "off")
+    import app
+    return app
+
+def _ozet(sureler, toplam_sn, n_hata=0):
+    s = sorted(sureler)
+    q = lambda p: s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))] if s else None
+    return {
+        "n": len(s), "errors": n_hata,
+        "p50_ms": q(50) * 1e3 if s else None,
+        "p95_ms": q(95) * 1e3 if s else None,
+        "p99_ms": q(99) * 1e3 if s else None,
+        "mean_ms": statistics.fmean(s) * 1e3 if s else None,
+        "throughput_per_s": len(s) / toplam_sn if toplam_sn > 0 else None,
+    }
+
+def olc(fn, n, concurrency=1):
+    """fn()'i n kez (concurrency iş parçacığıyla) çağırır; gecikme özetini döndürür."""
+    def tek(_):
+        t = time.perf_counter()
+        try:
+            fn()
+            return time.perf_counter() - t, False
+        except Exception:
+            return time.perf_counter() - t, True
+    t0 = time.perf_counter()
+    if concurrency <= 1:
+        sonuclar = [tek(i) for i in range(n)]
+    else:
+        with ThreadPoolExecutor(concurrency) as ex:
+            sonuclar = list(ex.map(tek, range(n)))
+    toplam = time.perf_counter() - t0
+    return _ozet([d for d, hata in sonuclar if not hata], toplam, sum(h for _, h in sonuclar))
+
+# Arayüzün gönderdiği Türkçe değerler (hesapla / skorla girdi sırası)
+ORNEK = ("erkek", 60, 82.0, 176.0, 210, 45, 135, 0.95,
+         "var", "var", "yok", "yok", "yok", 9, "hafif ya da orta", 180)
+
+def stage_benchmarks(cekirdek, n):
+    return {
+        "egfr_ckd_epi_2021": olc(lambda: cekirdek.egfr_ckd_epi_2021("erkek", 60, 0.95), n),
+        "egzersiz_kategori_ve_carpanlar": olc(lambda: cekirdek.egzersiz_kategori_ve_carpanlar("hafif ya da orta", 180), n),
+        "kanser_riski_meta": olc(lambda: cekirdek.kanser_riski_meta("erkek", 60, 26.5, 0, 9, 1, "kılavuz"), n),
+        "hr_bmi_chd": olc(lambda: cekirdek.hr_bmi_chd(26.5), n),
+        "hr_alkol_chd": olc(lambda: cekirdek.hr_alkol_chd(9), n),
+    }
+
+AGIR_MODULLER = ("gradio", "fastapi", "uvicorn", "pandas", "matplotlib")
+
+def import_benchmarks(moduller, n):
+    """
+    Her modül n kez temiz bir Python sürecinde import edilir: süre, sürecin en yüksek RSS'i
+    ve yüklenen ağır modüller (risk_core için boş olmalı).
+    """
+    out = {}
+    for mod in moduller:
+        kod = ("import json, resource, sys, time\n"
+               "t = time.perf_counter()\n"
+               f"import {mod}\n"
+               "sn = time.perf_counter() - t\n"
+               "print(json.dumps({'s': sn, 'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,"
+               f" 'heavy': [m for m in {AGIR_MODULLER!r} if m in sys.modules]}}))")
+        sureler, rss, agir = [], [], set()
+        for _ in range(n):
+            cikti = subprocess.check_output([sys.executable, "-c", kod], text=True,
+                                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                                            env={**os.environ, "VIVA10_STARTUP": "off"})
+            r = json.loads(cikti.strip().splitlines()[-1])
+            sureler.append(r["s"])
+            rss.append(r["rss_kb"] / 1024.0)
+            agir.update(r["heavy"])
+        out[f"import[{mod}]"] = {**_ozet(sureler, sum(sureler)), "rss_mb": max(rss),
+                                 "heavy_modules": sorted(agir)}
+    return out
+
+HATA_ISARETI = "Hata/Error"  # app._hata_update: hesapla hataları yakalayıp Markdown olarak döner
+
+def _hesapla_cagri(app):
+    def cagri():
+        cikti = app.hesapla(*ORNEK)
+        if HATA_ISARETI in str(cikti[0].get("value", "")):
+            raise RuntimeError(cikti[0]["value"])
+    return cagri
+
+def backend_benchmarks(cekirdek, app, backends, concurrency, n):
+    out = {}
+    for ad in backends:
+        os.environ["VIVA10_CHD_BACKEND"] = ad
+        try:
+            cekirdek.prevent_chd_10y("erkek", 55, 200, 50, 120, 0, 0, 0, 0, 25.0, 90)  # ısınma (havuz başlatma vb.)
+            _hesapla_cagri(app)()
+        except Exception as e:
+            raise SystemExit(f"{ad} arka ucu ısınmadı: {type(e).__name__}: {e}")
+        for c in concurrency:
+            # Farklı girdiler: önbellek isabeti ölçümü bozmasın
+            sayac = iter(range(10 ** 9))
+            def cagri():
+                i = next(sayac)
+                cekirdek.prevent_chd_10y("erkek", 30 + i % 50, 130 + i % 190, 50, 90 + i % 90, 0, 1, 0, 0, 26.5, 90)
+            out[f"prevent_chd_10y[{ad}]@c{c}"] = olc(cagri, n, c)
+        out[f"hesapla[{ad}]"] = olc(_hesapla_cagri(app), n)
+        out[f"skorla[{ad}]"] = olc(lambda: cekirdek.skorla(**dict(zip(cekirdek.KOHORT_SUTUNLARI, ORNEK))), n)
+    return out
+
+def _git_rev():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+class AltSurecRss(threading.Thread):
+    """
+    Alt süreçlerin (R işçileri, Rscript) aynı anda kullandığı toplam RSS'in tepesi.
+    RUSAGE_CHILDREN yalnızca en büyük tek çocuğu verir; burada /proc periyodik taranır (Linux).
+    """
+
+    def __init__(self, aralik=0.05):
+        super().__init__(daemon=True, name="rss-izleme")
+        self.aralik = aralik
+        self.dur = threading.Event()
+        self.tepe_mb = 0.0
+
+    def _toplam_mb(self):
+        ebeveyn, rss = {}, {}
+        for p in os.listdir("/proc"):
+            if not p.isdigit():
+                continue
+            try:
+                with open(f"/proc/{p}/stat") as f:
+                    alanlar = f.read().rsplit(")", 1)[1].split()
+            except OSError:
+                continue
+            ebeveyn[int(p)], rss[int(p)] = int(alanlar[1]), int(alanlar[21])
+        kok, toplam = os.getpid(), 0
+        for pid in rss:
+            q = ebeveyn.get(pid)
+            while q and q != kok:
+                q = ebeveyn.get(q)
+            if q == kok:
+                toplam += rss[pid]
+        return toplam * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+    def run(self):
+        if not os.path.isdir("/proc"):
+            return
+        while not self.dur.wait(self.aralik):
+            self.tepe_mb = max(self.tepe_mb, self._toplam_mb())
+
+    def durdur(self):
+        self.dur.set()
+        self.join()
+
+def _peak_rss_mb(izleme):
+    # Linux'ta KiB; çocuklar için eşzamanlı toplam (izleme yoksa en büyük tek çocuk)
+    self_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {"self": self_kb / 1024.0,
+            "children_sum": izleme.tepe_mb if os.path.isdir("/proc") else None,
+            "children_max_single": child_kb / 1024.0}
+
+def karsilastir(sonuc, baseline, tolerans):
+    """p50'si (import ölçümlerinde RSS'i de) baseline'a göre `tolerans` oranından fazla kötüleşen ölçümler."""
+    gerileme = []
+    for ad, yeni in sonuc["results"].items():
+        eski = baseline.get("results", {}).get(ad)
+        if not eski:
+            continue
+        for alan in ("p50_ms", "rss_mb"):
+            if not eski.get(alan) or not yeni.get(alan):
+                continue
+            oran = yeni[alan] / eski[alan]
+            if oran > 1.0 + tolerans:
+                gerileme.append({"benchmark": ad, f"old_{alan}": eski[alan],
+                                 f"new_{alan}": yeni[alan], "ratio": oran})
+    return gerileme
+
+def import_butcesi(sonuc, max_ms, max_rss_mb):
+    """import[risk_core] için mutlak sınırlar: süre, RSS ve ağır modül yüklenmemesi."""
+    r = sonuc["results"].get("import[risk_core]")
+    if not r:
+        return []
+    ihlal = []
+    if max_ms and r["p50_ms"] > max_ms:
+        ihlal.append({"benchmark": "import[risk_core]", "p50_ms": r["p50_ms"], "limit_ms": max_ms})
+    if max_rss_mb and r["rss_mb"] > max_rss_mb:
+        ihlal.append({"benchmark": "import[risk_core]", "rss_mb": r["rss_mb"], "limit_mb": max_rss_mb})
+    if r["heavy_modules"]:
+        ihlal.append({"benchmark": "import[risk_core]", "heavy_modules": r["heavy_modules"]})
+    return ihlal
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="VIVA10 performans ölçümü (JSON çıktı)")
+    ap.add_argument("--backends", default=os.getenv("VIVA10_CHD_BACKEND", "pool"),
+                    help="virgülle ayrılmış: pool,rscript,python,grid (boş = yalnızca saf Python aşamaları)")
+    ap.add_argument("--concurrency", default="1,4", help="prevent_chd_10y için eşzamanlılık düzeyleri")
+    ap.add_argument("-n", type=int, default=50, help="arka uç ölçümü başına çağrı sayısı")
+    ap.add_argument("--stage-n", type=int, default=20000, help="saf Python aşaması başına çağrı sayısı")
+    ap.add_argument("--imports", default="risk_core",
+                    help="temiz süreçte import süresi/RSS ölçülecek modüller (virgülle; boş = ölçme)")
+    ap.add_argument("--import-n", type=int, default=5, help="modül başına import tekrarı")
+    ap.add_argument("--max-import-ms", type=float, help="import[risk_core] p50 üst sınırı (aşılırsa çıkış kodu 1)")
+    ap.add_argument("--max-import-rss-mb", type=float, help="import[risk_core] RSS üst sınırı (aşılırsa çıkış kodu 1)")
+    ap.add_argument("--out", help="JSON dosyası (verilmezse stdout)")
+    ap.add_argument("--baseline", help="karşılaştırılacak önceki JSON")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="izin verilen p50 artış oranı")
+    a = ap.parse_args(argv)
+
+    os.environ.setdefault("VIVA10_CHD_CACHE_SIZE", "0")
+    # Her modül ayrı, temiz bir süreçte import edilir (bu süreçte yüklenenlerden etkilenmez)
+    importlar = import_benchmarks([m for m in a.imports.split(",") if m], a.import_n)
+    cekirdek = _import_core()
+    backends = [b for b in a.backends.split(",") if b]
+    concurrency = [int(c) for c in a.concurrency.split(",") if c]
+    app = _import_app() if backends else None
+    izleme = AltSurecRss()
+    izleme.start()
+
+    sonuc = {
+        "meta": {"git": _git_rev(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "python": platform.python_version(), "machine": platform.machine(),
+                 "cpus": os.cpu_count()},
+        "results": {**importlar,
+                    **stage_benchmarks(cekirdek, a.stage_n),
+                    **backend_benchmarks(cekirdek, app, backends, concurrency, a.n)},
+    }
+    izleme.durdur()
+    sonuc["peak_rss_mb"] = _peak_rss_mb(izleme)
+
+    kod = 0
+    if a.baseline:
+        with open(a.baseline) as f:
+            sonuc["regressions"] = karsilastir(sonuc, json.load(f), a.tolerance)
+        kod = 1 if sonuc["regressions"] else 0
+    if a.max_import_ms or a.max_import_rss_mb:
+        sonuc["import_budget"] = import_butcesi(sonuc, a.max_import_ms, a.max_import_rss_mb)
+        kod = 1 if sonuc["import_budget"] else kod
+
+    metin = json.dumps(sonuc, indent=2, ensure_ascii=False)
+    if a.out:
+        with open(a.out, "w") as f:
+            f.write(metin + "\n")
+    else:
+        print(metin)
+    return kod
+
+if __name__ == "__main__":
+    sys.exit(main())
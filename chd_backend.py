@@ -0,0 +1,651 @@
+import asyncio, os, queue, sqlite3, subprocess, threading, time
+from collections import OrderedDict
+from pathlib import Path
+import metrics
+
+# =========================
+# CHD arka uçları (R)
+# =========================
+# VIVA10_CHD_BACKEND:
+#   "pool"    -> kalıcı R işçi havuzu (varsayılan; preventr bir kez yüklenir)
+#   "rscript" -> her çağrıda yeni Rscript süreci (eski davranış)
+#   "python"  -> süreç içi NumPy PREVENT motoru (prevent_engine.py; R gerekmez)
+#   "grid"    -> önceden hesaplanmış, bellek eşlemeli tablo + interpolasyon (prevent_grid.py)
+R_SCRIPT_PATH = Path(__file__).with_name("chd_estimate.R")  # çalışma dizininden bağımsız
+R_WORKER_PATH = Path(__file__).with_name("chd_worker.R")
+
+def _env_int(ad, varsayilan):
+    return int(os.getenv(ad, str(varsayilan)))
+
+def _env_float(ad, varsayilan):
+    return float(os.getenv(ad, str(varsayilan)))
+
+# =========================
+# R 'preventr' Kurulumu
+# =========================
+def ensure_preventr():
+    # Kurulu mu?
+    try:
+        subprocess.run(
+            ["Rscript", "-e",
+             'quit(save="no", status=ifelse(requireNamespace("preventr", quietly=TRUE), 0, 10))'],
+            check=True
+        )
+    except subprocess.CalledProcessError:
+        # Değilse kur
+        subprocess.run(
+            ["Rscript", "-e",
+             'options(repos=c(CRAN="https://cloud.r-project.org")); '
+             'install.packages("preventr", Ncpus=2)'],
+            check=True
+        )
+
+class PoolBusyError(RuntimeError):
+    """Tüm işçiler meşgul ve bekleme süresi doldu (geri basınç)."""
+
+class RWorkerError(RuntimeError):
+    """İşçi çöktü, zaman aşımına uğradı ya da protokol dışı yanıt verdi."""
+
+class ChdBackendError(RuntimeError):
+    """Arka uç hata ya da geçersiz (NaN) sonuç döndürdü; girdi doğrulaması değil."""
+
+class RWorker:
+    """Tek bir uzun ömürlü `Rscript chd_worker.R` süreci."""
+
+    def __init__(self, script=R_WORKER_PATH, start_timeout=60.0):
+        self.script = Path(script)
+        self.start_timeout = start_timeout
+        self.proc = None
+        self._lines = None
+
+    def start(self):
+        self.proc = subprocess.Popen(
+            ["Rscript", str(self.script)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, bufsize=1,
+        )
+        # stdout'u ayrı iş parçacığı okur; böylece okuma zaman aşımlı yapılabilir
+        self._lines = queue.Queue()
+        threading.Thread(target=self._pump, args=(self.proc, self._lines), daemon=True).start()
+        if self._readline(self.start_timeout) != "READY":
+            self.stop()
+            raise RWorkerError("R işçisi başlatılamadı.")
+
+    @staticmethod
+    def _pump(proc, lines):
+        for line in proc.stdout:
+            lines.put(line.rstrip("\n"))
+        lines.put(None)  # EOF -> süreç kapandı
+
+    def _readline(self, timeout):
+        try:
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            raise RWorkerError(f"R işçisi {timeout:.0f} sn içinde yanıt vermedi.")
+        if line is None:
+            raise RWorkerError("R işçisi beklenmedik şekilde kapandı.")
+        return line
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def _write(self, text):
+        try:
+            self.proc.stdin.write(text)
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError, AttributeError):
+            raise RWorkerError("R işçisine yazılamadı.")
+
+    def request(self, line, timeout):
+        self._write(line + "\n")
+        return self._readline(timeout)
+
+    def request_batch(self, lines, timeout):
+        # "BATCH n" + n satır -> n yanıt; ilk yanıt tüm parçanın hesaplanmasını bekler
+        self._write(f"BATCH {len(lines)}\n" + "".join(l + "\n" for l in lines))
+        return [self._readline(timeout) for _ in lines]
+
+    def ping(self, timeout=5.0):
+        try:
+            return self.alive() and self.request("PING", timeout) == "PONG"
+        except RWorkerError:
+            return False
+
+    def stop(self):
+        if self.proc is None:
+            return
+        try:
+            if self.proc.poll() is None:
+                self.proc.stdin.write("QUIT\n")
+                self.proc.stdin.flush()
+                self.proc.wait(timeout=2)
+        except Exception:
+            pass
+        if self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+
+class RWorkerPool:
+    """
+    Sabit boyutlu R işçi havuzu.
+    - Boşta işçi yoksa `queue_timeout` kadar bekler, sonra PoolBusyError (geri basınç)
+    - Çöken / zaman aşımına uğrayan işçi öldürülüp yenisiyle değiştirilir; yeniden başlatma
+      başarısızsa kuyruğa yer tutucu (None) döner ve ilk alan (istek ya da sağlık döngüsü)
+      onu yeniden başlatmayı dener: ölü olduğu bilinen bir işçiye istek gönderilmez
+    - Arka planda boştaki işçilere periyodik PING (sağlık kontrolü)
+    """
+
+    def __init__(self, size=2, timeout=10.0, queue_timeout=5.0, health_interval=30.0,
+                 script=R_WORKER_PATH):
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.health_interval = health_interval
+        self.script = script
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+        self._started = False
+        self._closed = threading.Event()
+        self.restarts = 0
+
+    def _new_worker(self):
+        w = RWorker(self.script)
+        w.start()
+        return w
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            baslayan = []
+            try:
+                for _ in range(self.size):
+                    baslayan.append(self._new_worker())
+            except BaseException:
+                # Kısmi başlatma: açılmış işçiler sızmasın
+                for w in baslayan:
+                    w.stop()
+                raise
+            for w in baslayan:
+                self._idle.put(w)
+            self._started = True
+        if self.health_interval > 0:
+            threading.Thread(target=self._health_loop, daemon=True).start()
+
+    def _replace(self, w):
+        """Yeni işçi ya da (başlatılamazsa) yer tutucu None."""
+        if w is not None:
+            w.stop()
+        with self._restart_lock:
+            self.restarts += 1
+        try:
+            return self._new_worker()
+        except (RWorkerError, OSError):
+            return None
+
+    def _health_loop(self):
+        while not self._closed.wait(self.health_interval):
+            for _ in range(self.size):
+                try:
+                    w = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                if w is None or not w.ping():
+                    w = self._replace(w)
+                self._idle.put(w)
+
+    def _run(self, fn):
+        if not self._started:
+            self.start()
+        try:
+            with metrics.span("chd_pool_wait", backend="pool"):
+                w = self._idle.get(timeout=self.queue_timeout)
+        except queue.Empty:
+            metrics.inc("viva10_r_pool_busy_total")
+            raise PoolBusyError("Sunucu yoğun; lütfen tekrar deneyin. / Server busy, please retry.")
+        if w is None or not w.alive():
+            w = self._replace(w)  # yer tutucu ya da ölmüş işçi: önce yeniden başlat
+            if w is None:
+                self._idle.put(None)
+                metrics.inc("viva10_r_worker_failures_total")
+                raise RWorkerError("R işçisi yeniden başlatılamadı.")
+        try:
+            with metrics.span("chd_r_compute", backend="pool"):
+                return fn(w)
+        except RWorkerError:
+            metrics.inc("viva10_r_worker_failures_total")
+            w = self._replace(w)
+            raise
+        finally:
+            self._idle.put(w)
+
+    def request(self, line):
+        return self._run(lambda w: w.request(line, self.timeout))
+
+    def request_batch(self, lines):
+        # Büyük partilerde yanıt süresi satır sayısıyla büyür
+        timeout = self.timeout + 0.005 * len(lines)
+        return self._run(lambda w: w.request_batch(lines, timeout))
+
+    def close(self):
+        self._closed.set()
+        while True:
+            try:
+                w = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if w is not None:
+                w.stop()
+        self._started = False
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def get_pool():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = RWorkerPool(
+                size=_env_int("VIVA10_R_POOL_SIZE", 2),
+                timeout=_env_float("VIVA10_R_TIMEOUT", 10.0),
+                queue_timeout=_env_float("VIVA10_R_QUEUE_TIMEOUT", 5.0),
+                health_interval=_env_float("VIVA10_R_HEALTH_INTERVAL", 30.0),
+            )
+        return _POOL
+
+# =========================
+# Sonuç önbelleği (LRU + TTL, isteğe bağlı SQLite diski)
+# =========================
+class ChdCache:
+    """
+    Anahtar: arka uç adı + R'a giden normalize alanlar (_alanlar) demeti.
+    Bellek katmanı en fazla `maxsize` kayıt tutar (LRU); `ttl` > 0 ise kayıtlar
+    o kadar saniye sonra geçersizdir. `db_path` verilirse bellekte olmayan
+    anahtarlar SQLite dosyasında aranır ve yeni sonuçlar oraya da yazılır.
+    """
+
+    def __init__(self, maxsize=4096, ttl=0.0, db_path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS chd (key TEXT PRIMARY KEY, value REAL, ts REAL)")
+            self._db.commit()
+        self.hits = self.misses = self.evictions = self.disk_hits = 0
+
+    @property
+    def diskli(self):
+        return self._db is not None
+
+    def _taze(self, ts):
+        return self.ttl <= 0 or (time.time() - ts) < self.ttl
+
+    def get(self, key):
+        with self._lock:
+            kayit = self._mem.get(key)
+            if kayit is not None and self._taze(kayit[1]):
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return kayit[0]
+            if kayit is not None:
+                del self._mem[key]
+            if self._db is not None:
+                row = self._db.execute("SELECT value, ts FROM chd WHERE key = ?", ("\t".join(key),)).fetchone()
+                if row is not None and self._taze(row[1]):
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._put_mem(key, row[0], row[1])
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def _put_mem(self, key, value, ts):
+        self._mem[key] = (value, ts)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+            self.evictions += 1
+
+    def put(self, key, value):
+        ts = time.time()
+        with self._lock:
+            self._put_mem(key, value, ts)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO chd VALUES (?, ?, ?)", ("\t".join(key), value, ts))
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._mem), "maxsize": self.maxsize, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions, "disk_hits": self.disk_hits}
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+def get_cache():
+    """VIVA10_CHD_CACHE_SIZE=0 ise önbellek kapalıdır (None)."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            size = _env_int("VIVA10_CHD_CACHE_SIZE", 4096)
+            if size <= 0:
+                return None
+            _CACHE = ChdCache(size, _env_float("VIVA10_CHD_CACHE_TTL", 0.0),
+                              os.getenv("VIVA10_CHD_CACHE_DB") or None)
+        return _CACHE
+
+def cache_stats():
+    c = get_cache()
+    return c.stats() if c is not None else {}
+
+# =========================
+# Ortak giriş noktası
+# =========================
+def _alanlar(yas, sex, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr, bmi):
+    return [str(yas), sex, f"{sbp:.6f}", str(int(bp_tx)), f"{total_c:.6f}", f"{hdl_c:.6f}",
+            str(int(statin)), str(int(dm)), str(int(smoking)), f"{egfr:.6f}", f"{bmi:.6f}"]
+
+# chd_estimate.R preventr yüklendikten sonra stderr'e bu satırı yazar
+R_YUKLENDI = "VIVA10_LOADED"
+
+def _yuklenme_bekle(stderr):
+    """İşaret satırına (ya da EOF'a) kadar okur; öncesindeki stderr satırlarını döndürür."""
+    onceki = []
+    for satir in stderr:
+        if satir.strip() == R_YUKLENDI:
+            break
+        onceki.append(satir)
+    return "".join(onceki)
+
+def chd_oran_rscript(*args):
+    cmd = ["Rscript", str(R_SCRIPT_PATH), *_alanlar(*args)]
+    # spawn: fork/exec + R açılışı + preventr yükleme (işaret satırına kadar); compute: hesap
+    with metrics.span("chd_r_spawn", backend="rscript"):
+        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        onceki = _yuklenme_bekle(p.stderr)
+    with metrics.span("chd_r_compute", backend="rscript"):
+        out, err = p.communicate()
+    metrics.inc("viva10_r_exit_total", status=p.returncode)
+    if p.returncode != 0:
+        raise subprocess.CalledProcessError(p.returncode, cmd, out, onceki + err)
+    return float(out.strip())
+
+def _yanit_coz(yanit):
+    durum, _, deger = yanit.partition("\t")
+    if durum != "OK":
+        raise ChdBackendError(f"R hatası: {deger or yanit}")
+    return float(deger)
+
+def chd_oran_pool(*args):
+    return _yanit_coz(get_pool().request("\t".join(_alanlar(*args))))
+
+def chd_oran_python(yas, sex, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr, bmi):
+    import prevent_engine  # numpy yalnızca bu arka uç seçilince yüklenir
+    return prevent_engine.chd_10y(yas, sex == "male", sbp, bp_tx, total_c, hdl_c,
+                                  statin, dm, smoking, egfr, bmi)
+
+def chd_oran_grid(yas, sex, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr, bmi):
+    import prevent_grid
+    return prevent_grid.get_grid(os.getenv("VIVA10_CHD_GRID")).chd_10y(
+        yas, sex == "male", sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr, bmi)
+
+BACKENDS = {
+    "pool": chd_oran_pool,
+    "rscript": chd_oran_rscript,
+    "python": chd_oran_python,
+    "grid": chd_oran_grid,
+}
+
+def backend_adi():
+    ad = os.getenv("VIVA10_CHD_BACKEND", "pool")
+    if ad not in BACKENDS:
+        raise RuntimeError(f"Bilinmeyen CHD arka ucu: {ad}")
+    return ad
+
+def chd_oran(yas, sex, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr, bmi):
+    """Kısıtlanmış girdiler için PREVENT 10 yıllık CHD riski (0–1)."""
+    ad = backend_adi()
+    args = (yas, sex, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr, bmi)
+    cache = get_cache()
+    if cache is None:
+        with metrics.span("chd_backend", backend=ad):
+            return BACKENDS[ad](*args)
+    key = (ad, *_alanlar(*args))
+    deger = cache.get(key)
+    if deger is None:
+        with metrics.span("chd_backend", backend=ad):
+            deger = BACKENDS[ad](*args)
+        cache.put(key, deger)
+    return deger
+
+# =========================
+# Toplu (dizi) giriş noktası
+# =========================
+def chd_oran_toplu_python(yas, sex, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr, bmi):
+    import numpy as np
+    import prevent_engine
+    return np.asarray(prevent_engine.chd_10y(yas, np.asarray(sex) == "male", sbp, bp_tx, total_c,
+                                             hdl_c, statin, dm, smoking, egfr, bmi), dtype=float)
+
+def chd_oran_toplu_grid(yas, sex, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr, bmi):
+    import numpy as np
+    return np.asarray(chd_oran_grid(yas, np.asarray(sex), sbp, bp_tx, total_c, hdl_c, statin,
+                                    dm, smoking, egfr, bmi), dtype=float)
+
+BATCH_CHUNK = 5000
+
+def _satirlar(args):
+    for a, s, b, bt, tc, h, st, d, sm, e, v in zip(*args):
+        yield _alanlar(int(a), str(s), float(b), int(bt), float(tc), float(h), int(st),
+                       int(d), int(sm), float(e), float(v))
+
+def _yanitlari_coz(yanitlar, hatalar, ofset=0):
+    import numpy as np
+    out = np.full(len(yanitlar), np.nan)
+    for i, y in enumerate(yanitlar):
+        try:
+            out[i] = _yanit_coz(y)
+        except ChdBackendError as e:
+            hatalar[ofset + i] = str(e)
+    return out
+
+def chd_oran_toplu_rscript(*args, hatalar):
+    # Tek Rscript süreci: CSV stdin'den, satır başına OK/ERR stdout'tan
+    girdi = "age,sex,sbp,bp_tx,total_c,hdl_c,statin,dm,smoking,egfr,bmi\n" + \
+            "".join(",".join(f) + "\n" for f in _satirlar(args))
+    p = subprocess.run(["Rscript", str(R_SCRIPT_PATH), "--batch", str(BATCH_CHUNK)],
+                       input=girdi, capture_output=True, text=True, check=True)
+    yanitlar = p.stdout.splitlines()
+    if len(yanitlar) != len(args[0]):
+        raise ChdBackendError(f"R {len(args[0])} satır yerine {len(yanitlar)} yanıt döndü.")
+    return _yanitlari_coz(yanitlar, hatalar)
+
+def chd_oran_toplu_pool(*args, hatalar):
+    import numpy as np
+    satirlar = ["\t".join(f) for f in _satirlar(args)]
+    pool = get_pool()
+    parcalar = []
+    for i in range(0, len(satirlar), BATCH_CHUNK):
+        yanitlar = pool.request_batch(satirlar[i:i + BATCH_CHUNK])
+        parcalar.append(_yanitlari_coz(yanitlar, hatalar, ofset=i))
+    return np.concatenate(parcalar) if parcalar else np.empty(0)
+
+BATCH_BACKENDS = {
+    "pool": chd_oran_toplu_pool,
+    "rscript": chd_oran_toplu_rscript,
+    "python": lambda *args, hatalar: chd_oran_toplu_python(*args),
+    "grid": lambda *args, hatalar: chd_oran_toplu_grid(*args),
+}
+
+def chd_oran_toplu(yas, sex, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr, bmi, hatalar=None,
+                   backend=None):
+    """
+    Eşit uzunlukta diziler için CHD riski (0–1) dizisi.
+    hatalar: verilirse satır hataları {satır indeksi: mesaj} olarak buraya yazılır ve
+    o satırlar NaN kalır; verilmezse ilk hata ChdBackendError olarak yükseltilir.
+    backend: verilmezse VIVA10_CHD_BACKEND kullanılır.
+    """
+    kayit = {} if hatalar is None else hatalar
+    out = BATCH_BACKENDS[backend or backend_adi()](yas, sex, sbp, bp_tx, total_c, hdl_c, statin, dm,
+                                        smoking, egfr, bmi, hatalar=kayit)
+    if hatalar is None and kayit:
+        i = min(kayit)
+        raise ChdBackendError(f"Satır {i}: {kayit[i]}")
+    return out
+
+# =========================
+# Asenkron yol (Gradio olay döngüsü)
+# =========================
+# Olay döngüsünü bloklamadan R çağrısı: eşzamanlılık sınırı (semafor), çağrı başı
+# zaman aşımı ve iptal (tarayıcı koparsa Gradio görevi iptal eder). "rscript" süreci
+# iptalde öldürülür; "pool" senkron yolla aynı (warm() ile ısıtılan) RWorkerPool'u bir
+# iş parçacığında kullanır: ikinci bir R havuzu açılmaz, iptal edilen çağrının işçisi
+# yanıtını bitirip (ya da VIVA10_R_TIMEOUT ile değiştirilip) havuza döner.
+_ASYNC_SEM = None
+ASYNC_STATS = {"waiting": 0, "max_waiting": 0, "in_flight": 0, "completed": 0,
+               "errors": 0, "timeouts": 0, "cancelled": 0}
+
+def _async_sem():
+    global _ASYNC_SEM
+    if _ASYNC_SEM is None:
+        _ASYNC_SEM = asyncio.Semaphore(_env_int("VIVA10_CHD_CONCURRENCY", os.cpu_count() or 2))
+    return _ASYNC_SEM
+
+async def _chd_oran_rscript_async(*args):
+    onceki, proc = b"", None
+    try:
+        # spawn: süreç + R açılışı + preventr yükleme (işaret satırına kadar); compute: hesap
+        with metrics.span("chd_r_spawn", backend="rscript", mode="async"):
+            proc = await asyncio.create_subprocess_exec(
+                "Rscript", str(R_SCRIPT_PATH), *_alanlar(*args),
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            )
+            while True:
+                satir = await proc.stderr.readline()
+                if not satir or satir.strip() == R_YUKLENDI.encode():
+                    break
+                onceki += satir
+        with metrics.span("chd_r_compute", backend="rscript", mode="async"):
+            out, err = await proc.communicate()
+        err = onceki + err
+    finally:
+        if proc is not None and proc.returncode is None:  # zaman aşımı / iptal
+            proc.kill()
+    metrics.inc("viva10_r_exit_total", status=proc.returncode)
+    if proc.returncode != 0:
+        raise ChdBackendError(f"R hatası: {err.decode().strip()}")
+    return float(out.decode().strip())
+
+async def _chd_oran_pool_async(*args):
+    return await asyncio.to_thread(chd_oran_pool, *args)
+
+ASYNC_BACKENDS = {
+    "pool": _chd_oran_pool_async,
+    "rscript": _chd_oran_rscript_async,
+}
+
+async def _onbellek(cache, fn, *args):
+    # SQLite katmanı varsa okuma/yazma olay döngüsünü bloklamasın
+    return await asyncio.to_thread(fn, *args) if cache.diskli else fn(*args)
+
+async def chd_oran_async(yas, sex, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr, bmi):
+    """chd_oran'ın asenkron sürümü; R dışı arka uçlar (python/grid) doğrudan çağrılır."""
+    ad = backend_adi()
+    args = (yas, sex, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr, bmi)
+    if ad not in ASYNC_BACKENDS:
+        return chd_oran(*args)
+    cache = get_cache()
+    key = (ad, *_alanlar(*args))
+    if cache is not None:
+        deger = await _onbellek(cache, cache.get, key)
+        if deger is not None:
+            return deger
+
+    st = ASYNC_STATS
+    st["waiting"] += 1
+    st["max_waiting"] = max(st["max_waiting"], st["waiting"])
+    beklemede = True
+    try:
+        async with _async_sem():
+            st["waiting"] -= 1
+            beklemede = False
+            st["in_flight"] += 1
+            try:
+                with metrics.span("chd_backend", backend=ad, mode="async"):
+                    deger = await asyncio.wait_for(ASYNC_BACKENDS[ad](*args),
+                                                   _env_float("VIVA10_CHD_CALL_TIMEOUT", 15.0))
+            except asyncio.TimeoutError:
+                st["timeouts"] += 1
+                raise RWorkerError("CHD hesabı zaman aşımına uğradı. / CHD calculation timed out.")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                st["errors"] += 1
+                raise
+            finally:
+                st["in_flight"] -= 1
+    except asyncio.CancelledError:
+        st["cancelled"] += 1
+        raise
+    finally:
+        if beklemede:
+            st["waiting"] -= 1
+    st["completed"] += 1
+    if cache is not None:
+        await _onbellek(cache, cache.put, key, deger)
+    return deger
+
+def async_stats():
+    return dict(ASYNC_STATS)
+
+# =========================
+# Isınma / hazır olma durumu
+# =========================
+R_BACKENDS = ("pool", "rscript")
+_WARM = {"state": "idle", "error": None, "ready_s": None, "attempts": 0}
+_WARM_LOCK = threading.Lock()
+T0 = time.monotonic()
+
+def warm(check_preventr=True):
+    """
+    Seçili arka ucu ilk isteğe hazırlar: (R ise) preventr doğrulaması/kurulumu,
+    işçi havuzunu başlatma ve tek örnek hesap. Durum `readiness()` ile okunur.
+    """
+    with _WARM_LOCK:
+        if _WARM["state"] in ("warming", "ready"):
+            return
+        _WARM.update(state="warming", error=None, attempts=_WARM["attempts"] + 1)
+    try:
+        ad = backend_adi()
+        if ad in R_BACKENDS and check_preventr:
+            ensure_preventr()
+        if ad == "pool":
+            get_pool().start()
+        BACKENDS[ad](55, "male", 120.0, 0, 200.0, 50.0, 0, 0, 0, 90.0, 25.0)
+        _WARM.update(state="ready", ready_s=time.monotonic() - T0)
+    except Exception as e:
+        _WARM.update(state="error", error=f"{type(e).__name__}: {e}")
+
+def _warm_dongusu(check_preventr):
+    # Isınma başarısızsa üstel geri çekilmeyle yeniden dener (VIVA10_WARM_RETRY_MAX_S üst sınır);
+    # böylece geçici bir R/preventr hatası /ready'yi kalıcı olarak 503'te bırakmaz.
+    bekle = _env_float("VIVA10_WARM_RETRY_S", 5.0)
+    while True:
+        warm(check_preventr)
+        if _WARM["state"] != "error" or bekle <= 0:
+            return
+        time.sleep(bekle)
+        bekle = min(bekle * 2, _env_float("VIVA10_WARM_RETRY_MAX_S", 300.0))
+
+def warm_in_background(check_preventr=True):
+    t = threading.Thread(target=_warm_dongusu, args=(check_preventr,), daemon=True, name="chd-warm")
+    t.start()
+    return t
+
+def readiness():
+    return {"backend": os.getenv("VIVA10_CHD_BACKEND", "pool"), **_WARM}
@@ -0,0 +1,190 @@
+import multiprocessing as mp, os, time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+
+# =========================================
+# Çok süreçli kohort skorlama
+# =========================================
+# Girdi parçalara bölünür ve bir süreç havuzuna dağıtılır; her işçi kendi sıcak CHD arka
+# ucunu tutar (pool ise tek R oturumu, python/grid ise süreç içi motor). Sonuçlar girdi
+# sırasıyla döner. Ayarlar: VIVA10_PAR_WORKERS (varsayılan: çekirdek sayısı),
+# VIVA10_PAR_CHUNK (varsayılan 2000 satır), VIVA10_PAR_RETRIES (varsayılan 2).
+# İşçiler "spawn" ile başlar: ana süreçteki R alt süreçleri / iş parçacıkları kopyalanmaz.
+# İşçiler yalnızca risk_core'u import eder (Gradio/arayüz yüklenmez).
+
+_CEKIRDEK = None
+
+def _isci_baslat(ortam):
+    global _CEKIRDEK
+    os.environ.update(ortam)
+    import risk_core
+    risk_core.chd_backend.warm(check_preventr=False)
+    _CEKIRDEK = risk_core
+
+def _hesapla_parca(veri):
+    return _CEKIRDEK.hesapla_toplu(veri)
+
+def _isci_ortami():
+    ortam = {"VIVA10_METRICS": "0"}
+    ortam["VIVA10_R_POOL_SIZE"] = os.getenv("VIVA10_PAR_R_POOL_SIZE", "1")  # işçi başına R oturumu
+    for k in ("VIVA10_CHD_BACKEND", "VIVA10_R_TIMEOUT", "VIVA10_CHD_CACHE_SIZE", "PATH"):
+        if k in os.environ:
+            ortam[k] = os.environ[k]
+    return ortam
+
+class ParalelHavuz:
+    """
+    Süreç havuzu. `esle(fn, parcalar)` sıralı sonuç üretir; işlenen ve sırasını bekleyen
+    sonuçlar dahil aynı anda en fazla `workers * 2` parça bellekte tutulur. Bir işçi çökerse
+    (BrokenProcessPool) havuz yeniden kurulur; çökme anında işlenen parçalar şüpheli sayılır ve
+    tek tek yeniden denenir. Deneme hakkı yalnızca havuzu tek başına çökerten parçadan düşer
+    (parça başına en fazla `retries` tekrar); sağlam parçalar başka bir parçanın çökmesiyle
+    harcanmaz. `fn` içindeki hatalar (ValueError vb.) tekrar edilmez.
+    """
+
+    def __init__(self, workers=None, chunk=None, retries=None):
+        self.workers = workers or int(os.getenv("VIVA10_PAR_WORKERS", "0")) or os.cpu_count() or 1
+        self.chunk = chunk or int(os.getenv("VIVA10_PAR_CHUNK", "2000"))
+        self.retries = int(os.getenv("VIVA10_PAR_RETRIES", "2")) if retries is None else retries
+        self._ex = None
+        self.stats = {"chunks": 0, "retries": 0, "restarts": 0}
+
+    def _executor(self):
+        if self._ex is None:
+            self._ex = ProcessPoolExecutor(self.workers, mp_context=mp.get_context("spawn"),
+                                           initializer=_isci_baslat, initargs=(_isci_ortami(),))
+        return self._ex
+
+    def _yeniden_kur(self):
+        if self._ex is not None:
+            self._ex.shutdown(wait=False, cancel_futures=True)
+        self._ex = None
+        self.stats["restarts"] += 1
+
+    def esle(self, fn, parcalar):
+        parcalar = iter(parcalar)
+        bekleyen = {}   # future -> sıra
+        girdi = {}      # sıra -> (parça, deneme)
+        hazir = {}      # sıra -> sonuç
+        supheli = set() # havuz çökerken işlenen parçalar: tek tek yeniden denenir
+        sonraki_gonder = sonraki_ver = 0
+        bitti = False
+        while True:
+            if supheli:
+                if not bekleyen:
+                    sira = min(supheli)
+                    bekleyen[self._executor().submit(fn, girdi[sira][0])] = sira
+            else:
+                gonderilmis = set(bekleyen.values())
+                for sira in sorted(girdi):
+                    if sira not in gonderilmis:
+                        bekleyen[self._executor().submit(fn, girdi[sira][0])] = sira
+                # Yavaş bir baş parça arkasında biriken sonuçlar da sınıra sayılır
+                while not bitti and len(girdi) + len(hazir) < self.workers * 2:
+                    try:
+                        p = next(parcalar)
+                    except StopIteration:
+                        bitti = True
+                        break
+                    girdi[sonraki_gonder] = (p, 0)
+                    bekleyen[self._executor().submit(fn, p)] = sonraki_gonder
+                    sonraki_gonder += 1
+            while sonraki_ver in hazir:
+                yield hazir.pop(sonraki_ver)
+                sonraki_ver += 1
+            if not bekleyen:
+                if bitti and not girdi:
+                    return
+                continue
+            ucusta = set(bekleyen.values())
+            tamam, _ = wait(bekleyen, return_when=FIRST_COMPLETED)
+            kirik = False
+            for f in tamam:
+                sira = bekleyen.pop(f)
+                try:
+                    hazir[sira] = f.result()
+                    girdi.pop(sira)
+                    supheli.discard(sira)
+                    self.stats["chunks"] += 1
+                except BrokenProcessPool:
+                    kirik = True
+                except Exception:  # belirlenimci hata: tekrar aynı sonucu verir
+                    self.close()
+                    raise
+            if kirik:
+                # Kırık havuzdaki diğer bekleyenler de düşer; yeni havuzda yeniden gönderilir
+                bekleyen.clear()
+                self._yeniden_kur()
+                kalan = {s for s in ucusta if s in girdi}
+                if len(ucusta) == 1:  # tek başına işlenirken çöktü: hak yalnızca bu parçadan düşer
+                    for sira in kalan:
+                        self._tekrar_say(sira, girdi)
+                supheli |= kalan
+
+    def _tekrar_say(self, sira, girdi):
+        p, deneme = girdi[sira]
+        if deneme >= self.retries:
+            self.close()
+            raise RuntimeError(f"Parça {sira} {deneme + 1} denemede de başarısız oldu.")
+        girdi[sira] = (p, deneme + 1)
+        self.stats["retries"] += 1
+
+    def close(self):
+        if self._ex is not None:
+            self._ex.shutdown(wait=True, cancel_futures=True)
+            self._ex = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+def _dilimle(veri, chunk):
+    n = len(np.asarray(veri[next(iter(veri))]))
+    for i in range(0, n, chunk):
+        yield {k: np.asarray(v)[i:i + chunk] for k, v in veri.items()}
+
+def hesapla_toplu_paralel(veri, workers=None, chunk=None, retries=None):
+    """
+    `hesapla_toplu` ile aynı girdi/dönüş; satırlar parçalara bölünüp süreçlere dağıtılır.
+    Küçük girdilerde (tek parça) süreç açılmaz.
+    """
+    import risk_core
+    with ParalelHavuz(workers, chunk, retries) as havuz:
+        n = len(np.asarray(veri[risk_core.KOHORT_SUTUNLARI[0]]))
+        veri = {k: veri[k] for k in risk_core.KOHORT_SUTUNLARI}
+        if n <= havuz.chunk:
+            return risk_core.hesapla_toplu(veri)
+        parcalar = list(havuz.esle(_hesapla_parca, _dilimle(veri, havuz.chunk)))
+    sonuc = {k: np.concatenate([p[k] for p in parcalar]) for k in parcalar[0] if k != "model_version"}
+    surumler = {p["model_version"] for p in parcalar}
+    # İş sırasında model yeniden yüklendiyse satır başına sürüm döner
+    sonuc["model_version"] = surumler.pop() if len(surumler) == 1 else np.concatenate(
+        [np.full(len(p["chd10"]), p["model_version"]) for p in parcalar])
+    return sonuc
+
+def ornek_kohort(n, seed=0):
+    """Ölçüm/deneme için rastgele, geçerli KOHORT_SUTUNLARI verisi."""
+    rng = np.random.default_rng(seed)
+    return {"cinsiyet": rng.choice(["erkek", "kadın"], n), "yas": rng.integers(30, 80, n),
+            "kilo": rng.uniform(50, 110, n), "boy_cm": rng.uniform(150, 195, n),
+            "total_chol": rng.uniform(140, 300, n), "hdl": rng.uniform(30, 80, n),
+            "sbp": rng.uniform(100, 170, n), "kreatinin": rng.uniform(0.6, 1.4, n),
+            "bp_ilac": rng.choice(["yok", "var"], n), "sigara": rng.choice(["yok", "var"], n),
+            "diyabet": rng.choice(["yok", "var"], n), "statin": rng.choice(["yok", "var"], n),
+            "aile_kanser": rng.choice(["yok", "var"], n), "alkol_hafta": rng.integers(0, 14, n),
+            "egzersiz_seviyesi": rng.choice(["yok ya da yoka yakın", "hafif ya da orta", "ağır"], n),
+            "egzersiz_dk": rng.integers(0, 300, n)}
+
+if __name__ == "__main__":
+    # Ölçek testi: python cohort_parallel.py 200000 1,2,4,8
+    import sys
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    veri = ornek_kohort(n)
+    for w in (sys.argv[2] if len(sys.argv) > 2 else "1,2,4").split(","):
+        t = time.perf_counter()
+        hesapla_toplu_paralel(veri, workers=int(w))
+        print(f"{w} işçi: {n / (time.perf_counter() - t):.0f} satır/sn")
@@ -0,0 +1,400 @@
+import argparse, json, shutil, sys, time
+from pathlib import Path
+import numpy as np
+import model_config
+import risk_core
+
+# =========================================
+# Skorlanmış kohort için sütunlu sonuç deposu
+# =========================================
+# Dosya biçimi (küçük-endian, prevent_grid ile aynı düzen):
+#   8 bayt  "VIVA10S1"
+#   4 bayt  uint32 başlık uzunluğu (JSON, 64 bayta hizalı boşluk dolgulu)
+#   JSON    {"n", "model_version", "columns", "bitmaps", "sorted"}; ofsetler veri bölümüne göre
+#   veri    her sütun sabit genişlikli, bitişik bir dizi (64 bayt hizalı)
+# Kategoriler (risk grupları, egzersiz, alkol HR kırılımı, evet/hayır girdileri) uint8 kodlarıdır;
+# her kod için paketlenmiş bir bitmap (n/8 bayt) tutulur. chd10, kanser10 ve chd10_taban için
+# sıralı indeks (sıralı değerler + satır permütasyonu) aralık sorgularını ikili aramayla yanıtlar.
+# Dosya np.memmap ile açılır: sorgu yalnızca ilgili bitmap/indeks sayfalarını okur, sütunlar kopyasız.
+#
+# Örnek:
+#   python cohort_store.py build hastalar.csv kohort.v10s
+#   python cohort_store.py query kohort.v10s chd_grup="belirgin risk" kanser_grup="orta risk"
+#   python cohort_store.py query kohort.v10s hr_alkol_chd_kat=3: --columns yas,chd10 --limit 20
+MAGIC = b"VIVA10S1"
+YOK = 255  # hesaplanamayan satırların kategori kodu
+
+# Girdiler: ham değerler (float32) ve 0/1 ya da kod olarak kategorikler
+GIRDI_SAYISAL = ("yas", "kilo", "boy_cm", "total_chol", "hdl", "sbp", "kreatinin", "alkol_hafta", "egzersiz_dk")
+GIRDI_IKILI = ("erkek", "bp_ilac", "sigara", "diyabet", "statin", "aile_kanser")
+# hesapla_toplu aşamaları (float64)
+SONUC_SAYISAL = ("bmi", "egfr", "chd10_taban", "chd10_after_bmi", "chd10_after_alcohol", "chd10", "kanser10")
+SIRALI = ("chd10", "kanser10", "chd10_taban")
+EGZ_SIDDET = ("yok ya da yoka yakın", "hafif ya da orta", "ağır")  # egzersiz_kod_v sırası
+
+# =========================
+# Yazma
+# =========================
+def _kod(idx, gecerli):
+    return np.where(gecerli, idx, YOK).astype("u1")
+
+def depo_sutunlari(veri, sonuc=None, satir=None):
+    """
+    KOHORT_SUTUNLARI girdileri (+ hesapla_toplu sonucu; verilmezse hesaplanır) ->
+    {ad: (dizi, ek başlık alanları)}. Hesaplanamayan satırlar NaN / YOK kodu alır.
+    satir: satırların kaynaktaki kayıt sırası (varsayılan 0..n-1)
+    """
+    if sonuc is None:
+        sonuc = risk_core.hesapla_toplu(veri, hatalar={})
+    m = model_config.aktif()
+    col = lambda k: np.asarray(veri[k])
+    chd, kanser = np.asarray(sonuc["chd10"], dtype=float), np.asarray(sonuc["kanser10"], dtype=float)
+    ok_chd, ok_kanser = ~np.isnan(chd), ~np.isnan(kanser)
+    alkol = np.clip(col("alkol_hafta").astype(float), 0, 35)
+
+    s = {"satir": (np.asarray(np.arange(len(chd)) if satir is None else satir, dtype="<u8"), {})}
+    s.update({k: (col(k).astype("<f4"), {}) for k in GIRDI_SAYISAL})
+    s["erkek"] = (risk_core._erkek_mi_v(col("cinsiyet")).astype("u1"), {"codes": ["kadın", "erkek"]})
+    for k in GIRDI_IKILI[1:]:
+        s[k] = (risk_core.yok_var_to01_v(col(k)).astype("u1"), {"codes": ["yok", "var"]})
+    s["egzersiz_kod"] = (risk_core.egzersiz_kod_v(col("egzersiz_seviyesi")).astype("u1"),
+                         {"codes": list(EGZ_SIDDET)})
+    for k in SONUC_SAYISAL:
+        s[k] = (np.asarray(sonuc[k], dtype="<f8"), {})
+
+    kat = np.zeros(len(chd), dtype="u1")
+    for k, i in m.egz_kategori_indeks.items():
+        kat[np.asarray(sonuc["egzersiz_kategori"]) == k] = i
+    s["egzersiz_kategori"] = (kat, {"codes": m.egz_kategoriler.tolist()})
+    s["chd_grup"] = (_kod(m.chd_grup.indeks_v(np.nan_to_num(chd)), ok_chd),
+                     {"codes": m.chd_grup.degerler.tolist(), "codes_en": m.chd_grup_en.degerler.tolist(),
+                      "esikler": m.chd_grup.esikler.tolist()})
+    s["kanser_grup"] = (_kod(m.kanser_grup.indeks_v(np.nan_to_num(kanser)), ok_kanser),
+                        {"codes": m.kanser_grup.degerler.tolist(), "codes_en": m.kanser_grup_en.degerler.tolist(),
+                         "esikler": m.kanser_grup.esikler.tolist()})
+    # Faktör kırılımları: kod -> çarpan ("values"); sorgu çarpan aralığıyla da yapılabilir
+    s["hr_alkol_chd_kat"] = (m.hr_alkol_chd.indeks_v(alkol).astype("u1"),
+                             {"values": m.hr_alkol_chd.degerler.tolist(), "esikler": m.hr_alkol_chd.esikler.tolist()})
+    s["hr_alkol_kanser_kat"] = (m.hr_alkol_kanser.indeks_v(alkol).astype("u1"),
+                                {"values": m.hr_alkol_kanser.degerler.tolist(),
+                                 "esikler": m.hr_alkol_kanser.esikler.tolist()})
+    return s
+
+def depo_yaz(path, veri, sonuc=None, satir=None, ek=None):
+    """Girdi + sonuç sütunlarını, bitmap ve sıralı indekslerle birlikte tek dosyaya yazar."""
+    sutunlar = depo_sutunlari(veri, sonuc, satir)
+    return _dosyaya_yaz(path, sutunlar, len(next(iter(sutunlar.values()))[0]), ek)
+
+def _dosyaya_yaz(path, sutunlar, n, ek=None):
+    header = {"n": n, "model_version": model_config.aktif().version,
+              "built": time.strftime("%Y-%m-%dT%H:%M:%S"), **(ek or {}),
+              "columns": {}, "bitmaps": {}, "sorted": {}}
+
+    # Yerleşim önce hesaplanır (ofsetler boyutlardan), sonra dosya tek geçişte yazılır
+    parcalar = []  # (ofset, bayt üreticisi, boyut)
+    def yer(nbayt, uret):
+        son = parcalar[-1][0] + parcalar[-1][2] if parcalar else 0
+        ofset = -(-son // 64) * 64  # 64 bayt hizalı
+        parcalar.append((ofset, uret, nbayt))
+        return ofset
+
+    for ad, (dizi, ek) in sutunlar.items():
+        header["columns"][ad] = {"dtype": dizi.dtype.str, "offset": yer(dizi.nbytes, lambda dizi=dizi: np.ascontiguousarray(dizi)), **ek}
+    nbayt = (n + 7) // 8
+    for ad, (dizi, _) in sutunlar.items():
+        if dizi.dtype == np.uint8:
+            kodlar = np.unique(dizi).tolist()
+            uret = lambda dizi=dizi, kodlar=kodlar: b"".join(np.packbits(dizi == k).tobytes() for k in kodlar)
+            header["bitmaps"][ad] = {"codes": kodlar, "offset": yer(nbayt * len(kodlar), uret), "nbytes": nbayt}
+    perm_dtype = np.dtype("<u4" if n < 2 ** 32 else "<u8")
+    for ad in SIRALI:
+        dizi = sutunlar[ad][0]
+        perm = np.argsort(dizi, kind="stable").astype(perm_dtype)  # NaN'lar sonda
+        header["sorted"][ad] = {"perm_dtype": perm_dtype.str, "perm": yer(perm.nbytes, perm.tobytes),
+                                "values": yer(dizi.nbytes, lambda dizi=dizi, perm=perm: dizi[perm])}
+
+    raw = json.dumps(header, ensure_ascii=False).encode()
+    body = -(-(len(MAGIC) + 4 + len(raw)) // 64) * 64 - len(MAGIC) - 4
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + np.uint32(body).tobytes() + raw.ljust(body))
+        bas = f.tell()
+        for ofset, uret, _ in parcalar:
+            f.write(b"\0" * (bas + ofset - f.tell()))
+            f.write(uret())  # dizi tampon olarak yazılır; memmap sütunları bayt kopyasına çevrilmez
+    tmp.replace(path)
+    return path
+
+class DepoYazici:
+    """
+    Parça parça depo yazımı: her parçanın sütunları <çıktı>.parts/ altındaki geçici dosyalara
+    eklenir; kapat() bitmap ve sıralı indeksleri bu dosyalar üzerinden (np.memmap) kurup depoyu
+    yazar. Kohortun tamamı Python listelerinde tutulmaz.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.dir = self.path.with_suffix(self.path.suffix + ".parts")
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.n = 0
+        self._dosyalar, self._turler = {}, {}
+
+    def ekle(self, veri, sonuc=None, satir=None):
+        sutunlar = depo_sutunlari(veri, sonuc, satir)
+        for ad, (dizi, ek) in sutunlar.items():
+            if ad not in self._dosyalar:
+                self._dosyalar[ad] = open(self.dir / ad, "wb")
+                self._turler[ad] = (dizi.dtype, ek)
+            self._dosyalar[ad].write(np.ascontiguousarray(dizi, dtype=self._turler[ad][0]))
+        self.n += len(sutunlar["satir"][0])
+
+    def _geciciyi_sil(self):
+        for f in self._dosyalar.values():
+            f.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def kapat(self, ek=None):
+        if not self._dosyalar:  # boş girdi: sütun tipleri boş bir parçadan
+            self.ekle({k: [] for k in risk_core.KOHORT_SUTUNLARI},
+                      {k: [] for k in SONUC_SAYISAL + ("egzersiz_kategori",)})
+        for f in self._dosyalar.values():
+            f.close()
+        sutunlar = {ad: (np.memmap(self.dir / ad, dtype=dtype, mode="r") if self.n else np.empty(0, dtype), ek_)
+                    for ad, (dtype, ek_) in self._turler.items()}
+        try:
+            return _dosyaya_yaz(self.path, sutunlar, self.n, ek)
+        finally:
+            del sutunlar  # memmap'ler bırakılmadan geçici dosyalar silinemez (Windows)
+            self._geciciyi_sil()
+
+    def iptal(self):
+        self._geciciyi_sil()
+
+# =========================
+# Okuma / sorgu
+# =========================
+class SonucDeposu:
+    """
+    Bellek eşlemeli depo. `sutun(ad)` kopyasız np.memmap görünümü döner; `sec(**kosul)` koşulları
+    bitmap / sıralı indekslerle birleştirip eşleşen satır numaralarını (artan) döner.
+    Koşul değerleri:
+      "etiket" / [etiketler]     kategorik sütunda etiket(ler) (TR ya da EN)
+      kod / [kodlar] (int)       ham kod(lar); evet/hayır sütunlarında 0/1
+      (alt, üst)                 sıralı indeksli sütunda alt ≤ x < üst; "values" taşıyan kırılım
+                                 sütununda (hr_alkol_*_kat) çarpanı bu aralıkta olan kırılımlar.
+                                 None = sınırsız
+    """
+
+    def __init__(self, path):
+        path = Path(path)
+        with open(path, "rb") as f:
+            if f.read(8) != MAGIC:
+                raise ValueError(f"{path}: VIVA10 sonuç deposu değil.")
+            uzunluk = int(np.frombuffer(f.read(4), dtype="<u4")[0])
+            self.header = json.loads(f.read(uzunluk).decode().strip())
+        self.n = self.header["n"]
+        self.model_version = self.header["model_version"]
+        self._mm = np.memmap(path, dtype="u1", mode="r", offset=12 + uzunluk)
+
+    def __len__(self):
+        return self.n
+
+    def _dizi(self, offset, dtype, n):
+        dtype = np.dtype(dtype)
+        return self._mm[offset:offset + n * dtype.itemsize].view(dtype)
+
+    @property
+    def sutunlar(self):
+        return list(self.header["columns"])
+
+    def sutun(self, ad):
+        c = self.header["columns"].get(ad)
+        if c is None:
+            raise KeyError(f"Bilinmeyen sütun: {ad} ({', '.join(self.header['columns'])})")
+        return self._dizi(c["offset"], c["dtype"], self.n)
+
+    def etiketler(self, ad, kodlar):
+        """Kod dizisi -> etiket dizisi (YOK -> boş)."""
+        c = self.header["columns"][ad]
+        etiket = np.array((c.get("codes") or [f"×{v:g}" for v in c["values"]]) + [""], dtype=object)
+        kodlar = np.asarray(kodlar)
+        return etiket[np.where(kodlar == YOK, len(etiket) - 1, kodlar)]
+
+    def _bitmap(self, ad, kod):
+        b = self.header["bitmaps"][ad]
+        if kod not in b["codes"]:
+            return None
+        i = b["codes"].index(kod)
+        return self._mm[b["offset"] + i * b["nbytes"]:b["offset"] + (i + 1) * b["nbytes"]]
+
+    def _kodlar(self, ad, deger):
+        c = self.header["columns"][ad]
+        if isinstance(deger, tuple):
+            if "values" not in c:
+                raise ValueError(f"{ad}: aralık koşulu yalnızca sıralı indeksli ya da çarpan kırılımı sütunlarında.")
+            alt, ust = deger
+            return [i for i, v in enumerate(c["values"])
+                    if (alt is None or v >= alt) and (ust is None or v < ust)]
+        degerler = deger if isinstance(deger, list) else [deger]
+        kodlar = []
+        for d in degerler:
+            if isinstance(d, str):
+                for alan in ("codes", "codes_en"):
+                    if d in c.get(alan, []):
+                        kodlar.append(c[alan].index(d))
+                        break
+                else:
+                    raise ValueError(f"{ad}: bilinmeyen etiket '{d}' ({', '.join(c.get('codes', []))})")
+            else:
+                kodlar.append(int(d))
+        return kodlar
+
+    def _aralik(self, ad, alt, ust):
+        s = self.header["sorted"][ad]
+        degerler = self._dizi(s["values"], "<f8", self.n)
+        bas = 0 if alt is None else int(np.searchsorted(degerler, alt, side="left"))
+        son = int(np.searchsorted(degerler, np.nan if ust is None else ust, side="left"))  # NaN'lar hariç
+        return self._dizi(s["perm"], s["perm_dtype"], self.n)[bas:son]
+
+    def sec(self, **kosullar):
+        nbayt = (self.n + 7) // 8
+        maske = None
+        for ad, deger in kosullar.items():
+            if ad not in self.header["columns"]:
+                raise KeyError(f"Bilinmeyen sütun: {ad}")
+            if ad in self.header["sorted"] and isinstance(deger, tuple):
+                satir = np.zeros(self.n, dtype=bool)
+                satir[self._aralik(ad, *deger)] = True
+                b = np.packbits(satir)
+            elif ad in self.header["bitmaps"]:
+                b = np.zeros(nbayt, dtype="u1")
+                for kod in self._kodlar(ad, deger):
+                    bk = self._bitmap(ad, kod)
+                    if bk is not None:
+                        b |= bk
+            else:
+                raise ValueError(f"{ad}: indeksli değil; indeksli sütunlar: "
+                                 f"{', '.join(list(self.header['bitmaps']) + list(self.header['sorted']))}")
+            maske = b if maske is None else maske & b
+        if maske is None:
+            return np.arange(self.n)
+        return np.flatnonzero(np.unpackbits(maske, count=self.n))
+
+    def say(self, **kosullar):
+        return len(self.sec(**kosullar))
+
+    def satirlar(self, indeks, sutunlar=None):
+        """Seçilen satırlar için {sütun: dizi}; kategorikler etiket olarak."""
+        out = {}
+        for ad in sutunlar or self.sutunlar:
+            v = self.sutun(ad)[indeks]
+            c = self.header["columns"][ad]
+            out[ad] = self.etiketler(ad, v) if ("codes" in c or "values" in c) else v
+        return out
+
+    def close(self):
+        # mmap açıkça kapatılmaz: sutun()/sec() görünümleri hâlâ tutuluyor olabilir; son
+        # referans bırakılınca eşleme kendiliğinden kapanır
+        self._mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+# =========================
+# Komut satırı
+# =========================
+def _kosul_coz(metin):
+    """ad=değer; değer: 'a:b' aralık, 'a,b' liste, sayı kod, diğerleri etiket."""
+    ad, _, deger = metin.partition("=")
+    sayi = lambda x: float(x) if x.strip() else None
+    if ":" in deger:
+        alt, _, ust = deger.partition(":")
+        return ad, (sayi(alt), sayi(ust))
+    parcalar = [p.strip() for p in deger.split(",")]
+    parcalar = [int(p) if p.isdigit() else p for p in parcalar]
+    return ad, parcalar if len(parcalar) > 1 else parcalar[0]
+
+@model_config.sabit
+def dosyadan_skorla(girdi, cikti, workers=1, chunk=20000, ek=None):
+    """
+    CSV/Parquet -> depo (DepoYazici ile parça parça), score_cli ile aynı satır doğrulamasıyla.
+    Hatalı satırlar depoya alınmaz; `satir` kalanların kaynaktaki kayıt sırasıdır (0 tabanlı,
+    başlık hariç, atlanan kayıtlar da sayılır; çok satırlı CSV alanlarında dosya satırı değildir).
+    Dönüş: (depodaki satır sayısı, atlanan satır sayısı)
+    """
+    import score_cli
+    okuyucu = score_cli.parcalar_parquet if score_cli._is_parquet(girdi) else score_cli.parcalar_csv
+    parcalar = okuyucu(girdi, chunk, 0)
+    havuz = None
+    if workers > 1:
+        import cohort_parallel
+        havuz = cohort_parallel.ParalelHavuz(workers, chunk)
+        akis = score_cli._paralel_akis(havuz, parcalar)
+    else:
+        akis = ((k, kayitlar, risk_core.skorla_parca(kayitlar)) for k, kayitlar in parcalar)
+
+    yazici = DepoYazici(cikti)
+    hatali = i = 0
+    try:
+        for _, _, (satirlar, _) in akis:
+            gecerli = [r for r in satirlar if not r["error"]]
+            sira = [i + j for j, r in enumerate(satirlar) if not r["error"]]
+            i += len(satirlar)
+            hatali += len(satirlar) - len(gecerli)
+            yazici.ekle({k: [score_cli._deger(k, r[k]) for r in gecerli] for k in risk_core.KOHORT_SUTUNLARI},
+                        {k: [r[k] for r in gecerli] for k in SONUC_SAYISAL + ("egzersiz_kategori",)}, sira)
+        yazici.kapat({**(ek or {}), "skipped_rows": hatali})
+    except BaseException:
+        yazici.iptal()
+        raise
+    finally:
+        if havuz is not None:
+            havuz.close()
+    return yazici.n, hatali
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Skorlanmış kohort için bellek eşlemeli sütunlu depo")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="CSV/Parquet girdiyi skorla ve depoya yaz")
+    b.add_argument("girdi")
+    b.add_argument("cikti")
+    b.add_argument("--workers", type=int, default=1, help=">1: cohort_parallel ile çok süreçli skorlama")
+    b.add_argument("--chunk", type=int, default=20000, help="parça başına satır")
+    q = sub.add_parser("query", help="koşullara uyan satırları say / listele")
+    q.add_argument("depo")
+    q.add_argument("kosul", nargs="*", help='ad=değer, örn. chd_grup="belirgin risk" chd10=20: sigara=1')
+    q.add_argument("--columns", help="listelenecek sütunlar (virgülle)")
+    q.add_argument("--limit", type=int, default=0, help="listelenecek en fazla satır (0 = yalnızca sayı)")
+    a = ap.parse_args(argv)
+
+    if a.cmd == "build":
+        t0 = time.perf_counter()
+        n, hatali = dosyadan_skorla(a.girdi, a.cikti, a.workers, a.chunk, ek={"source": str(a.girdi)})
+        print(json.dumps({"rows": n, "skipped": hatali, "path": a.cikti,
+                          "seconds": round(time.perf_counter() - t0, 3)}))
+        return 0
+
+    with SonucDeposu(a.depo) as d:
+        t0 = time.perf_counter()
+        try:
+            indeks = d.sec(**dict(_kosul_coz(k) for k in a.kosul))
+        except (KeyError, ValueError) as e:
+            raise SystemExit(str(e).strip("'\""))
+        sn = time.perf_counter() - t0
+        print(json.dumps({"rows": len(indeks), "of": len(d), "ms": round(sn * 1e3, 3),
+                          "model_version": d.model_version}), file=sys.stderr)
+        if a.limit:
+            sutunlar = a.columns.split(",") if a.columns else d.sutunlar
+            satirlar = d.satirlar(indeks[:a.limit], sutunlar)
+            print(",".join(sutunlar))
+            for i in range(len(indeks[:a.limit])):
+                print(",".join(str(satirlar[k][i]) for k in sutunlar))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,433 @@
+import argparse, asyncio, json, math, os, random, signal, socket, subprocess, sys, threading, time, uuid
+from pathlib import Path
+
+# =========================================
+# VIVA10 yük testi / kapasite planlaması
+# =========================================
+# Örnek:
+#   python loadtest.py --profiles free,starter,standard --sessions 1,2,4,8,16,32 --out kapasite.json
+#   python loadtest.py --profiles free --fake-latency-ms 800 --fake-fail-rate 0.02 --env VIVA10_R_POOL_SIZE=1
+#   python loadtest.py --url https://viva10.onrender.com --label render-free --sessions 1,2,4
+# Gerçek Gradio olay uç noktasını ("hesapla" düğmesi: queue/join + queue/data SSE) sürer.
+# Her sanal kullanıcı ayrı bir Gradio oturumudur; yanıtı aldıktan sonra (--think-ms) yenisini gönderir.
+# --profiles: app.py her Render planının CPU payıyla yerelde başlatılır (çekirdek sabitleme +
+# kesirli CPU için 100 ms'lik dönemlerde kota: kota dolunca süreç grubu SIGSTOP, dönem başında
+# SIGCONT; yalnızca Linux). CHD arka ucu varsayılan olarak preventr'sız sahte R'dir (chd_fake.R,
+# VIVA10_R_FAKE=1): ağ ve preventr gerekmez, gecikme ve hata oranı ayarlanabilir.
+# Ölçülenler: kuyruk beklemesi (join -> process_starts), servis süresi (process_starts ->
+# process_completed), uçtan uca süre ve hata türleri; doyma verimi = en yüksek başarılı istek/sn.
+
+# Render planları: (CPU, bellek MB)
+PLANLAR = {"free": (0.1, 512), "starter": (0.5, 512), "standard": (1, 2048), "pro": (2, 4096),
+           "pro-plus": (4, 8192)}
+HATA_ISARETI = "Hata/Error"  # app._hata_update çıktısı
+
+def _yuzdelik(degerler, p):
+    s = sorted(degerler)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))] if s else None
+
+def _dagilim_ms(degerler):
+    return {f"p{p}": round(_yuzdelik(degerler, p) * 1e3, 1) if degerler else None for p in (50, 95, 99)}
+
+# =========================
+# Girdi dağılımları
+# =========================
+def girdi_havuzu(kaynak, n, seed):
+    """
+    "random" -> cohort_parallel.ornek_kohort (geniş, tekdüze dağılım; önbellek çoğunlukla ıskalar)
+    "fixed"  -> tek kayıt (varsayılan form değerleri; ilk istekten sonra önbellekten)
+    diğer    -> KOHORT_SUTUNLARI sütunlu CSV dosyası (ilk n geçerli satır)
+    Dönüş: hesapla girdi sırasıyla değer listeleri.
+    """
+    import risk_core
+    sutunlar = risk_core.KOHORT_SUTUNLARI
+    if kaynak == "fixed":
+        return [[risk_core.SKOR_VARSAYILAN[k] for k in sutunlar]]
+    if kaynak == "random":
+        import cohort_parallel
+        veri = cohort_parallel.ornek_kohort(n, seed)
+        return [[veri[k][i].item() for k in sutunlar] for i in range(n)]
+    import csv, score_cli
+    havuz = []
+    with open(kaynak, newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            try:
+                havuz.append([score_cli._deger(k, r.get(k)) for k in sutunlar])
+            except ValueError:
+                continue
+            if len(havuz) >= n:
+                break
+    if not havuz:
+        raise SystemExit(f"{kaynak}: geçerli satır yok.")
+    return havuz
+
+class Girdiler:
+    """Havuzdan sırayla; `tekrar` olasılıkla daha önce gönderilmiş bir kayıt (önbellek isabeti)."""
+
+    def __init__(self, havuz, tekrar=0.0, seed=0):
+        self.havuz, self.tekrar = havuz, tekrar
+        self.rng = random.Random(seed)
+        self.i = 0
+
+    def sonraki(self):
+        if self.i and self.rng.random() < self.tekrar:
+            return self.havuz[self.rng.randrange(min(self.i, len(self.havuz)))]
+        g = self.havuz[self.i % len(self.havuz)]
+        self.i += 1
+        return g
+
+# =========================
+# Gradio kuyruk istemcisi
+# =========================
+class GradioIstemci:
+    def __init__(self, url, timeout):
+        import httpx
+        self.kok = self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.http = httpx.AsyncClient(timeout=httpx.Timeout(timeout, connect=10.0),
+                                      limits=httpx.Limits(max_connections=None, max_keepalive_connections=None))
+        self.fn_index = None
+
+    async def hazirla(self, api_name="hesapla"):
+        cfg = (await self.http.get(f"{self.url}/config")).json()
+        self.url += cfg.get("api_prefix", "")  # Gradio 5: /gradio_api
+        for i, d in enumerate(cfg["dependencies"]):
+            if d.get("api_name") == api_name:
+                self.fn_index = d.get("id", i)
+                return
+        raise SystemExit(f"{self.url}: '{api_name}' olayı bulunamadı.")
+
+    async def hesapla(self, girdi):
+        """(tür, kuyruk_sn, servis_sn, toplam_sn); tür: ok | app_error | gradio_error | rejected | http_NNN | timeout"""
+        t0 = time.monotonic()
+        try:
+            return await asyncio.wait_for(self._hesapla(girdi, t0), self.timeout)
+        except asyncio.TimeoutError:
+            return "timeout", None, None, time.monotonic() - t0
+        except Exception as e:
+            return f"client_{type(e).__name__}", None, None, time.monotonic() - t0
+
+    async def _hesapla(self, girdi, t0):
+        oturum = uuid.uuid4().hex[:11]
+        r = await self.http.post(f"{self.url}/queue/join",
+                                 json={"data": girdi, "fn_index": self.fn_index, "session_hash": oturum,
+                                       "event_data": None, "trigger_id": None})
+        if r.status_code == 503:
+            return "rejected", None, None, time.monotonic() - t0
+        if r.status_code != 200:
+            return f"http_{r.status_code}", None, None, time.monotonic() - t0
+        olay = r.json()["event_id"]
+        basla = None
+        async with self.http.stream("GET", f"{self.url}/queue/data", params={"session_hash": oturum}) as s:
+            async for satir in s.aiter_lines():
+                if not satir.startswith("data:"):
+                    continue
+                m = json.loads(satir[5:])
+                if m.get("event_id", olay) != olay:
+                    continue
+                if m.get("msg") == "process_starts":
+                    basla = time.monotonic()
+                elif m.get("msg") == "process_completed":
+                    son = time.monotonic()
+                    basla = basla or son
+                    if not m.get("success"):
+                        tur = "gradio_error"
+                    else:
+                        ilk = (m.get("output", {}).get("data") or [{}])[0]
+                        tur = "app_error" if HATA_ISARETI in str(ilk.get("value", ilk)) else "ok"
+                    return tur, basla - t0, son - basla, son - t0
+                elif m.get("msg") in ("close_stream", "unexpected_error"):
+                    break
+        return "stream_closed", None, None, time.monotonic() - t0
+
+    async def stats(self):
+        try:
+            return (await self.http.get(f"{self.kok}/stats")).json()
+        except Exception:
+            return None
+
+    async def kapat(self):
+        await self.http.aclose()
+
+# =========================
+# Yük adımı (kapalı döngü: S oturum)
+# =========================
+async def adim(istemci, girdiler, oturum, sure, isinma, dusunme_ms):
+    kayitlar = []
+    t_bas = time.monotonic()
+    olcum_bas, bitis = t_bas + isinma, t_bas + isinma + sure
+
+    async def kullanici(k):
+        rng = random.Random(k)
+        await asyncio.sleep(rng.uniform(0, min(1.0, isinma)))  # aynı anda başlamasınlar
+        while time.monotonic() < bitis:
+            t = time.monotonic()
+            sonuc = await istemci.hesapla(girdiler.sonraki())
+            kayitlar.append((t, time.monotonic(), *sonuc))
+            if dusunme_ms > 0:
+                await asyncio.sleep(rng.expovariate(1000.0 / dusunme_ms))
+
+    await asyncio.gather(*(kullanici(k) for k in range(oturum)))
+    olculen = [k for k in kayitlar if k[0] >= olcum_bas]
+    tamam = [k for k in olculen if k[2] == "ok"]
+    pencere = [k for k in tamam if k[1] <= bitis]
+    hatalar = {}
+    for k in olculen:
+        if k[2] != "ok":
+            hatalar[k[2]] = hatalar.get(k[2], 0) + 1
+    return {
+        "sessions": oturum, "requests": len(olculen), "ok": len(tamam), "errors": hatalar,
+        "error_rate": round(1 - len(tamam) / len(olculen), 4) if olculen else None,
+        "throughput_per_s": round(len(pencere) / sure, 2),
+        "queue_wait_ms": _dagilim_ms([k[3] for k in tamam]),
+        "service_ms": _dagilim_ms([k[4] for k in tamam]),
+        "total_ms": _dagilim_ms([k[5] for k in tamam]),
+        "server": await istemci.stats(),
+    }
+
+def doyma(adimlar, slo_ms, max_hata):
+    """Doyma verimi, SLO içindeki en yüksek eşzamanlılık ve dirsek (verim artışı < %10)."""
+    if not adimlar:
+        return {}
+    en_iyi = max(adimlar, key=lambda a: a["throughput_per_s"])
+    slo = [a["sessions"] for a in adimlar
+           if a["ok"] and a["total_ms"]["p95"] <= slo_ms and (a["error_rate"] or 0) <= max_hata]
+    dirsek = next((b["sessions"] for a, b in zip(adimlar, adimlar[1:])
+                   if b["throughput_per_s"] < 1.1 * a["throughput_per_s"]), None)
+    return {"saturation_throughput_per_s": en_iyi["throughput_per_s"], "at_sessions": en_iyi["sessions"],
+            "max_sessions_within_slo": max(slo) if slo else 0, "knee_sessions": dirsek}
+
+def _coktu(a, slo_ms):
+    # Gecikme çöktü ya da isteklerin yarısı hatalı: daha yüksek eşzamanlılık anlamsız
+    return (a["error_rate"] or 0) > 0.5 or not a["ok"] or a["total_ms"]["p95"] > 10 * slo_ms
+
+async def tarama(url, girdiler, a):
+    istemci = GradioIstemci(url, a.timeout)
+    try:
+        await istemci.hazirla()
+        adimlar = []
+        for s in a.sessions:
+            sonuc = await adim(istemci, girdiler, s, a.duration, a.warmup, a.think_ms)
+            adimlar.append(sonuc)
+            if not a.quiet:
+                print(f"  {s:>4} oturum: {sonuc['throughput_per_s']:>7.2f} istek/sn  "
+                      f"kuyruk p95 {sonuc['queue_wait_ms']['p95']} ms  servis p95 {sonuc['service_ms']['p95']} ms  "
+                      f"hata %{100 * (sonuc['error_rate'] or 0):.1f}", file=sys.stderr)
+            if _coktu(sonuc, a.slo_ms):
+                break
+        return adimlar
+    finally:
+        await istemci.kapat()
+
+# =========================
+# Yerel sunucu ve plan kısıtları (Linux)
+# =========================
+def _bos_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _grup_pidleri(pgid):
+    pidler = []
+    for p in os.listdir("/proc"):
+        if p.isdigit():
+            try:
+                with open(f"/proc/{p}/stat") as f:
+                    alanlar = f.read().rsplit(")", 1)[1].split()
+            except OSError:
+                continue
+            if int(alanlar[2]) == pgid:
+                pidler.append(int(p))
+    return pidler
+
+def _grup_olc(pidler):
+    """(CPU saniyesi, RSS MB); CPU'ya beklenmiş (bitmiş) çocuk süreçler de dahildir."""
+    cpu = rss = 0
+    for p in pidler:
+        try:
+            with open(f"/proc/{p}/stat") as f:
+                alanlar = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        cpu += sum(int(x) for x in alanlar[11:15])  # utime stime cutime cstime
+        rss += int(alanlar[21])
+    return cpu / os.sysconf("SC_CLK_TCK"), rss * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+class CpuKotasi(threading.Thread):
+    """
+    Kesirli CPU (CFS kotasına yakın): her `donem` saniyede süreç grubu en fazla cpu * donem
+    CPU saniyesi kullanır, sonra dönem sonuna kadar durdurulur. Tepe RSS de izlenir.
+    """
+
+    def __init__(self, pgid, cpu, donem=0.1):
+        super().__init__(daemon=True, name="cpu-kotasi")
+        self.pgid, self.cpu, self.donem = pgid, cpu, donem
+        self.dur = threading.Event()
+        self.tepe_rss_mb = 0.0
+        self.durdurma = 0
+
+    def run(self):
+        kisitli = self.cpu != int(self.cpu)
+        try:
+            while not self.dur.is_set():
+                pidler = _grup_pidleri(self.pgid)
+                cpu0, rss = _grup_olc(pidler)
+                self.tepe_rss_mb = max(self.tepe_rss_mb, rss)
+                son = time.monotonic() + self.donem
+                while kisitli and time.monotonic() < son:
+                    if _grup_olc(pidler)[0] - cpu0 >= self.cpu * self.donem:
+                        os.killpg(self.pgid, signal.SIGSTOP)
+                        self.durdurma += 1
+                        time.sleep(max(0.0, son - time.monotonic()))
+                        os.killpg(self.pgid, signal.SIGCONT)
+                        break
+                    time.sleep(0.005)
+                if not kisitli:
+                    self.dur.wait(self.donem)
+        except ProcessLookupError:
+            pass
+        finally:
+            try:
+                os.killpg(self.pgid, signal.SIGCONT)
+            except ProcessLookupError:
+                pass
+
+    def durdur(self):
+        self.dur.set()
+        self.join()
+
+def sunucu_baslat(plan, a):
+    cpu, _ = PLANLAR[plan]
+    cekirdekler = sorted(os.sched_getaffinity(0))[:max(1, math.ceil(cpu))]
+    port = _bos_port()
+    env = {**os.environ, "PORT": str(port), "VIVA10_PREVENTR_CHECK": "0", "VIVA10_STARTUP": "background",
+           "VIVA10_CHD_BACKEND": a.backend, "GRADIO_ANALYTICS_ENABLED": "False"}
+    if not a.real_r:
+        env.update(VIVA10_R_FAKE="1", VIVA10_R_FAKE_LATENCY_MS=str(a.fake_latency_ms),
+                   VIVA10_R_FAKE_FAIL_RATE=str(a.fake_fail_rate), VIVA10_R_FAKE_LOAD_MS=str(a.fake_load_ms))
+    env.update(dict(e.split("=", 1) for e in a.env))
+    log = open(Path(a.log_dir) / f"loadtest-{plan}.log", "w") if a.log_dir else subprocess.DEVNULL
+    p = subprocess.Popen([sys.executable, "app.py"], cwd=Path(__file__).resolve().parent, env=env,
+                         stdout=log, stderr=subprocess.STDOUT, start_new_session=True,
+                         preexec_fn=lambda: os.sched_setaffinity(0, cekirdekler))
+    kota = CpuKotasi(p.pid, min(cpu, len(cekirdekler)))
+    kota.start()
+    url = f"http://127.0.0.1:{port}"
+    _hazir_bekle(url, p, a.ready_timeout)
+    return p, kota, url, len(cekirdekler)
+
+def _hazir_bekle(url, p, timeout):
+    import httpx
+    son = time.monotonic() + timeout
+    while time.monotonic() < son:
+        if p.poll() is not None:
+            raise RuntimeError(f"app.py kapandı (çıkış kodu {p.returncode}).")
+        try:
+            r = httpx.get(f"{url}/ready", timeout=2.0)
+            if r.status_code == 200:
+                return
+            if r.json().get("state") == "error":
+                raise RuntimeError(f"Arka uç ısınmadı: {r.json().get('error')}")
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"app.py {timeout:.0f} sn içinde hazır olmadı.")
+
+def sunucu_kapat(p, kota):
+    kota.durdur()
+    try:
+        os.killpg(p.pid, signal.SIGTERM)
+        p.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        os.killpg(p.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+def plan_olc(plan, girdiler, a):
+    p, kota, url, cekirdek = sunucu_baslat(plan, a)
+    try:
+        adimlar = asyncio.run(tarama(url, girdiler, a))
+    finally:
+        sunucu_kapat(p, kota)
+    cpu, bellek = PLANLAR[plan]
+    return {"plan": {"cpu": cpu, "memory_mb": bellek, "cores_pinned": cekirdek},
+            "steps": adimlar, "saturation": doyma(adimlar, a.slo_ms, a.max_error_rate),
+            "peak_rss_mb": round(kota.tepe_rss_mb, 1), "over_memory": kota.tepe_rss_mb > bellek,
+            "cpu_throttle_events": kota.durdurma}
+
+def tablo(profiller):
+    satirlar = [f"{'profil':<12}{'oturum':>7}{'istek/sn':>10}{'kuyruk p95':>12}{'servis p95':>12}"
+                f"{'toplam p95':>12}{'hata %':>8}"]
+    for ad, p in profiller.items():
+        for s in p["steps"]:
+            satirlar.append(f"{ad:<12}{s['sessions']:>7}{s['throughput_per_s']:>10.2f}"
+                            f"{s['queue_wait_ms']['p95'] or '-':>12}{s['service_ms']['p95'] or '-':>12}"
+                            f"{s['total_ms']['p95'] or '-':>12}{100 * (s['error_rate'] or 0):>8.1f}")
+        d = p["saturation"]
+        if d:
+            satirlar.append(f"{ad:<12}doyma {d['saturation_throughput_per_s']} istek/sn ({d['at_sessions']} oturum), "
+                            f"SLO içinde en fazla {d['max_sessions_within_slo']} oturum, dirsek {d['knee_sessions']}")
+    return "\n".join(satirlar)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Gradio 'hesapla' olayı için yük testi ve kapasite eğrisi.")
+    hedef = ap.add_mutually_exclusive_group()
+    hedef.add_argument("--profiles", default="free,standard",
+                       help=f"yerelde başlatılacak planlar ({','.join(PLANLAR)})")
+    hedef.add_argument("--url", help="çalışan bir sunucu (plan kısıtı uygulanmaz)")
+    ap.add_argument("--label", default="remote", help="--url sonucu için profil adı")
+    ap.add_argument("--sessions", default="1,2,4,8,16,32", help="eşzamanlı oturum düzeyleri")
+    ap.add_argument("--duration", type=float, default=20.0, help="düzey başına ölçüm süresi (sn)")
+    ap.add_argument("--warmup", type=float, default=3.0, help="düzey başına ölçülmeyen ısınma süresi (sn)")
+    ap.add_argument("--think-ms", type=float, default=0.0, help="istekler arası ortalama düşünme süresi (üstel)")
+    ap.add_argument("--inputs", default="random", help="random | fixed | KOHORT_SUTUNLARI sütunlu CSV")
+    ap.add_argument("--pool-size", type=int, default=5000, help="girdi havuzu boyu")
+    ap.add_argument("--repeat", type=float, default=0.0, help="önceki bir girdiyi tekrar gönderme olasılığı")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--timeout", type=float, default=60.0, help="istek başına zaman aşımı (sn)")
+    ap.add_argument("--slo-ms", type=float, default=2000.0, help="uçtan uca p95 hedefi")
+    ap.add_argument("--max-error-rate", type=float, default=0.01, help="SLO için izin verilen hata oranı")
+    ap.add_argument("--backend", default="pool", help="yerel sunucunun VIVA10_CHD_BACKEND değeri")
+    ap.add_argument("--real-r", action="store_true", help="sahte yerine gerçek preventr (chd_common.R)")
+    ap.add_argument("--fake-latency-ms", type=float, default=300.0, help="sahte R: çağrı başına ortalama gecikme")
+    ap.add_argument("--fake-fail-rate", type=float, default=0.0, help="sahte R: hata olasılığı")
+    ap.add_argument("--fake-load-ms", type=float, default=1500.0,
+                    help="sahte R: süreç başına açılış (preventr yükleme) süresi")
+    ap.add_argument("--env", action="append", default=[], metavar="K=V", help="yerel sunucuya ek ortam değişkeni")
+    ap.add_argument("--ready-timeout", type=float, default=180.0)
+    ap.add_argument("--log-dir", help="yerel sunucu çıktıları için dizin")
+    ap.add_argument("--out", help="JSON dosyası (verilmezse stdout)")
+    ap.add_argument("--quiet", action="store_true")
+    a = ap.parse_args(argv)
+    a.sessions = [int(s) for s in a.sessions.split(",") if s.strip()]
+
+    girdiler = Girdiler(girdi_havuzu(a.inputs, a.pool_size, a.seed), a.repeat, a.seed)
+    profiller = {}
+    if a.url:
+        adimlar = asyncio.run(tarama(a.url, girdiler, a))
+        profiller[a.label] = {"plan": None, "steps": adimlar,
+                              "saturation": doyma(adimlar, a.slo_ms, a.max_error_rate)}
+    else:
+        for plan in a.profiles.split(","):
+            if plan not in PLANLAR:
+                raise SystemExit(f"Bilinmeyen plan: {plan} ({', '.join(PLANLAR)})")
+            if not a.quiet:
+                print(f"{plan}: CPU {PLANLAR[plan][0]}, {PLANLAR[plan][1]} MB", file=sys.stderr)
+            profiller[plan] = plan_olc(plan, girdiler, a)
+
+    sonuc = {
+        "config": {k: v for k, v in vars(a).items() if k not in ("out", "quiet", "log_dir")},
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "profiles": profiller,
+    }
+    if not a.quiet:
+        print(tablo(profiller), file=sys.stderr)
+    metin = json.dumps(sonuc, indent=2, ensure_ascii=False)
+    if a.out:
+        Path(a.out).write_text(metin, encoding="utf-8")
+    else:
+        print(metin)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import os, threading, time
+
+# =========================================
+# Aşama süreleri ve sayaçlar (Prometheus metin biçimi)
+# =========================================
+# VIVA10_METRICS=1 ile açılır. Kapalıyken span() paylaşılan boş bir bağlam döndürür,
+# inc() hemen döner; ölçüm yükü bir global okuma ile sınırlıdır.
+ENABLED = os.getenv("VIVA10_METRICS", "0") == "1"
+
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_LOCK = threading.Lock()
+_HIST = {}      # (ad, etiketler) -> [kova sayıları..., +Inf, toplam, adet]
+_COUNTERS = {}  # (ad, etiketler) -> değer
+_GAUGE_FNS = []
+
+def _key(ad, labels):
+    return ad, tuple(sorted(labels.items()))
+
+def observe(ad, saniye, **labels):
+    if not ENABLED:
+        return
+    k = _key(ad, labels)
+    with _LOCK:
+        h = _HIST.get(k)
+        if h is None:
+            h = _HIST[k] = [0] * (len(BUCKETS) + 1) + [0.0, 0]
+        for i, ust in enumerate(BUCKETS):
+            if saniye <= ust:
+                h[i] += 1
+                break
+        else:
+            h[len(BUCKETS)] += 1
+        h[-2] += saniye
+        h[-1] += 1
+
+def inc(ad, deger=1, **labels):
+    if not ENABLED:
+        return
+    k = _key(ad, labels)
+    with _LOCK:
+        _COUNTERS[k] = _COUNTERS.get(k, 0) + deger
+
+class _Span:
+    __slots__ = ("stage", "labels", "t0")
+
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe("viva10_stage_seconds", time.perf_counter() - self.t0, stage=self.stage, **self.labels)
+        return False
+
+class _NoopSpan:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NOOP = _NoopSpan()
+
+def span(stage, **labels):
+    """`with span("egfr"):` bloğunun süresini viva10_stage_seconds{stage=...} histogramına yazar."""
+    if not ENABLED:
+        return _NOOP
+    return _Span(stage, labels)
+
+def register_gauges(fn):
+    """fn() -> {metrik_adı: değer}; her /metrics isteğinde okunur."""
+    _GAUGE_FNS.append(fn)
+
+def _labels_txt(labels, ek=()):
+    items = list(labels) + list(ek)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+def render():
+    satirlar = []
+    with _LOCK:
+        hist = {k: list(v) for k, v in _HIST.items()}
+        counters = dict(_COUNTERS)
+    for ad in sorted({k[0] for k in hist}):
+        satirlar.append(f"# TYPE {ad} histogram")
+        for (a, labels), h in sorted(hist.items()):
+            if a != ad:
+                continue
+            kumulatif = 0
+            for ust, n in zip(BUCKETS, h):
+                kumulatif += n
+                satirlar.append(f"{ad}_bucket{_labels_txt(labels, [('le', ust)])} {kumulatif}")
+            satirlar.append(f"{ad}_bucket{_labels_txt(labels, [('le', '+Inf')])} {h[-1]}")
+            satirlar.append(f"{ad}_sum{_labels_txt(labels)} {h[-2]:.9f}")
+            satirlar.append(f"{ad}_count{_labels_txt(labels)} {h[-1]}")
+    for ad in sorted({k[0] for k in counters}):
+        satirlar.append(f"# TYPE {ad} counter")
+        for (a, labels), v in sorted(counters.items()):
+            if a == ad:
+                satirlar.append(f"{ad}{_labels_txt(labels)} {v}")
+    for fn in _GAUGE_FNS:
+        for ad, v in sorted(fn().items()):
+            if isinstance(v, (int, float)):
+                satirlar.append(f"# TYPE {ad} gauge")
+                satirlar.append(f"{ad} {v}")
+    return "\n".join(satirlar) + "\n"
@@ -0,0 +1,180 @@
+import contextlib, contextvars, functools, inspect, json, os, threading, time
+from bisect import bisect_right
+from pathlib import Path
+import numpy as np
+
+# =========================================
+# Sürümlü model yapılandırması (model_config.json)
+# =========================================
+# Eşikler ve çarpanlar başlangıçta sıralı kırılım dizilerine derlenir; aynı Basamak nesnesi
+# skaler yolda bisect, dizi yolunda np.searchsorted ile (aynı side="right" anlamıyla) okunur.
+# Dosya değişirse (VIVA10_MODEL_CHECK_S aralığıyla mtime kontrolü) yeni sürüm yüklenir;
+# hatalı dosyada eski model kullanılmaya devam eder. `sabitle()` bir isteği tek sürüme bağlar.
+CONFIG_PATH = Path(os.getenv("VIVA10_MODEL_CONFIG", Path(__file__).with_name("model_config.json")))
+CHECK_S = float(os.getenv("VIVA10_MODEL_CHECK_S", "2"))
+
+class Basamak:
+    """x < esikler[0] -> degerler[0]; esikler[i] ≤ x < esikler[i+1] -> degerler[i+1]"""
+    __slots__ = ("esikler", "degerler", "_e", "_d")
+
+    def __init__(self, esikler, degerler, ad=""):
+        esikler = [float(e) for e in esikler]
+        if esikler != sorted(esikler):
+            raise ValueError(f"{ad}: eşikler küçükten büyüğe sıralı olmalı.")
+        if len(degerler) != len(esikler) + 1:
+            raise ValueError(f"{ad}: değer sayısı eşik sayısından bir fazla olmalı.")
+        self._e, self._d = tuple(esikler), tuple(degerler)
+        self.esikler, self.degerler = np.asarray(esikler), np.asarray(degerler)
+
+    # Skaler yol: bisect_right == searchsorted(side="right")
+    def indeks(self, x):
+        return bisect_right(self._e, x)
+
+    def bul(self, x):
+        return self._d[bisect_right(self._e, x)]
+
+    # Dizi yolu
+    def indeks_v(self, x):
+        return np.searchsorted(self.esikler, x, side="right")
+
+    def bul_v(self, x):
+        return self.degerler[np.searchsorted(self.esikler, x, side="right")]
+
+class UstelHR:
+    """referans üzerindeki her `birim` için ×hr; referans ve altı 1.00"""
+    __slots__ = ("referans", "birim", "hr")
+
+    def __init__(self, d):
+        self.referans, self.birim, self.hr = float(d["referans"]), float(d["birim"]), float(d["hr"])
+
+    def carpan(self, x):
+        return 1.00 if x <= self.referans else self.hr ** ((x - self.referans) / self.birim)
+
+    def carpan_v(self, x):
+        x = np.asarray(x, dtype=float)
+        return np.where(x <= self.referans, 1.00, self.hr ** ((x - self.referans) / self.birim))
+
+class Model:
+    def __init__(self, cfg, kaynak=None):
+        self.version = str(cfg["version"])
+        self.kaynak = str(kaynak) if kaynak else None
+        self.yuklenme = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+        kt = cfg["kanser_taban"]
+        self.kanser_taban_erkek = Basamak(kt["yas_esikleri"], kt["erkek"], "kanser_taban.erkek")
+        self.kanser_taban_kadin = Basamak(kt["yas_esikleri"], kt["kadin"], "kanser_taban.kadin")
+        self.hr_bmi_chd = UstelHR(cfg["hr_bmi_chd"])
+        self.hr_bmi_kanser = UstelHR(cfg["hr_bmi_kanser"])
+        self.hr_alkol_chd = Basamak(cfg["hr_alkol_chd"]["esikler"], cfg["hr_alkol_chd"]["degerler"], "hr_alkol_chd")
+        self.hr_alkol_kanser = Basamak(cfg["hr_alkol_kanser"]["esikler"], cfg["hr_alkol_kanser"]["degerler"],
+                                       "hr_alkol_kanser")
+        self.hr_sigara_kanser = float(cfg["hr_sigara_kanser"]["hr"])
+        self.aile_kanser_carpani = float(cfg["aile_kanser_carpani"]["carpan"])
+
+        e = cfg["egzersiz"]
+        # Skaler yol için (kategori, HR_CHD, HR_Kanser) demetleri, dizi yolu için NumPy dizileri
+        self.egz_sonuclari = tuple(zip(e["kategoriler"], map(float, e["hr_chd"]), map(float, e["hr_kanser"])))
+        self.egz_kategoriler = np.array(e["kategoriler"])
+        self.egz_kategori_indeks = {k: i for i, k in enumerate(e["kategoriler"])}
+        self.egz_hafif_orta = Basamak(e["hafif_orta_dk"], [0, 1, 2], "egzersiz.hafif_orta_dk")
+        self.egz_agir = Basamak(e["agir_dk"], [0, 1, 2], "egzersiz.agir_dk")
+        self.egz_hr_chd = np.asarray(e["hr_chd"], dtype=float)
+        self.egz_hr_kanser = np.asarray(e["hr_kanser"], dtype=float)
+
+        t = cfg["tavanlar"]
+        self.tavan_chd_alkol, self.tavan_chd, self.tavan_kanser = float(t["chd_alkol"]), float(t["chd"]), float(t["kanser"])
+
+        self.chd_grup = Basamak(cfg["chd_grup"]["esikler"], cfg["chd_grup"]["tr"], "chd_grup")
+        self.chd_grup_en = Basamak(cfg["chd_grup"]["esikler"], cfg["chd_grup"]["en"], "chd_grup")
+        self.kanser_grup = Basamak(cfg["kanser_grup"]["esikler"], cfg["kanser_grup"]["tr"], "kanser_grup")
+        self.kanser_grup_en = Basamak(cfg["kanser_grup"]["esikler"], cfg["kanser_grup"]["en"], "kanser_grup")
+
+        # Her çarpan girdisinin yayımlanmış dayanağı; null = henüz belgelenmedi
+        self.kaynaklar = {ad: d.get(alan) for ad, d, alan in (
+            ("kanser_taban", kt, "kaynak"), ("hr_bmi_chd", cfg["hr_bmi_chd"], "kaynak"),
+            ("hr_bmi_kanser", cfg["hr_bmi_kanser"], "kaynak"), ("hr_alkol_chd", cfg["hr_alkol_chd"], "kaynak"),
+            ("hr_alkol_kanser", cfg["hr_alkol_kanser"], "kaynak"), ("hr_sigara_kanser", cfg["hr_sigara_kanser"], "kaynak"),
+            ("aile_kanser_carpani", cfg["aile_kanser_carpani"], "kaynak"),
+            ("egzersiz.hr_chd", e, "hr_chd_kaynak"), ("egzersiz.hr_kanser", e, "hr_kanser_kaynak"))}
+        self.kaynaksiz = sorted(ad for ad, k in self.kaynaklar.items() if not k)
+        if self.kaynaksiz and not self.version.endswith("-taslak"):
+            raise ValueError(f"Sürüm {self.version}: kaynağı eksik girdiler var ({', '.join(self.kaynaksiz)}); "
+                             "sürüm '-taslak' ile bitmeli.")
+
+    def ozet(self):
+        return {"version": self.version, "path": self.kaynak, "loaded": self.yuklenme,
+                "unsourced": self.kaynaksiz}
+
+def yukle(path=CONFIG_PATH):
+    with open(path, encoding="utf-8") as f:
+        return Model(json.load(f), path)
+
+_MODEL = None
+_DURUM = {"path": CONFIG_PATH, "mtime": None, "checked": 0.0, "error": None}
+_LOCK = threading.Lock()
+_SABIT = contextvars.ContextVar("viva10_model", default=None)
+
+def yeniden_yukle(path=None):
+    """Dosyayı okuyup derler; başarılıysa etkin modeli atomik olarak değiştirir."""
+    global _MODEL
+    path = Path(path or _DURUM["path"])
+    with _LOCK:
+        try:
+            mtime = path.stat().st_mtime
+            m = yukle(path)
+        except Exception as e:
+            _DURUM["error"] = f"{type(e).__name__}: {e}"
+            if _MODEL is None:
+                raise
+            return _MODEL
+        _MODEL = m
+        _DURUM.update(path=path, mtime=mtime, error=None)
+        return m
+
+def aktif():
+    """Etkin model; sabitle() içindeyse isteğin başındaki sürüm."""
+    m = _SABIT.get()
+    if m is not None:
+        return m
+    if _MODEL is None:
+        return yeniden_yukle()
+    simdi = time.monotonic()
+    if CHECK_S > 0 and simdi - _DURUM["checked"] >= CHECK_S:
+        _DURUM["checked"] = simdi
+        try:
+            if _DURUM["path"].stat().st_mtime != _DURUM["mtime"]:
+                return yeniden_yukle()
+        except OSError:
+            pass
+    return _MODEL
+
+@contextlib.contextmanager
+def sabitle():
+    """Blok boyunca aynı model sürümü kullanılır (iç içe çağrılar dıştakini korur)."""
+    if _SABIT.get() is not None:
+        yield _SABIT.get()
+        return
+    m = aktif()
+    token = _SABIT.set(m)
+    try:
+        yield m
+    finally:
+        _SABIT.reset(token)
+
+def sabit(fn):
+    """Dekoratör: fonksiyon (senkron ya da async) boyunca sabitle() uygulanır."""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def sarmal(*a, **k):
+            with sabitle():
+                return await fn(*a, **k)
+    else:
+        @functools.wraps(fn)
+        def sarmal(*a, **k):
+            with sabitle():
+                return fn(*a, **k)
+    return sarmal
+
+def durum():
+    m = aktif()
+    return {**m.ozet(), "reload_error": _DURUM["error"]}
@@ -0,0 +1,73 @@
+import csv, os, threading
+from pathlib import Path
+import numpy as np
+
+# =========================================
+# PREVENT 10 yıllık CHD (base model) — NumPy
+# =========================================
+# Katsayılar modülün yanındaki prevent_chd_coef.csv dosyasından okunur (term,female,male,kaynak);
+# VIVA10_PREVENT_COEF ile başka bir dosya seçilebilir. Çalışma dizininden bağımsızdır.
+# Tablo yayımlanmış PREVENT katsayılarından elle girilir; her satırın `kaynak` alanı dayanağını
+# (yayın, tablo) taşır. Kaynaksız tablo yüklenmez: katsayılar preventr çıktısına uydurulmaz.
+COEF_PATH = Path(os.getenv("VIVA10_PREVENT_COEF", Path(__file__).with_name("prevent_chd_coef.csv")))
+
+TERMS = (
+    "constant", "age", "nonhdl", "hdl", "sbp_lo", "sbp_hi", "dm", "smoking",
+    "egfr_lo", "egfr_hi", "bp_tx", "statin", "bp_tx_sbp_hi", "statin_nonhdl",
+    "age_nonhdl", "age_hdl", "age_sbp_hi", "age_dm", "age_smoking", "age_egfr_lo",
+)
+
+_COEF = None
+_COEF_LOCK = threading.Lock()
+
+def load_coef(path=COEF_PATH):
+    """CSV'den (kadın, erkek) katsayı vektörlerini TERMS sırasıyla döndürür."""
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"{path} bulunamadı; yayımlanmış PREVENT katsayı tablosu (kaynağıyla) gerekli.")
+    with open(path, newline="", encoding="utf-8") as f:
+        satirlar = {r["term"]: r for r in csv.DictReader(f)}
+    eksik = [t for t in TERMS if t not in satirlar]
+    if eksik:
+        raise RuntimeError(f"{path}: eksik terim(ler): {', '.join(eksik)}")
+    kaynaksiz = [t for t in TERMS if not (satirlar[t].get("kaynak") or "").strip()]
+    if kaynaksiz:
+        raise RuntimeError(f"{path}: kaynağı olmayan terim(ler): {', '.join(kaynaksiz)}")
+    kadin = np.array([float(satirlar[t]["female"]) for t in TERMS])
+    erkek = np.array([float(satirlar[t]["male"]) for t in TERMS])
+    return kadin, erkek
+
+def _coef():
+    global _COEF
+    with _COEF_LOCK:
+        if _COEF is None:
+            _COEF = load_coef()
+        return _COEF
+
+def design(age, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr):
+    """PREVENT dönüşümleri; satır başına bir hasta, sütunlar TERMS sırasında."""
+    age, sbp, total_c, hdl_c, egfr = (np.asarray(v, dtype=float) for v in (age, sbp, total_c, hdl_c, egfr))
+    bp_tx, statin, dm, smoking = (np.asarray(v, dtype=float) for v in (bp_tx, statin, dm, smoking))
+    a       = (age - 55.0) / 10.0
+    nonhdl  = (total_c - hdl_c) * 0.02586 - 3.5
+    hdl     = (hdl_c * 0.02586 - 1.3) / 0.3
+    sbp_lo  = (np.minimum(sbp, 110.0) - 110.0) / 20.0
+    sbp_hi  = (np.maximum(sbp, 110.0) - 130.0) / 20.0
+    egfr_lo = (np.minimum(egfr, 60.0) - 60.0) / -15.0
+    egfr_hi = (np.maximum(egfr, 60.0) - 90.0) / -15.0
+    cols = (np.ones_like(a), a, nonhdl, hdl, sbp_lo, sbp_hi, dm, smoking,
+            egfr_lo, egfr_hi, bp_tx, statin, bp_tx * sbp_hi, statin * nonhdl,
+            a * nonhdl, a * hdl, a * sbp_hi, a * dm, a * smoking, a * egfr_lo)
+    return np.stack(np.broadcast_arrays(*cols), axis=-1)
+
+def chd_10y(age, male, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr, bmi=None):
+    """
+    10 yıllık CHD riski (0–1). Girdiler skaler ya da eşit uzunlukta dizi olabilir;
+    `male` 1/True erkek, 0/False kadın. BMI base modelde kullanılmaz.
+    """
+    kadin, erkek = _coef()
+    X = design(age, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr)
+    male = np.asarray(male, dtype=bool)
+    logit = np.where(male, X @ erkek, X @ kadin)
+    risk = 1.0 / (1.0 + np.exp(-logit))
+    return float(risk) if risk.ndim == 0 else risk
@@ -0,0 +1,199 @@
+import argparse, itertools, json, sys, threading, time
+from pathlib import Path
+import numpy as np
+import chd_backend
+
+# =========================================
+# Önceden hesaplanmış PREVENT CHD tablosu
+# =========================================
+# Dosya biçimi (küçük-endian):
+#   8 bayt  "VIVA10G1"
+#   4 bayt  uint32 başlık uzunluğu (JSON, 64 bayta hizalı boşluk dolgulu)
+#   JSON    {"axes": {...}, "shape": [...], "max_err": ...}
+#   veri    float32 logit(risk), C sırası:
+#           (sex, bp_tx, statin, dm, smoking, age, total_c, hdl_c, sbp, egfr)
+# PREVENT CHD temel modeli BMI kullanmaz; BMI ekseni yoktur, chd_10y bmi'yi yok sayar.
+# Logit ölçeği PREVENT terimlerinde (yaş × faktör etkileşimleri dahil) çok doğrusaldır;
+# SBP 110 ve eGFR 60 kırılımları eksenlere eklendiğinde interpolasyon hatası çok küçük kalır.
+GRID_PATH = Path(__file__).with_name("prevent_chd_grid.bin")
+MAGIC = b"VIVA10G1"
+
+BINARY_DIMS = ("sex", "bp_tx", "statin", "dm", "smoking")
+CONT_DIMS = ("age", "total_c", "hdl_c", "sbp", "egfr")
+BMI_SABIT = 25.0  # tablo üretilirken arka uca verilen (modelin kullanmadığı) BMI
+
+# prevent_chd_10y ile aynı sınırlar; knots: eksene her zaman eklenen kırılım noktaları
+DOMAIN = {
+    "age":     (30.0, 79.0, ()),
+    "total_c": (130.0, 320.0, ()),
+    "hdl_c":   (20.0, 100.0, ()),
+    "sbp":     (90.0, 180.0, (110.0,)),
+    "egfr":    (15.0, 140.0, (60.0,)),
+}
+DEFAULT_POINTS = {"age": 11, "total_c": 6, "hdl_c": 6, "sbp": 7, "egfr": 8}
+
+def make_axes(points=None):
+    points = {**DEFAULT_POINTS, **(points or {})}
+    axes = {}
+    for d in CONT_DIMS:
+        lo, hi, knots = DOMAIN[d]
+        axes[d] = np.union1d(np.linspace(lo, hi, max(2, int(points[d]))), knots)
+    return axes
+
+def _logit(p):
+    p = np.clip(np.asarray(p, dtype=float), 1e-12, 1 - 1e-12)
+    return np.log(p / (1 - p))
+
+# =========================
+# Oluşturucu (çevrim dışı)
+# =========================
+def build(path=GRID_PATH, points=None, backend="rscript", n_check=2000, log=print):
+    axes = make_axes(points)
+    shape = [2] * len(BINARY_DIMS) + [len(axes[d]) for d in CONT_DIMS]
+    mesh = np.meshgrid(*(axes[d] for d in CONT_DIMS), indexing="ij")
+    c = {d: m.ravel() for d, m in zip(CONT_DIMS, mesh)}
+    n = c["age"].size
+    log(f"Kafes: {shape} = {int(np.prod(shape))} nokta, arka uç: {backend}")
+
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    header = {"axes": {d: axes[d].tolist() for d in CONT_DIMS}, "shape": shape,
+              "backend": backend, "built": time.strftime("%Y-%m-%dT%H:%M:%S"), "max_err": None}
+    t0 = time.time()
+    with open(tmp, "wb") as f:
+        _write_header(f, header)
+        for i, (sex, bp_tx, statin, dm, smoking) in enumerate(itertools.product((0, 1), repeat=5)):
+            hatalar = {}
+            risk = chd_backend.chd_oran_toplu(
+                c["age"], np.full(n, "male" if sex else "female"), c["sbp"], np.full(n, bp_tx),
+                c["total_c"], c["hdl_c"], np.full(n, statin), np.full(n, dm), np.full(n, smoking),
+                c["egfr"], np.full(n, BMI_SABIT), hatalar=hatalar, backend=backend)
+            if hatalar:
+                log(f"  uyarı: {len(hatalar)} nokta hesaplanamadı (NaN olarak yazıldı)")
+            f.write(_logit(risk).astype("<f4").tobytes())
+            log(f"  {i + 1}/32 ({time.time() - t0:.0f} sn)")
+    tmp.replace(path)
+
+    if n_check > 0:
+        grid = ChdGrid(path)
+        err = grid.check(n_check, backend=backend)
+        grid.close()
+        header["max_err"] = err
+        with open(path, "r+b") as f:
+            _write_header(f, header, pad_to=_header_size(path))
+        log(f"En kötü mutlak interpolasyon hatası ({n_check} rastgele nokta): {err:.3g}")
+    return path
+
+def _write_header(f, header, pad_to=None):
+    raw = json.dumps(header).encode()
+    size = pad_to or (-(-(len(MAGIC) + 4 + len(raw) + 256) // 64) * 64)  # max_err için yer bırak
+    body = size - len(MAGIC) - 4
+    if len(raw) > body:
+        raise ValueError("Başlık sığmıyor.")
+    f.seek(0)
+    f.write(MAGIC + np.uint32(body).tobytes() + raw.ljust(body))
+
+def _header_size(path):
+    with open(path, "rb") as f:
+        if f.read(8) != MAGIC:
+            raise ValueError(f"{path}: VIVA10 tablo dosyası değil.")
+        return 12 + int(np.frombuffer(f.read(4), dtype="<u4")[0])
+
+# =========================
+# Çalışma zamanı: bellek eşlemeli arama
+# =========================
+class ChdGrid:
+    def __init__(self, path=GRID_PATH):
+        path = Path(path)
+        if not path.exists():
+            raise RuntimeError(f"{path} bulunamadı; önce 'python prevent_grid.py build' çalıştırın.")
+        offset = _header_size(path)
+        with open(path, "rb") as f:
+            f.seek(12)
+            self.header = json.loads(f.read(offset - 12).decode().strip())
+        if tuple(self.header["axes"]) != CONT_DIMS:
+            raise RuntimeError(f"{path} eski eksen düzeninde ({', '.join(self.header['axes'])}); "
+                               "'python prevent_grid.py build' ile yeniden oluşturun.")
+        self.axes = [np.asarray(self.header["axes"][d]) for d in CONT_DIMS]
+        self.data = np.memmap(path, dtype="<f4", mode="r", offset=offset, shape=tuple(self.header["shape"]))
+        self.max_err = self.header.get("max_err")
+
+    def chd_10y(self, age, male, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr, bmi=None):
+        """prevent_engine.chd_10y ile aynı imza (bmi yok sayılır); sürekli boyutlarda çok doğrusal interpolasyon."""
+        cont = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (age, total_c, hdl_c, sbp, egfr)))
+        shape = cont[0].shape
+        ikili = [np.broadcast_to(np.asarray(v).astype(int), shape).ravel()
+                 for v in (male, bp_tx, statin, dm, smoking)]
+        idx, w = [], []
+        for ax, x in zip(self.axes, cont):
+            x = np.clip(x.ravel(), ax[0], ax[-1])
+            i = np.clip(np.searchsorted(ax, x, side="right") - 1, 0, len(ax) - 2)
+            idx.append(i)
+            w.append((x - ax[i]) / (ax[i + 1] - ax[i]))
+        logit = np.zeros(idx[0].shape)
+        for kose in itertools.product((0, 1), repeat=len(CONT_DIMS)):
+            agirlik = np.ones_like(logit)
+            for k, t in zip(kose, w):
+                agirlik *= t if k else (1.0 - t)
+            logit += agirlik * self.data[(*ikili, *(i + k for i, k in zip(idx, kose)))]
+        risk = (1.0 / (1.0 + np.exp(-logit))).reshape(shape)
+        return float(risk) if risk.ndim == 0 else risk
+
+    def check(self, n=2000, backend="rscript", seed=0):
+        """
+        Rastgele noktalarda doğrudan hesapla karşılaştırır; en kötü mutlak farkı (0–1) döndürür.
+        Doğrudan hesaba rastgele BMI verilir: arka uç BMI'ye bağlıysa fark burada görünür.
+        """
+        rng = np.random.default_rng(seed)
+        c = {d: rng.uniform(DOMAIN[d][0], DOMAIN[d][1], n) for d in CONT_DIMS}
+        c["bmi"] = rng.uniform(18.5, 39.9, n)
+        c["age"] = np.round(c["age"])
+        b = {d: rng.integers(0, 2, n) for d in BINARY_DIMS}
+        sex = np.where(b["sex"] == 1, "male", "female")
+        hatalar = {}
+        direkt = chd_backend.chd_oran_toplu(c["age"], sex, c["sbp"], b["bp_tx"], c["total_c"], c["hdl_c"],
+                                            b["statin"], b["dm"], b["smoking"], c["egfr"], c["bmi"],
+                                            hatalar=hatalar, backend=backend)
+        tablo = self.chd_10y(c["age"], b["sex"], c["sbp"], b["bp_tx"], c["total_c"], c["hdl_c"],
+                             b["statin"], b["dm"], b["smoking"], c["egfr"])
+        return float(np.nanmax(np.abs(tablo - direkt)))
+
+    def close(self):
+        mm = getattr(self.data, "_mmap", None)
+        if mm is not None:
+            mm.close()
+
+_GRID = None
+_GRID_LOCK = threading.Lock()
+
+def get_grid(path=None):
+    global _GRID
+    with _GRID_LOCK:
+        if _GRID is None:
+            _GRID = ChdGrid(path or GRID_PATH)
+        return _GRID
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="PREVENT CHD arama tablosu oluşturma / doğrulama")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("--out", default=str(GRID_PATH))
+    b.add_argument("--backend", default="rscript", choices=[k for k in chd_backend.BATCH_BACKENDS if k != "grid"])
+    b.add_argument("--check", type=int, default=2000, help="hata ölçümü için rastgele nokta sayısı")
+    for d in CONT_DIMS:
+        b.add_argument(f"--{d}", type=int, default=DEFAULT_POINTS[d], help=f"{d} ekseni nokta sayısı")
+    c = sub.add_parser("check")
+    c.add_argument("--grid", default=str(GRID_PATH))
+    c.add_argument("--backend", default="rscript")
+    c.add_argument("-n", type=int, default=2000)
+    a = ap.parse_args(argv)
+
+    if a.cmd == "build":
+        build(a.out, {d: getattr(a, d) for d in CONT_DIMS}, a.backend, a.check)
+    else:
+        g = ChdGrid(a.grid)
+        print(f"Kayıtlı en kötü hata: {g.max_err}; şimdi ölçülen ({a.n} nokta): {g.check(a.n, a.backend):.3g}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import argparse, csv, sys
+from pathlib import Path
+import numpy as np
+import prevent_engine
+
+# =========================================
+# Python PREVENT motoru ↔ preventr parite kontrolü
+# =========================================
+# Referans: prevent_reference_export.R'ın preventr ile kaydettiği sabit ızgara
+# (tests/data/prevent_chd_reference.csv, depoya işlenir; katsayılar ondan türetilmez).
+# Aynı karşılaştırma tests/test_prevent_engine.py içinde de çalışır.
+REF_PATH = Path(__file__).with_name("tests") / "data" / "prevent_chd_reference.csv"
+TOLERANS = 1e-6  # 0–1 ölçeğinde en büyük mutlak fark
+
+def karsilastir(ref=REF_PATH):
+    """(satır sayısı, mutlak farklar dizisi) döndürür."""
+    with open(ref, newline="") as f:
+        rows = list(csv.DictReader(f))
+    if not rows:
+        raise ValueError(f"{ref}: satır yok")
+    col = lambda k: np.array([float(r[k]) for r in rows])
+    male = np.array([r["sex"] == "male" for r in rows])
+    got = prevent_engine.chd_10y(col("age"), male, col("sbp"), col("bp_tx"), col("total_c"),
+                                 col("hdl_c"), col("statin"), col("dm"), col("smoking"),
+                                 col("egfr"), col("bmi"))
+    return len(rows), np.abs(got - col("chd"))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="prevent_engine çıktısını kayıtlı preventr değerleriyle karşılaştırır.")
+    ap.add_argument("--ref", default=str(REF_PATH))
+    ap.add_argument("--tol", type=float, default=TOLERANS, help="izin verilen en büyük mutlak fark (0–1 ölçeğinde)")
+    a = ap.parse_args(argv)
+
+    n, diff = karsilastir(a.ref)
+    worst = int(np.argmax(diff))
+    print(f"{n} satır, max |fark| = {diff[worst]:.3g} (satır {worst + 2}), ortalama = {diff.mean():.3g}")
+    return 0 if diff[worst] <= a.tol else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
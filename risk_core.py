@@ -0,0 +1,680 @@
+import math
+import numpy as np
+import chd_backend
+import metrics
+import model_config
+
+# =========================================
+# VIVA10 risk hesabı çekirdeği (arayüzsüz)
+# =========================================
+# Gradio ve R'a import sırasında dokunulmaz: model_config.json ilk aktif() çağrısında okunur,
+# CHD arka ucu (R havuzu, Rscript, NumPy motoru) ilk hesapta başlatılır. Toplu işçiler,
+# ölçümler ve betikler yalnızca bu modülü import eder; app.py arayüzü ve HTTP sunucusunu
+# bunun üzerine kurar ve kullandığı adları buradan açıkça import eder.
+
+# =========================
+# 1) Yardımcı Fonksiyonlar
+# =========================
+def clamp(x, lo, hi): return max(lo, min(hi, x))
+
+def vki_hesapla_kg_m2(kilo_kg: float, boy_cm: float) -> float:
+    boy_m = boy_cm / 100.0
+    if boy_m <= 0: raise ValueError("Boy (cm) > 0 olmalı.")
+    return kilo_kg / (boy_m ** 2)
+
+def egfr_ckd_epi_2021(cinsiyet: str, yas: int, kreatinin_mg_dl: float) -> float:
+    s = (cinsiyet or "").strip().lower()
+    if s in ("erkek", "male"):
+        K = 0.9; alpha = -0.302
+    elif s in ("kadın", "kadin", "female"):
+        K = 0.7; alpha = -0.241
+    else:
+        raise ValueError("Cinsiyet 'erkek/kadın' veya 'male/female' olmalı.")
+    if yas < 18 or kreatinin_mg_dl <= 0: raise ValueError("Geçersiz yaş/kreatinin.")
+    oran = kreatinin_mg_dl / K
+    egfr = 142.0 * (min(oran, 1.0) ** alpha) * (max(oran, 1.0) ** -1.2) * (0.9938 ** yas)
+    if s in ("kadın", "kadin", "female"):
+        egfr *= 1.012
+    return egfr  # mL/dk/1.73m^2
+
+# Kategori sınırları model_config.json'da
+def chd_grup(y): return model_config.aktif().chd_grup.bul(y)
+def kanser_grup(y): return model_config.aktif().kanser_grup.bul(y)
+def chd_group_en(y): return model_config.aktif().chd_grup_en.bul(y)
+def cancer_group_en(y): return model_config.aktif().kanser_grup_en.bul(y)
+
+def _is_moderate_like(lbl: str) -> bool:
+    et = (lbl or "").strip().lower()
+    return et in {"hafif ya da orta", "hafif-orta", "hafif", "orta", "moderate"}
+
+def _is_none_like(lbl: str) -> bool:
+    et = (lbl or "").strip().lower()
+    return et in {"yok ya da yoka yakın","yok","yoka yakın","hiç","inaktif","sedanter",
+                  "none or very little","none","very little","inactive","sedentary"}
+
+def egzersiz_kategori_ve_carpanlar(siddet: str, dakika_hafta: float):
+    """
+    Kılavuz: ≥150 dk/hafta hafif-orta veya ≥75 dk/hafta ağır
+    Yüksek: kılavuzun ≥2 katı
+    Dönüş: (kategori, HR_CHD, HR_Kanser)
+    """
+    it = (siddet or "").strip().lower()
+    if _is_none_like(it):
+        return model_config.aktif().egz_sonuclari[0]
+    if not (_is_moderate_like(it) or it in {"ağır", "vigorous"}):
+        raise ValueError("Egzersiz 'yok ya da yoka yakın/none', 'hafif ya da orta/moderate' veya 'ağır/vigorous' olmalı.")
+    m = max(0.0, float(dakika_hafta or 0))
+    model = model_config.aktif()
+    # Süre eşikleri ve HR'ler model_config.json "egzersiz" altında
+    return model.egz_sonuclari[(model.egz_hafif_orta if _is_moderate_like(it) else model.egz_agir).bul(m)]
+
+def yok_var_to01(v: str) -> int:
+    s = (v or "").strip().lower()
+    return 1 if s in ("var","yes") else 0  # 'yok'/'no' -> 0
+
+# =========================
+# 2) PREVENT-CHD (R arka ucu)
+# =========================
+def _prevent_girdileri(cinsiyet_val, yas, total_chol, hdl, sbp, bp_ilac_01, sigara_01, diyabet_01, statin_01, vki, egfr):
+    yas        = int(clamp(yas, 30, 79))
+    total_chol = float(clamp(total_chol, 130, 320))
+    hdl        = float(clamp(hdl, 20, 100))
+    sbp        = float(clamp(sbp, 90, 180))
+    egfr       = float(clamp(egfr, 15, 140))
+    vki        = float(clamp(vki, 18.5, 39.9))
+    sex = "male" if (cinsiyet_val or "").strip().lower() in ("erkek","male") else "female"
+    # chd_backend sırası: yas, sex, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr, bmi
+    return (yas, sex, sbp, bp_ilac_01, total_chol, hdl, statin_01, diyabet_01, sigara_01, egfr, vki)
+
+def _yuzde(chd_oran_0_1):
+    if math.isnan(chd_oran_0_1):
+        raise chd_backend.ChdBackendError("R dönen değer NaN.")
+    return clamp(chd_oran_0_1 * 100.0, 0.0, 100.0)
+
+def prevent_chd_10y(cinsiyet_val, yas, total_chol, hdl, sbp, bp_ilac_01, sigara_01, diyabet_01, statin_01, vki, egfr):
+    # Arka uç: VIVA10_CHD_BACKEND (varsayılan kalıcı R işçi havuzu)
+    return _yuzde(chd_backend.chd_oran(*_prevent_girdileri(
+        cinsiyet_val, yas, total_chol, hdl, sbp, bp_ilac_01, sigara_01, diyabet_01, statin_01, vki, egfr)))
+
+async def prevent_chd_10y_async(cinsiyet_val, yas, total_chol, hdl, sbp, bp_ilac_01, sigara_01, diyabet_01, statin_01, vki, egfr):
+    # Olay döngüsünü bloklamaz; eşzamanlılık sınırı / zaman aşımı / iptal chd_backend'de
+    return _yuzde(await chd_backend.chd_oran_async(*_prevent_girdileri(
+        cinsiyet_val, yas, total_chol, hdl, sbp, bp_ilac_01, sigara_01, diyabet_01, statin_01, vki, egfr)))
+
+def prevent_chd_10y_batch(cinsiyet_val, yas, total_chol, hdl, sbp, bp_ilac_01, sigara_01, diyabet_01, statin_01, vki, egfr,
+                          hatalar=None):
+    """
+    prevent_chd_10y'nin dizi sürümü: aynı kısıtlar, tek arka uç çağrısı, % dizisi döner.
+    hatalar (dict) verilirse hatalı satırlar NaN kalır ve mesajları {indeks: mesaj} olarak yazılır.
+    """
+    yas        = np.trunc(np.clip(np.asarray(yas, dtype=float), 30, 79))
+    total_chol = np.clip(np.asarray(total_chol, dtype=float), 130, 320)
+    hdl        = np.clip(np.asarray(hdl, dtype=float), 20, 100)
+    sbp        = np.clip(np.asarray(sbp, dtype=float), 90, 180)
+    egfr       = np.clip(np.asarray(egfr, dtype=float), 15, 140)
+    vki        = np.clip(np.asarray(vki, dtype=float), 18.5, 39.9)
+    sex = np.where(_erkek_mi_v(cinsiyet_val), "male", "female")
+
+    chd_oran_0_1 = chd_backend.chd_oran_toplu(yas, sex, sbp, bp_ilac_01, total_chol, hdl,
+                                              statin_01, diyabet_01, sigara_01, egfr, vki,
+                                              hatalar=hatalar)
+    if hatalar is None and np.isnan(chd_oran_0_1).any():
+        raise chd_backend.ChdBackendError("R dönen değer NaN.")
+    return np.clip(chd_oran_0_1 * 100.0, 0.0, 100.0)
+
+# =======================================
+# 3) Meta-analiz temelli Kanser Riski
+# =======================================
+# Yaş bantları, eşikler ve HR'ler model_config.json'dan (kanser_taban, hr_* anahtarları)
+def kanser_taban(cinsiyet_val, yas):
+    m = model_config.aktif()
+    c = (cinsiyet_val or "").strip().lower()
+    return (m.kanser_taban_erkek if c in ("erkek","male") else m.kanser_taban_kadin).bul(yas)
+
+def hr_bmi_cancer(bmi: float) -> float:
+    # ≥25 kg/m² üzerindeki her +5 kg/m² için ×1.10
+    return model_config.aktif().hr_bmi_kanser.carpan(bmi)
+
+def hr_alkol(haftalik_ic):
+    return model_config.aktif().hr_alkol_kanser.bul(max(0, float(haftalik_ic)))
+
+def hr_sigara(sigara_01):
+    return model_config.aktif().hr_sigara_kanser if int(sigara_01) == 1 else 1.00
+
+def hr_egzersiz(kategori: str):
+    m = model_config.aktif()
+    k = m.egz_kategori_indeks.get((kategori or "").strip().lower(), 0)  # bilinmeyen -> yetersiz
+    return m.egz_sonuclari[k][2]
+
+def kanser_riski_meta(cinsiyet_val, yas, bmi, aile_01, alkol_hafta, sigara_01, egzersiz_kategori):
+    m = model_config.aktif()
+    temel = kanser_taban(cinsiyet_val, yas)
+    risk = (temel
+            * hr_bmi_cancer(bmi)
+            * hr_alkol(alkol_hafta)
+            * hr_sigara(sigara_01)
+            * hr_egzersiz(egzersiz_kategori))
+    if int(aile_01) == 1:
+        risk *= m.aile_kanser_carpani   # yakın akraba öyküsü → ×2
+    return min(risk, m.tavan_kanser)  # demo güvenli tavan
+
+# =======================================
+# 4) CHD Post-hoc Modifikasyonlar
+# =======================================
+# Alkol sonrası ve nihai CHD tavanları: model_config.json "tavanlar"
+def hr_bmi_chd(bmi: float) -> float:
+    # 25 kg/m² üzerindeki her +5 kg/m² için ×1.16; altı için 1.00
+    return model_config.aktif().hr_bmi_chd.carpan(bmi)
+
+def hr_alkol_chd(units_per_week: float) -> float:
+    # Eşik aralıklarında SABİT katsayı
+    return model_config.aktif().hr_alkol_chd.bul(max(0.0, float(units_per_week)))
+
+# =======================================
+# 5) Girdi hazırlama ve post-hoc hattı
+# =======================================
+def girdileri_hazirla(cinsiyet, yas, kilo, boy_cm, total_chol, hdl, sbp, kreatinin,
+                      bp_ilac, sigara, diyabet, statin, aile_kanser, alkol_hafta,
+                      egzersiz_seviyesi, egzersiz_dk):
+    """Kısıtlar, 0/1 dönüşümleri ve türevler (BMI, eGFR)."""
+    with metrics.span("clamp"):
+        # Kısıtlar
+        yas = int(clamp(yas, 30, 79))
+        kilo = float(clamp(kilo, 35, 200))
+        boy_cm = float(clamp(boy_cm, 120, 210))
+        total_chol = float(clamp(total_chol, 130, 320))
+        hdl = float(clamp(hdl, 20, 100))
+        sbp = float(clamp(sbp, 90, 180))
+        kreatinin = float(clamp(kreatinin, 0.30, 2.50))
+        alkol_hafta = float(clamp(alkol_hafta, 0, 35))
+
+        # Egzersiz süresi
+        if _is_none_like(egzersiz_seviyesi):
+            egzersiz_dk = 0.0
+        else:
+            egzersiz_dk = float(clamp(egzersiz_dk, 0, 600))
+
+        # yok/var & no/yes → 0/1
+        bp_ilac_01  = yok_var_to01(bp_ilac)
+        sigara_01   = yok_var_to01(sigara)
+        diyabet_01  = yok_var_to01(diyabet)
+        statin_01   = yok_var_to01(statin)
+        aile_01     = yok_var_to01(aile_kanser)
+
+    # Türevler
+    with metrics.span("bmi"):
+        bmi = vki_hesapla_kg_m2(kilo, boy_cm)
+    with metrics.span("egfr"):
+        egfr = clamp(egfr_ckd_epi_2021(cinsiyet, yas, kreatinin), 15, 140)
+
+    return dict(cinsiyet=cinsiyet, yas=yas, kilo=kilo, boy_cm=boy_cm, total_chol=total_chol,
+                hdl=hdl, sbp=sbp, kreatinin=kreatinin, alkol_hafta=alkol_hafta,
+                egzersiz_seviyesi=egzersiz_seviyesi, egzersiz_dk=egzersiz_dk,
+                bp_ilac_01=bp_ilac_01, sigara_01=sigara_01, diyabet_01=diyabet_01,
+                statin_01=statin_01, aile_01=aile_01, bmi=bmi, egfr=egfr)
+
+def prevent_argumanlari(g):
+    return (g["cinsiyet"], g["yas"], g["total_chol"], g["hdl"], g["sbp"], g["bp_ilac_01"],
+            g["sigara_01"], g["diyabet_01"], g["statin_01"], g["bmi"], g["egfr"])
+
+def posthoc_hesapla(g, chd10_taban):
+    """PREVENT tabanı (0–100 %) üzerine CHD post-hoc çarpanları ve kanser riski."""
+    m = model_config.aktif()
+    bmi, alkol_hafta = g["bmi"], g["alkol_hafta"]
+
+    # ---- CHD Post-hoc: BMI ----
+    chd10_after_bmi = chd10_taban * hr_bmi_chd(bmi)
+
+    # ---- CHD Post-hoc: Alcohol (stepwise) + CAP at 45% ----
+    chd10_after_alcohol_raw = chd10_after_bmi * hr_alkol_chd(alkol_hafta)
+    chd10_after_alcohol = min(chd10_after_alcohol_raw, m.tavan_chd_alkol)
+
+    # Egzersiz kategorisi → HR'ler (CHD ve Kanser için ayrı)
+    kategori, hr_chd_ex, hr_kans = egzersiz_kategori_ve_carpanlar(g["egzersiz_seviyesi"], g["egzersiz_dk"])
+
+    # Egzersizi CHD'ye uygula ve genel sınırla
+    chd10_duz  = clamp(chd10_after_alcohol * hr_chd_ex, 0.0, 100.0)
+    # Nihai CHD sert tavan
+    chd10_duz = min(chd10_duz, m.tavan_chd)
+
+    # Kanser (BMI etkisi sürekli)
+    kanser_duz = kanser_riski_meta(g["cinsiyet"], g["yas"], bmi, g["aile_01"], alkol_hafta,
+                                   g["sigara_01"], kategori)
+
+    return dict(chd10_taban=chd10_taban, chd10_after_bmi=chd10_after_bmi,
+                chd10_after_alcohol=chd10_after_alcohol, egzersiz_kategori=kategori,
+                chd10=chd10_duz, kanser10=kanser_duz)
+
+# =======================================
+# 6) Kohort (toplu) skorlama — NumPy
+# =======================================
+# Skaler fonksiyonların dizi karşılıkları; eşikler ve katsayılar aynı derlenmiş modelden
+# (model_config) okunur, kırılım aramaları aynı Basamak nesneleriyle yapılır.
+def _norm_v(v):
+    return np.char.lower(np.char.strip(np.asarray(v, dtype=str)))
+
+def _erkek_mi_v(cinsiyet):
+    return np.isin(_norm_v(cinsiyet), ("erkek", "male"))
+
+def cinsiyet_gecerli_v(cinsiyet):
+    return np.isin(_norm_v(cinsiyet), ("erkek", "male", "kadın", "kadin", "female"))
+
+def yok_var_to01_v(v):
+    return np.isin(_norm_v(v), ("var", "yes")).astype(int)
+
+def vki_hesapla_kg_m2_v(kilo_kg, boy_cm):
+    boy_m = np.asarray(boy_cm, dtype=float) / 100.0
+    if (boy_m <= 0).any(): raise ValueError("Boy (cm) > 0 olmalı.")
+    return np.asarray(kilo_kg, dtype=float) / (boy_m ** 2)
+
+def egfr_ckd_epi_2021_v(cinsiyet, yas, kreatinin_mg_dl):
+    s = _norm_v(cinsiyet)
+    erkek = np.isin(s, ("erkek", "male"))
+    kadin = np.isin(s, ("kadın", "kadin", "female"))
+    if not (erkek | kadin).all():
+        raise ValueError("Cinsiyet 'erkek/kadın' veya 'male/female' olmalı.")
+    yas = np.asarray(yas, dtype=float)
+    kreatinin_mg_dl = np.asarray(kreatinin_mg_dl, dtype=float)
+    if (yas < 18).any() or (kreatinin_mg_dl <= 0).any(): raise ValueError("Geçersiz yaş/kreatinin.")
+    K = np.where(erkek, 0.9, 0.7)
+    alpha = np.where(erkek, -0.302, -0.241)
+    oran = kreatinin_mg_dl / K
+    egfr = 142.0 * (np.minimum(oran, 1.0) ** alpha) * (np.maximum(oran, 1.0) ** -1.2) * (0.9938 ** yas)
+    return np.where(kadin, egfr * 1.012, egfr)
+
+def egzersiz_kod_v(siddet, hata=True):
+    """0: yok/yetersiz, 1: hafif-orta, 2: ağır; hata=False ise tanınmayan etiketler -1 kalır."""
+    it = _norm_v(siddet)
+    kod = np.full(it.shape, -1, dtype=int)
+    for deger in np.unique(it):
+        if _is_none_like(deger):   k = 0
+        elif _is_moderate_like(deger): k = 1
+        elif deger in {"ağır", "vigorous"}: k = 2
+        elif not hata: continue
+        else:
+            raise ValueError("Egzersiz 'yok ya da yoka yakın/none', 'hafif ya da orta/moderate' veya 'ağır/vigorous' olmalı.")
+        kod[it == deger] = k
+    return kod
+
+def egzersiz_kategori_ve_carpanlar_v(kod, dakika_hafta):
+    """Dönüş: (kategori indeksi 0/1/2, HR_CHD, HR_Kanser) dizileri"""
+    m = model_config.aktif()
+    dk = np.maximum(0.0, np.nan_to_num(np.asarray(dakika_hafta, dtype=float)))
+    kat = np.where(kod == 1, m.egz_hafif_orta.indeks_v(dk), m.egz_agir.indeks_v(dk))
+    kat = np.where(kod == 0, 0, kat)
+    return kat, m.egz_hr_chd[kat], m.egz_hr_kanser[kat]
+
+def hr_bmi_chd_v(bmi):
+    return model_config.aktif().hr_bmi_chd.carpan_v(bmi)
+
+def hr_bmi_cancer_v(bmi):
+    return model_config.aktif().hr_bmi_kanser.carpan_v(bmi)
+
+def hr_alkol_chd_v(units_per_week):
+    return model_config.aktif().hr_alkol_chd.bul_v(np.maximum(0.0, np.asarray(units_per_week, dtype=float)))
+
+def hr_alkol_v(haftalik_ic):
+    return model_config.aktif().hr_alkol_kanser.bul_v(np.maximum(0.0, np.asarray(haftalik_ic, dtype=float)))
+
+def kanser_taban_v(cinsiyet_val, yas):
+    m = model_config.aktif()
+    yas = np.asarray(yas, dtype=float)
+    return np.where(_erkek_mi_v(cinsiyet_val), m.kanser_taban_erkek.bul_v(yas), m.kanser_taban_kadin.bul_v(yas))
+
+def kanser_riski_meta_v(cinsiyet_val, yas, bmi, aile_01, alkol_hafta, sigara_01, hr_kanser_egz):
+    m = model_config.aktif()
+    risk = (kanser_taban_v(cinsiyet_val, yas)
+            * hr_bmi_cancer_v(bmi)
+            * hr_alkol_v(alkol_hafta)
+            * np.where(np.asarray(sigara_01) == 1, m.hr_sigara_kanser, 1.00)
+            * hr_kanser_egz)
+    risk = np.where(np.asarray(aile_01) == 1, risk * m.aile_kanser_carpani, risk)
+    return np.minimum(risk, m.tavan_kanser)
+
+KOHORT_SUTUNLARI = ("cinsiyet", "yas", "kilo", "boy_cm", "total_chol", "hdl", "sbp", "kreatinin",
+                    "bp_ilac", "sigara", "diyabet", "statin", "aile_kanser", "alkol_hafta",
+                    "egzersiz_seviyesi", "egzersiz_dk")
+
+@model_config.sabit
+def hesapla_toplu(veri, hatalar=None):
+    """
+    `hesapla` ile aynı hesap hattı, tek geçişte N kişi için.
+    veri: KOHORT_SUTUNLARI adlarıyla sütun eşlemesi (dict of arrays, pandas.DataFrame vb.)
+    hatalar: verilirse CHD arka ucu satır hataları {indeks: mesaj} olarak yazılır (satır NaN kalır).
+    Dönüş: ara aşamalar dahil NumPy dizilerinden oluşan dict (+ model_version: str).
+    """
+    eksik = [k for k in KOHORT_SUTUNLARI if k not in veri]
+    if eksik:
+        raise ValueError(f"Eksik sütun(lar): {', '.join(eksik)}")
+    col = lambda k: np.asarray(veri[k])
+    cinsiyet = col("cinsiyet")
+
+    m = model_config.aktif()
+
+    # Kısıtlar
+    yas        = np.trunc(np.clip(col("yas").astype(float), 30, 79))
+    kilo       = np.clip(col("kilo").astype(float), 35, 200)
+    boy_cm     = np.clip(col("boy_cm").astype(float), 120, 210)
+    total_chol = np.clip(col("total_chol").astype(float), 130, 320)
+    hdl        = np.clip(col("hdl").astype(float), 20, 100)
+    sbp        = np.clip(col("sbp").astype(float), 90, 180)
+    kreatinin  = np.clip(col("kreatinin").astype(float), 0.30, 2.50)
+    alkol_hafta = np.clip(col("alkol_hafta").astype(float), 0, 35)
+
+    egz_kod = egzersiz_kod_v(col("egzersiz_seviyesi"))
+    egzersiz_dk = np.where(egz_kod == 0, 0.0, np.clip(col("egzersiz_dk").astype(float), 0, 600))
+
+    bp_ilac_01 = yok_var_to01_v(col("bp_ilac"))
+    sigara_01  = yok_var_to01_v(col("sigara"))
+    diyabet_01 = yok_var_to01_v(col("diyabet"))
+    statin_01  = yok_var_to01_v(col("statin"))
+    aile_01    = yok_var_to01_v(col("aile_kanser"))
+
+    # Türevler
+    bmi  = vki_hesapla_kg_m2_v(kilo, boy_cm)
+    egfr = np.clip(egfr_ckd_epi_2021_v(cinsiyet, yas, kreatinin), 15, 140)
+
+    chd10_taban = prevent_chd_10y_batch(cinsiyet, yas, total_chol, hdl, sbp, bp_ilac_01,
+                                        sigara_01, diyabet_01, statin_01, bmi, egfr, hatalar=hatalar)
+    chd10_after_bmi = chd10_taban * hr_bmi_chd_v(bmi)
+    chd10_after_alcohol = np.minimum(chd10_after_bmi * hr_alkol_chd_v(alkol_hafta), m.tavan_chd_alkol)
+    kat, hr_chd_ex, hr_kans = egzersiz_kategori_ve_carpanlar_v(egz_kod, egzersiz_dk)
+    chd10_duz = np.minimum(np.clip(chd10_after_alcohol * hr_chd_ex, 0.0, 100.0), m.tavan_chd)
+
+    kanser_duz = kanser_riski_meta_v(cinsiyet, yas, bmi, aile_01, alkol_hafta, sigara_01, hr_kans)
+
+    return {
+        "bmi": bmi,
+        "egfr": egfr,
+        "chd10_taban": chd10_taban,
+        "chd10_after_bmi": chd10_after_bmi,
+        "chd10_after_alcohol": chd10_after_alcohol,
+        "egzersiz_kategori": m.egz_kategoriler[kat],
+        "chd10": chd10_duz,
+        "kanser10": kanser_duz,
+        "model_version": m.version,
+    }
+
+# Kayıt (satır sözlüğü) parçaları: score_cli, cohort_store ve cohort_parallel işçileri ortak kullanır.
+KAYIT_SONUC_SUTUNLARI = ("bmi", "egfr", "chd10_taban", "chd10_after_bmi", "chd10_after_alcohol",
+                         "egzersiz_kategori", "chd10", "kanser10", "model_version", "error")
+KAYIT_SAYISAL = {"yas", "kilo", "boy_cm", "total_chol", "hdl", "sbp", "kreatinin", "alkol_hafta", "egzersiz_dk"}
+
+def _sayi_v(degerler):
+    """Sütun -> (float dizisi, çözülemeyen maskesi); boş değerler NaN olur."""
+    try:
+        return np.asarray(degerler, dtype=float), np.zeros(len(degerler), dtype=bool)
+    except (TypeError, ValueError):
+        pass
+    x = np.full(len(degerler), np.nan)
+    kotu = np.zeros(len(degerler), dtype=bool)
+    for i, v in enumerate(degerler):
+        if v is None or (isinstance(v, str) and not v.strip()):
+            continue
+        try:
+            x[i] = float(v)
+        except (TypeError, ValueError):
+            kotu[i] = True
+    return x, kotu
+
+def _kayit_sutunlari(kayitlar, hatalar):
+    """
+    Parçayı sütun dizilerine çevirir ve geçersiz satırları dizi maskeleriyle bulur
+    (hesapla ile aynı kurallar); her satırın ilk hatası `hatalar`a yazılır.
+    """
+    def isaretle(maske, mesaj):
+        for i in np.flatnonzero(maske):
+            hatalar.setdefault(int(i), mesaj)
+
+    veri = {}
+    for k in KOHORT_SUTUNLARI:
+        ham = [r.get(k) for r in kayitlar]
+        if k not in KAYIT_SAYISAL:
+            veri[k] = np.array(["" if v is None else str(v) for v in ham])
+            continue
+        x, kotu = _sayi_v(ham)
+        isaretle(kotu, f"ValueError: '{k}' sayı değil")
+        if k == "egzersiz_dk":
+            x = np.where(np.isnan(x), 0.0, x)
+        isaretle(~np.isfinite(x) & ~kotu, f"ValueError: '{k}' boş")
+        veri[k] = x
+    isaretle(~cinsiyet_gecerli_v(veri["cinsiyet"]),
+             "ValueError: Cinsiyet 'erkek/kadın' veya 'male/female' olmalı.")
+    isaretle(egzersiz_kod_v(veri["egzersiz_seviyesi"], hata=False) < 0,
+             "ValueError: Egzersiz 'yok ya da yoka yakın/none', 'hafif ya da orta/moderate' veya 'ağır/vigorous' olmalı.")
+    return veri
+
+def skorla_parca(kayitlar):
+    """
+    Kayıt listesi -> (aynı sırada sonuç sözlükleri, hatalı satır sayısı). Satırlar önce hesapla
+    ile aynı kurallarla sütun dizileri üzerinde doğrulanır (geçersizler `error` alır), geçerliler
+    hesapla_toplu'ya tek partide gider; CHD arka ucunun satır hataları da `error` sütununa düşer.
+    """
+    hatalar = {}
+    veri = _kayit_sutunlari(kayitlar, hatalar)
+    gecerli = [i for i in range(len(kayitlar)) if i not in hatalar]
+
+    sonuc = {}
+    if gecerli:
+        veri = {k: v[gecerli] for k, v in veri.items()}
+        chd_hatalari = {}
+        try:
+            sonuc = hesapla_toplu(veri, hatalar=chd_hatalari)
+        except Exception as e:  # arka uç tamamen başarısız: parçadaki tüm geçerli satırlar hatalı
+            for i in gecerli:
+                hatalar[i] = f"{type(e).__name__}: {e}"
+            gecerli = []
+        else:
+            for j, mesaj in chd_hatalari.items():
+                hatalar[gecerli[j]] = mesaj
+
+    out = [dict(r) for r in kayitlar]
+    for j, i in enumerate(gecerli):
+        if i in hatalar:
+            continue
+        for k in KAYIT_SONUC_SUTUNLARI[:-2]:
+            v = sonuc[k][j]
+            out[i][k] = v.item() if hasattr(v, "item") else v
+        out[i]["model_version"] = sonuc["model_version"]
+        out[i]["error"] = ""
+    for i, mesaj in hatalar.items():
+        out[i].update({k: None for k in KAYIT_SONUC_SUTUNLARI[:-1]}, error=mesaj)
+    return out, len(hatalar)
+
+# =======================================
+# 7) Yapısal skor (UI'siz JSON API çekirdeği)
+# =======================================
+# hesapla ile aynı hat; markdown/yerelleştirme yerine sayısal aşamalar döner.
+# Eksik alanlar arayüzün varsayılan değerleriyle doldurulur.
+SKOR_VARSAYILAN = dict(cinsiyet="erkek", yas=55, kilo=80.0, boy_cm=175.0, total_chol=200, hdl=50,
+                       sbp=120, kreatinin=0.90, bp_ilac="yok", sigara="yok", diyabet="yok",
+                       statin="yok", aile_kanser="yok", alkol_hafta=0,
+                       egzersiz_seviyesi="yok ya da yoka yakın", egzersiz_dk=0)
+
+def _skor_girdileri(girdi):
+    bilinmeyen = sorted(set(girdi) - set(SKOR_VARSAYILAN))
+    if bilinmeyen:
+        raise ValueError(f"Bilinmeyen alan(lar): {', '.join(bilinmeyen)}")
+    return girdileri_hazirla(**{**SKOR_VARSAYILAN, **girdi})
+
+SKOR_GIRDI_ALANLARI = ("cinsiyet", "yas", "kilo", "boy_cm", "total_chol", "hdl", "sbp",
+                       "kreatinin", "alkol_hafta", "egzersiz_seviyesi", "egzersiz_dk",
+                       "bp_ilac_01", "sigara_01", "diyabet_01", "statin_01", "aile_01")
+
+def _skor_sozlugu(g, s):
+    return {
+        "inputs": {k: g[k] for k in SKOR_GIRDI_ALANLARI},
+        "bmi": g["bmi"],
+        "egfr": g["egfr"],
+        **s,
+        "chd_grup": chd_grup(s["chd10"]),
+        "kanser_grup": kanser_grup(s["kanser10"]),
+        "chd_group_en": chd_group_en(s["chd10"]),
+        "cancer_group_en": cancer_group_en(s["kanser10"]),
+        "model_version": model_config.aktif().version,
+    }
+
+def _skor_sonucu(g, chd10_taban):
+    with metrics.span("posthoc"):
+        return _skor_sozlugu(g, posthoc_hesapla(g, chd10_taban))
+
+@model_config.sabit
+def skorla(**girdi):
+    """Tek kişi için yapısal sonuç (dict): BMI, eGFR, CHD taban ve post-hoc aşamaları, kanser, kategoriler."""
+    g = _skor_girdileri(girdi)
+    with metrics.span("prevent"):
+        chd10_taban = prevent_chd_10y(*prevent_argumanlari(g))
+    return _skor_sonucu(g, chd10_taban)
+
+@model_config.sabit
+async def skorla_async(**girdi):
+    g = _skor_girdileri(girdi)
+    with metrics.span("prevent"):
+        chd10_taban = await prevent_chd_10y_async(*prevent_argumanlari(g))
+    return _skor_sonucu(g, chd10_taban)
+
+@model_config.sabit
+def skorla_toplu(kayitlar):
+    """
+    Kayıt listesi -> hesapla_toplu ile tek geçiş -> kayıt başına sonuç dict listesi.
+    Yanıt biçimi skorla ile aynıdır (`inputs` dahil).
+    """
+    girdiler = [{k: g[k] for k in SKOR_GIRDI_ALANLARI} for g in map(_skor_girdileri, kayitlar)]
+    veri = {k: [r.get(k, SKOR_VARSAYILAN[k]) for r in kayitlar] for k in KOHORT_SUTUNLARI}
+    sonuc = hesapla_toplu(veri)
+    surum = sonuc.pop("model_version")
+    chd, kanser = sonuc["chd10"], sonuc["kanser10"]
+    m = model_config.aktif()
+    sonuc["chd_grup"] = m.chd_grup.bul_v(chd)
+    sonuc["kanser_grup"] = m.kanser_grup.bul_v(kanser)
+    sonuc["chd_group_en"] = m.chd_grup_en.bul_v(chd)
+    sonuc["cancer_group_en"] = m.kanser_grup_en.bul_v(kanser)
+    return [{"inputs": girdiler[i], **{k: v[i].item() for k, v in sonuc.items()}, "model_version": surum}
+            for i in range(len(kayitlar))]
+
+# =======================================
+# 8) Ne olursa? — risk azaltma senaryoları
+# =======================================
+# Tek kişi için karşı-olgusal girdiler üretilir. PREVENT girdisini değiştiren senaryolar
+# (sigara, VKİ) tabanla birlikte tek toplu arka uç çağrısında hesaplanır; yalnızca post-hoc
+# çarpanlarını etkileyenler (alkol, egzersiz) aynı PREVENT tabanını yeniden kullanır.
+def senaryolari_olustur(g):
+    """girdileri_hazirla çıktısı -> [(ad_tr, ad_en, değişen alanlar)]"""
+    out = []
+    if g["sigara_01"] == 1:
+        out.append(("Sigarayı bırakma", "Quit smoking", {"sigara_01": 0}))
+
+    kategori, _, _ = egzersiz_kategori_ve_carpanlar(g["egzersiz_seviyesi"], g["egzersiz_dk"])
+    if kategori != "yüksek":
+        agir = (g["egzersiz_seviyesi"] or "").strip().lower() in {"ağır", "vigorous"}
+        siddet = "ağır" if agir else "hafif ya da orta"
+        if kategori == "yetersiz":
+            dk = 75.0 if agir else 150.0
+            tr, en = "kılavuz düzeyine", "guideline level"
+        else:
+            dk = 150.0 if agir else 300.0
+            tr, en = "yüksek düzeye", "high level"
+        out.append((f"Egzersizi {tr} çıkarma ({siddet}, {dk:.0f} dk/hafta)",
+                    f"Exercise to {en} ({'vigorous' if agir else 'moderate'}, {dk:.0f} min/week)",
+                    {"egzersiz_seviyesi": siddet, "egzersiz_dk": dk}))
+
+    m = model_config.aktif()
+    for esik in reversed(m.hr_alkol_chd.esikler.tolist()):  # hr_alkol_chd kırılımları, büyükten küçüğe
+        esik = int(esik)
+        if g["alkol_hafta"] >= esik:
+            out.append((f"Alkolü haftada {esik - 1} içkiye indirme", f"Cut alcohol to {esik - 1} drinks/week",
+                        {"alkol_hafta": float(esik - 1)}))
+
+    hedef = m.hr_bmi_chd.referans
+    if g["bmi"] > hedef:
+        kilo = hedef * (g["boy_cm"] / 100.0) ** 2
+        out.append((f"VKİ {hedef:g}'e inme (≈{kilo:.1f} kg)", f"Reach BMI {hedef:g} (≈{kilo:.1f} kg)",
+                    {"kilo": kilo, "bmi": hedef}))
+
+    if len(out) > 1:
+        hepsi = {}
+        for _, _, d in out:
+            hepsi.update(d)  # alkol senaryoları büyükten küçüğe: en düşük hedef kalır
+        out.append(("Hepsi birlikte", "All of the above", hepsi))
+    return out
+
+@model_config.sabit
+def senaryo_tablosu(g, chd10_taban=None):
+    """
+    (mevcut durum, senaryo satırları). Satırlar toplam mutlak azalmaya (CHD + kanser, % puan)
+    göre büyükten küçüğe sıralıdır. chd10_taban verilirse mevcut durum için yeniden hesaplanmaz.
+    """
+    senaryolar = senaryolari_olustur(g)
+    girdiler = [g] + [{**g, **d} for _, _, d in senaryolar]
+    anahtarlar = [prevent_argumanlari(x) for x in girdiler]
+    bilinen = {anahtarlar[0]: chd10_taban} if chd10_taban is not None else {}
+    eksik = [k for k in dict.fromkeys(anahtarlar) if k not in bilinen]
+    with metrics.span("prevent"):
+        if len(eksik) == 1:
+            bilinen[eksik[0]] = prevent_chd_10y(*eksik[0])  # önbellekli skaler yol
+        elif eksik:
+            bilinen.update(zip(eksik, prevent_chd_10y_batch(*(list(c) for c in zip(*eksik))).tolist()))
+
+    with metrics.span("posthoc"):
+        s0 = posthoc_hesapla(g, bilinen[anahtarlar[0]])
+        satirlar = []
+        for (tr, en, d), x, k in zip(senaryolar, girdiler[1:], anahtarlar[1:]):
+            s = posthoc_hesapla(x, bilinen[k])
+            satirlar.append({"senaryo": tr, "scenario": en, "degisiklik": d,
+                             "chd10": s["chd10"], "kanser10": s["kanser10"],
+                             "chd_azalma": s0["chd10"] - s["chd10"],
+                             "kanser_azalma": s0["kanser10"] - s["kanser10"]})
+    satirlar.sort(key=lambda r: -(r["chd_azalma"] + r["kanser_azalma"]))
+    return s0, satirlar
+
+@model_config.sabit
+def skorla_senaryolar(**girdi):
+    """skorla ile aynı girdi; {"base": skorla sonucu, "scenarios": sıralı senaryo listesi}."""
+    g = _skor_girdileri(girdi)
+    s0, satirlar = senaryo_tablosu(g)
+    return {"base": _skor_sozlugu(g, s0), "scenarios": satirlar}
+
+# =======================================
+# 9) Risk eğrileri (yaş / SBP / total kolesterol)
+# =======================================
+# Diğer girdiler sabitken tek bir eksen taranır: yaş (şimdiki yaştan 79'a), SBP ve total
+# kolesterol (arayüz aralıkları). Tüm eksenlerin noktaları tek tabloda birleştirilip
+# hesapla_toplu ile tek geçişte (tek toplu arka uç çağrısı) hesaplanır; yaşla değişen eGFR,
+# kanser taban yaş bantları ve post-hoc çarpanlar dizi yolundan gelir.
+# Hastanın kendi değeri her eğride bir nokta olarak yer alır.
+EGRI_EKSENLERI = {"yas": (None, 79, 1), "sbp": (90, 180, 5), "total_chol": (130, 320, 10)}  # (alt, üst, adım)
+
+def egri_noktalari(g, eksen):
+    alt, ust, adim = EGRI_EKSENLERI[eksen]
+    simdi = g[eksen]
+    return np.union1d(np.arange(simdi if alt is None else alt, ust + adim / 2, adim), [simdi])
+
+@model_config.sabit
+def risk_egrileri(eksenler=tuple(EGRI_EKSENLERI), **girdi):
+    """
+    skorla ile aynı girdi. Eksen başına çizime hazır seriler:
+    {"x", "chd10_taban", "chd10", "kanser10"} listeleri ve hastanın mevcut değeri ("current").
+    """
+    bilinmeyen = [e for e in eksenler if e not in EGRI_EKSENLERI]
+    if bilinmeyen:
+        raise ValueError(f"Bilinmeyen eksen(ler): {', '.join(bilinmeyen)} ({', '.join(EGRI_EKSENLERI)})")
+    g = _skor_girdileri(girdi)
+    kayit = {**SKOR_VARSAYILAN, **girdi}
+    noktalar = {e: egri_noktalari(g, e) for e in dict.fromkeys(eksenler)}
+    n = sum(len(x) for x in noktalar.values())
+
+    veri = {k: np.full(n, kayit[k]) for k in KOHORT_SUTUNLARI}
+    dilimler = {}
+    i = 0
+    for e, x in noktalar.items():
+        dilimler[e] = slice(i, i + len(x))
+        veri[e] = veri[e].astype(float)
+        veri[e][dilimler[e]] = x
+        i += len(x)
+    with metrics.span("trajectory"):
+        s = hesapla_toplu(veri)
+
+    egriler = {e: {"x": noktalar[e].tolist(), "current": g[e],
+                   **{k: s[k][d].tolist() for k in ("chd10_taban", "chd10", "kanser10")}}
+               for e, d in dilimler.items()}
+    return {"curves": egriler, "model_version": s["model_version"]}
@@ -0,0 +1,232 @@
+import argparse, collections, csv, itertools, json, sys, time
+from pathlib import Path
+import risk_core  # arayüz (Gradio) yüklenmez
+
+# =========================================
+# Büyük kayıt dosyaları için akışlı toplu skorlama
+# =========================================
+# Örnek:
+#   python score_cli.py hastalar.csv sonuc.csv --chunk 20000
+#   python score_cli.py kayit.parquet sonuc_parquet/ --resume
+# Girdi sütunları risk_core.KOHORT_SUTUNLARI ile aynı adlardadır; diğer sütunlar çıktıya aynen taşınır.
+# Bellek parça boyuyla sınırlıdır. Her parçadan sonra <çıktı>.ckpt güncellenir;
+# --resume bu noktadan devam eder. Hatalı satırlar atlanmaz, `error` sütununa yazılır.
+# Satır doğrulama ve parça skorlama risk_core.skorla_parca'dadır (paralel işçiler de onu çağırır).
+SONUC_SUTUNLARI = risk_core.KAYIT_SONUC_SUTUNLARI
+SAYISAL = risk_core.KAYIT_SAYISAL
+# Parquet çıktısında sonuç sütunlarının sabit tipleri (tamamı hatalı parçada da aynı şema)
+SONUC_TIPLERI = {k: "string" if k in ("egzersiz_kategori", "model_version", "error") else "float64"
+                 for k in SONUC_SUTUNLARI}
+
+# =========================
+# Okuyucular / yazıcılar
+# =========================
+def _is_parquet(path):
+    return str(path).lower().endswith((".parquet", ".pq")) or Path(path).is_dir() or str(path).endswith(("/", "\\"))
+
+def parcalar_csv(path, chunk, atla):
+    with open(path, newline="", encoding="utf-8") as f:
+        r = csv.DictReader(f)
+        kolonlar = list(r.fieldnames or [])
+        it = itertools.islice(r, atla, None)
+        while True:
+            kayitlar = list(itertools.islice(it, chunk))
+            if not kayitlar:
+                return
+            yield kolonlar, kayitlar
+
+def kolonlari_oku(path):
+    """Girdinin sütun adları (skorlamadan önce şema denetimi için); boş Parquet dizininde []."""
+    if not _is_parquet(path):
+        with open(path, newline="", encoding="utf-8") as f:
+            return next(csv.reader(f), [])
+    import pyarrow.parquet as pq
+    dosyalar = sorted(Path(path).glob("*.parquet")) if Path(path).is_dir() else [path]
+    return pq.read_schema(dosyalar[0]).names if dosyalar else []
+
+def parcalar_parquet(path, chunk, atla):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Parquet için 'pyarrow' gerekli: pip install pyarrow")
+    # Tek dosya ya da (bu aracın yazdığı gibi) part dosyalarından oluşan dizin
+    dosyalar = sorted(Path(path).glob("*.parquet")) if Path(path).is_dir() else [path]
+    gorulen = 0
+    for d in dosyalar:
+        pf = pq.ParquetFile(d)
+        kolonlar = pf.schema_arrow.names
+        if gorulen + pf.metadata.num_rows <= atla:
+            gorulen += pf.metadata.num_rows
+            continue
+        for batch in pf.iter_batches(batch_size=chunk):
+            n = batch.num_rows
+            if gorulen + n > atla:
+                yield kolonlar, batch.to_pylist()[max(0, atla - gorulen):]
+            gorulen += n
+
+class CsvYazici:
+    def __init__(self, path, kolonlar, ofset):
+        yeni = ofset == 0 or not Path(path).exists()
+        self.f = open(path, "w" if yeni else "r+", newline="", encoding="utf-8")
+        if not yeni:
+            self.f.seek(ofset)
+            self.f.truncate()  # son kontrol noktasından sonra yarım kalan yazımı at
+        self.w = csv.DictWriter(self.f, fieldnames=kolonlar, extrasaction="ignore")
+        if yeni:
+            self.w.writeheader()
+
+    def yaz(self, satirlar):
+        self.w.writerows(satirlar)
+        self.f.flush()
+        return self.f.tell()
+
+    def kapat(self):
+        self.f.close()
+
+class ParquetYazici:
+    """
+    Dizin içine parça başına bir part-NNNNN.parquet dosyası. Şema bir kez kurulur:
+    sonuç sütunları SONUC_TIPLERI, girdi sütunları `tipler` (Parquet girdisinin şeması) ya da string.
+    """
+
+    def __init__(self, path, kolonlar, ofset, tipler=None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa, self.pq = pa, pq
+        tipler = tipler or {}
+        self.sema = pa.schema([(k, pa.type_for_alias(SONUC_TIPLERI[k]) if k in SONUC_TIPLERI
+                                else tipler.get(k, pa.string())) for k in kolonlar])
+        self.dir = Path(path)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        for p in self.dir.glob("part-*.parquet"):
+            if int(p.stem.split("-")[1]) >= ofset:
+                p.unlink()
+        self.kolonlar = kolonlar
+        self.n = ofset
+
+    def yaz(self, satirlar):
+        tablo = self.pa.Table.from_pylist([{k: r.get(k) for k in self.kolonlar} for r in satirlar],
+                                          schema=self.sema)
+        tmp = self.dir / f".part-{self.n:05d}.tmp"
+        self.pq.write_table(tablo, tmp)
+        tmp.replace(self.dir / f"part-{self.n:05d}.parquet")
+        self.n += 1
+        return self.n
+
+    def kapat(self):
+        if not any(self.dir.glob("part-*.parquet")):  # boş girdi: yalnızca şemayı taşıyan part
+            self.yaz([])
+
+def parquet_tipleri(path):
+    """Parquet girdisinin sütun tipleri (çıktı şeması için); CSV girdisinde None."""
+    if not _is_parquet(path):
+        return None
+    import pyarrow.parquet as pq
+    dosyalar = sorted(Path(path).glob("*.parquet")) if Path(path).is_dir() else [path]
+    return {f.name: f.type for f in pq.read_schema(dosyalar[0])} if dosyalar else None
+
+# =========================
+# Parça skorlama
+# =========================
+skorla_parca = risk_core.skorla_parca
+
+def _deger(k, v):
+    if k in SAYISAL:
+        if v is None or (isinstance(v, str) and not v.strip()):
+            if k == "egzersiz_dk":
+                return 0.0
+            raise ValueError(f"'{k}' boş")
+        return float(v)
+    return "" if v is None else str(v)
+
+# =========================
+# Kontrol noktası
+# =========================
+def _ckpt_path(cikti):
+    return Path(str(cikti).rstrip("/\\") + ".ckpt")
+
+def ckpt_oku(cikti, girdi):
+    p = _ckpt_path(cikti)
+    if not p.exists():
+        return {"rows": 0, "offset": 0, "errors": 0}
+    ck = json.loads(p.read_text())
+    if ck.get("input") != str(girdi):
+        raise SystemExit(f"{p} başka bir girdiye ait ({ck.get('input')}); silin ya da --resume kullanmayın.")
+    return ck
+
+def ckpt_yaz(cikti, girdi, rows, offset, errors):
+    p = _ckpt_path(cikti)
+    tmp = p.with_suffix(".ckpt.tmp")
+    tmp.write_text(json.dumps({"input": str(girdi), "rows": rows, "offset": offset, "errors": errors}))
+    tmp.replace(p)
+
+def _paralel_akis(havuz, parcalar):
+    """Parçaları süreç havuzunda skorlar; sıra korunur, (kolonlar, kayıtlar, sonuç) üretir."""
+    sirada = collections.deque()
+    def kayit_akisi():
+        for kolonlar, kayitlar in parcalar:
+            sirada.append((kolonlar, kayitlar))
+            yield kayitlar
+    for sonuc in havuz.esle(risk_core.skorla_parca, kayit_akisi()):
+        kolonlar, kayitlar = sirada.popleft()
+        yield kolonlar, kayitlar, sonuc
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="CSV/Parquet kayıtlarını parça parça skorlar (sabit bellek).")
+    ap.add_argument("girdi")
+    ap.add_argument("cikti", help=".csv dosyası ya da Parquet için dizin / .parquet yolu")
+    ap.add_argument("--chunk", type=int, default=10000, help="parça başına satır")
+    ap.add_argument("--format", choices=("csv", "parquet"), help="çıktı biçimi (varsayılan: uzantıdan)")
+    ap.add_argument("--resume", action="store_true", help="<çıktı>.ckpt noktasından devam et")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="süreç sayısı (>1: parçalar cohort_parallel havuzunda paralel skorlanır)")
+    ap.add_argument("--quiet", action="store_true")
+    a = ap.parse_args(argv)
+
+    ck = ckpt_oku(a.cikti, a.girdi) if a.resume else {"rows": 0, "offset": 0, "errors": 0}
+    okuyucu = parcalar_parquet if _is_parquet(a.girdi) else parcalar_csv
+    parquet_cikti = a.format == "parquet" if a.format else _is_parquet(a.cikti)
+    yazici_sinif = ParquetYazici if parquet_cikti else CsvYazici
+
+    # Şema skorlamadan önce denetlenir; çıktı (boş girdide yalnızca başlık) hemen açılır
+    kolonlar = kolonlari_oku(a.girdi)
+    eksik = [k for k in risk_core.KOHORT_SUTUNLARI if k not in kolonlar]
+    if eksik:
+        raise SystemExit(f"Eksik sütun(lar): {', '.join(eksik)}")
+    cikis_kolonlari = list(kolonlar) + [k for k in SONUC_SUTUNLARI if k not in kolonlar]
+    ek = {"tipler": parquet_tipleri(a.girdi)} if parquet_cikti else {}
+
+    rows, errors, offset = ck["rows"], ck["errors"], ck["offset"]
+    yazici = yazici_sinif(a.cikti, cikis_kolonlari, offset, **ek)
+    t0 = time.perf_counter()
+    yeni = 0
+    havuz = None
+    parcalar = okuyucu(a.girdi, a.chunk, rows)
+    if a.workers > 1:
+        import cohort_parallel
+        havuz = cohort_parallel.ParalelHavuz(a.workers, a.chunk)
+        akis = _paralel_akis(havuz, parcalar)
+    else:
+        akis = ((k, kayitlar, skorla_parca(kayitlar)) for k, kayitlar in parcalar)
+    try:
+        for _, kayitlar, (satirlar, n_hata) in akis:
+            offset = yazici.yaz(satirlar)
+            rows += len(kayitlar)
+            yeni += len(kayitlar)
+            errors += n_hata
+            ckpt_yaz(a.cikti, a.girdi, rows, offset, errors)
+            if not a.quiet:
+                sn = time.perf_counter() - t0
+                print(f"{rows} satır ({errors} hatalı) — {yeni / sn:.0f} satır/sn", file=sys.stderr)
+    finally:
+        yazici.kapat()
+        if havuz is not None:
+            havuz.close()
+
+    sn = time.perf_counter() - t0
+    print(json.dumps({"rows": rows, "errors": errors, "new_rows": yeni, "seconds": round(sn, 3),
+                      "rows_per_s": round(yeni / sn, 1) if sn > 0 else None}))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+# Modüller depo kökünde (düz yerleşim)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pytest
+
+@pytest.fixture
+def sahte_chd(monkeypatch):
+    """
+    R'sız, deterministik CHD arka ucu ("sahte"): skaler ve toplu yol aynı formülü kullanır.
+    Dönen sözlükte "hata" bir istisnaya ayarlanırsa her çağrı onu yükseltir.
+    """
+    import chd_backend
+    durum = {"hata": None, "cagri": 0}
+
+    def oran(yas, sex, sbp, bp_tx, total_c, hdl_c, statin, dm, smoking, egfr, bmi):
+        durum["cagri"] += 1
+        if durum["hata"] is not None:
+            raise durum["hata"]
+        f = lambda v: np.asarray(v, dtype=float)
+        z = (-9.0 + 0.08 * f(yas) + 0.01 * (f(sbp) - 120) + 0.004 * (f(total_c) - f(hdl_c))
+             + 0.4 * f(bp_tx) + 0.5 * f(smoking) + 0.6 * f(dm) - 0.2 * f(statin)
+             + 0.3 * (np.asarray(sex) == "male") - 0.005 * (f(egfr) - 90))
+        r = 1.0 / (1.0 + np.exp(-z))
+        return float(r) if np.ndim(r) == 0 else r
+
+    monkeypatch.setitem(chd_backend.BACKENDS, "sahte", oran)
+    monkeypatch.setitem(chd_backend.BATCH_BACKENDS, "sahte", lambda *a, hatalar: np.asarray(oran(*a), dtype=float))
+    monkeypatch.setenv("VIVA10_CHD_BACKEND", "sahte")
+    monkeypatch.setenv("VIVA10_CHD_CACHE_SIZE", "0")
+    monkeypatch.setattr(chd_backend, "_CACHE", None)
+    return durum
@@ -0,0 +1,63 @@
+import os
+import pytest
+
+os.environ.setdefault("VIVA10_STARTUP", "off")  # import sırasında R ısınması yok
+pytest.importorskip("gradio")
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+from starlette.testclient import TestClient
+import app
+import chd_backend
+
+@pytest.fixture
+def istemci(sahte_chd):
+    return TestClient(app.create_server())
+
+def test_tek_kayit(istemci):
+    r = istemci.post("/api/score", json={"yas": 60, "sigara": "var"})
+    assert r.status_code == 200
+    j = r.json()
+    assert j["inputs"]["yas"] == 60 and j["inputs"]["sigara_01"] == 1
+    for k in ("bmi", "egfr", "chd10_taban", "chd10", "kanser10", "chd_grup", "cancer_group_en", "model_version"):
+        assert k in j
+    assert 0 < j["chd10"] <= 100
+
+def test_liste_ve_bos_liste(istemci):
+    r = istemci.post("/api/score", json=[{"yas": 50}, {"yas": 70}])
+    assert r.status_code == 200
+    j = r.json()
+    assert [k["inputs"]["yas"] for k in j] == [50, 70]
+    assert j[0]["chd10_taban"] < j[1]["chd10_taban"]
+    assert istemci.post("/api/score", json=[]).json() == []
+
+def test_tek_kayit_ve_liste_ayni(istemci):
+    tek = istemci.post("/api/score", json={"yas": 64, "sbp": 150}).json()
+    liste = istemci.post("/api/score", json=[{"yas": 64, "sbp": 150}]).json()[0]
+    for k in ("chd10_taban", "chd10", "kanser10"):
+        assert tek[k] == pytest.approx(liste[k])
+
+@pytest.mark.parametrize("govde", [{"yass": 60}, {"cinsiyet": "x"}, {"draws": 100}, [{"yas": 60}, {"egzersiz_seviyesi": "?"}]])
+def test_girdi_hatasi_422(istemci, sahte_chd, govde):
+    r = istemci.post("/api/score", json=govde)
+    assert r.status_code == 422
+    assert "error" in r.json()
+
+def test_draws_parametresi_422(istemci):
+    assert istemci.post("/api/score?draws=100", json={"yas": 60}).status_code == 422
+
+def test_gecersiz_govde_400(istemci):
+    assert istemci.post("/api/score", content=b"{", headers={"content-type": "application/json"}).status_code == 400
+    assert istemci.post("/api/score", json="yas").status_code == 400
+
+@pytest.mark.parametrize("hata, kod", [
+    (chd_backend.ChdBackendError("R hatası: preventr"), 502),
+    (chd_backend.PoolBusyError("yoğun"), 503),
+    (FileNotFoundError("Rscript"), 503),
+    (chd_backend.RWorkerError("zaman aşımı"), 504),
+])
+@pytest.mark.parametrize("govde", [{"yas": 60}, [{"yas": 60}]])
+def test_arka_uc_hatalari(istemci, sahte_chd, hata, kod, govde):
+    sahte_chd["hata"] = hata
+    r = istemci.post("/api/score", json=govde)
+    assert r.status_code == kod
+    assert str(hata) in r.json()["error"]
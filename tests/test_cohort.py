@@ -0,0 +1,63 @@
+import time
+import numpy as np
+import pytest
+import cohort_parallel
+import cohort_store
+import risk_core
+
+def _yavas_kare(x):
+    time.sleep(0.02 * (4 - x % 5))  # baştaki parçalar daha geç biter
+    return x * x
+
+def _ters(x):
+    return 1 / x
+
+def test_paralel_havuz_sirayi_korur(monkeypatch):
+    monkeypatch.setenv("VIVA10_CHD_BACKEND", "python")  # işçi ısınmasında R aranmaz
+    with cohort_parallel.ParalelHavuz(workers=3, retries=0) as havuz:
+        assert list(havuz.esle(_yavas_kare, range(20))) == [x * x for x in range(20)]
+        assert havuz.stats == {"chunks": 20, "retries": 0, "restarts": 0}
+
+def test_paralel_havuz_fn_hatasi_tekrarlanmaz(monkeypatch):
+    monkeypatch.setenv("VIVA10_CHD_BACKEND", "python")
+    with cohort_parallel.ParalelHavuz(workers=2, retries=2) as havuz:
+        with pytest.raises(ZeroDivisionError):
+            list(havuz.esle(_ters, [1, 0, 2]))
+        assert havuz.stats["retries"] == 0
+
+@pytest.fixture
+def kohort(sahte_chd):
+    veri = cohort_parallel.ornek_kohort(500, seed=3)
+    return veri, risk_core.hesapla_toplu(veri)
+
+def test_depo_yaz_ve_sorgu(kohort, tmp_path):
+    veri, sonuc = kohort
+    cohort_store.depo_yaz(tmp_path / "k.v10s", veri, sonuc)
+    with cohort_store.SonucDeposu(tmp_path / "k.v10s") as d:
+        assert len(d) == 500
+        assert np.array_equal(d.sutun("chd10"), sonuc["chd10"])
+        assert np.array_equal(d.sutun("yas"), np.asarray(veri["yas"], dtype="<f4"))
+        chd = np.asarray(sonuc["chd10"])
+        assert d.sec(chd10=(2.0, 8.0)).tolist() == np.flatnonzero((chd >= 2.0) & (chd < 8.0)).tolist()
+        sigara = np.asarray(veri["sigara"]) == "var"
+        grup = risk_core.chd_grup(float(np.median(chd)))
+        beklenen = sigara & (np.array([risk_core.chd_grup(c) for c in chd]) == grup)
+        assert d.sec(sigara=1, chd_grup=grup).tolist() == np.flatnonzero(beklenen).tolist()
+        satir = d.satirlar(d.sec(egzersiz_kod="ağır")[:3], ["egzersiz_kod", "chd10"])
+        assert set(satir["egzersiz_kod"]) == {"ağır"}
+
+def test_parcali_yazim_tek_seferle_ayni(kohort, tmp_path):
+    veri, sonuc = kohort
+    cohort_store.depo_yaz(tmp_path / "tek.v10s", veri, sonuc)
+    yazici = cohort_store.DepoYazici(tmp_path / "parca.v10s")
+    for i in range(0, 500, 200):
+        dilim = slice(i, i + 200)
+        yazici.ekle({k: np.asarray(v)[dilim] for k, v in veri.items()},
+                    {k: (np.asarray(v)[dilim] if k != "model_version" else v) for k, v in sonuc.items()},
+                    np.arange(500)[dilim])
+    yazici.kapat()
+    assert not (tmp_path / "parca.v10s.parts").exists()
+    with cohort_store.SonucDeposu(tmp_path / "tek.v10s") as a, cohort_store.SonucDeposu(tmp_path / "parca.v10s") as b:
+        for ad in a.sutunlar:
+            assert np.array_equal(a.sutun(ad), b.sutun(ad), equal_nan=a.sutun(ad).dtype.kind == "f"), ad
+        assert a.sec(kanser10=(1.0, None)).tolist() == b.sec(kanser10=(1.0, None)).tolist()
@@ -0,0 +1,58 @@
+import json
+import numpy as np
+import pytest
+import model_config
+
+@pytest.fixture
+def gecici_model(monkeypatch, tmp_path):
+    """Etkin modeli testten yalıtır; model_config.json'un düzenlenebilir kopyasını döner."""
+    monkeypatch.setattr(model_config, "_MODEL", None)
+    monkeypatch.setattr(model_config, "_DURUM", {"path": tmp_path / "model.json", "mtime": None,
+                                                 "checked": 0.0, "error": None})
+    cfg = json.loads(model_config.CONFIG_PATH.read_text(encoding="utf-8"))
+    yol = tmp_path / "model.json"
+    yol.write_text(json.dumps(cfg), encoding="utf-8")
+    return yol, cfg
+
+def test_basamak_skaler_ve_dizi_ayni():
+    b = model_config.Basamak([5, 10, 20], ["a", "b", "c", "d"])
+    x = [-1, 4.99, 5, 7, 10, 19.99, 20, 1e9]
+    assert [b.bul(v) for v in x] == ["a", "a", "b", "b", "c", "c", "d", "d"]
+    assert b.bul_v(np.array(x)).tolist() == [b.bul(v) for v in x]
+    assert b.indeks_v(np.array(x)).tolist() == [b.indeks(v) for v in x]
+
+@pytest.mark.parametrize("esikler, degerler", [([10, 5], [1, 2, 3]), ([5, 10], [1, 2])])
+def test_basamak_gecersiz(esikler, degerler):
+    with pytest.raises(ValueError):
+        model_config.Basamak(esikler, degerler)
+
+def test_gercek_dosya_yuklenir():
+    m = model_config.yukle()
+    assert m.version.endswith("-taslak")
+    assert m.chd_grup.bul(0.0) == m.chd_grup.degerler[0]
+
+def test_yeniden_yukle_ve_hatali_dosya(gecici_model):
+    yol, cfg = gecici_model
+    assert model_config.yeniden_yukle(yol).version == cfg["version"]
+
+    yol.write_text(json.dumps({**cfg, "version": "test-2-taslak"}), encoding="utf-8")
+    assert model_config.yeniden_yukle(yol).version == "test-2-taslak"
+    assert model_config.aktif().version == "test-2-taslak"
+
+    yol.write_text("{bozuk", encoding="utf-8")
+    assert model_config.yeniden_yukle(yol).version == "test-2-taslak"  # eski sürüm kalır
+    assert model_config.durum()["reload_error"].startswith("JSONDecodeError")
+
+def test_sabitle_surumu_korur(gecici_model):
+    yol, cfg = gecici_model
+    model_config.yeniden_yukle(yol)
+    with model_config.sabitle() as m:
+        yol.write_text(json.dumps({**cfg, "version": "test-3-taslak"}), encoding="utf-8")
+        model_config.yeniden_yukle(yol)
+        assert model_config.aktif() is m
+    assert model_config.aktif().version == "test-3-taslak"
+
+def test_kaynaksiz_surum_taslak_olmali(gecici_model):
+    _, cfg = gecici_model
+    with pytest.raises(ValueError, match="taslak"):
+        model_config.Model({**cfg, "version": "2024.2"})
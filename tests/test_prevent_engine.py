@@ -0,0 +1,19 @@
+import pytest
+import prevent_engine
+import prevent_parity
+
+# Referans ızgara preventr ile `Rscript prevent_reference_export.R` tarafından kaydedilir;
+# katsayı tablosu yayımlanmış PREVENT tablosundan kaynağıyla girilir. İkisi de depoya işlenir.
+gerekli = [p for p in (prevent_parity.REF_PATH, prevent_engine.COEF_PATH) if not p.exists()]
+pytestmark = pytest.mark.skipif(bool(gerekli), reason=f"eksik: {', '.join(map(str, gerekli))}")
+
+def test_preventr_referans_izgarasi():
+    n, fark = prevent_parity.karsilastir()
+    assert n > 0
+    assert fark.max() <= prevent_parity.TOLERANS, f"max |fark| = {fark.max():.3g}"
+
+def test_skaler_ve_dizi_yolu_ayni():
+    kadin = prevent_engine.chd_10y(55, False, 130, 1, 200, 50, 0, 0, 1, 90)
+    dizi = prevent_engine.chd_10y([55, 55], [False, True], 130, 1, 200, 50, 0, 0, 1, 90)
+    assert kadin == dizi[0]
+    assert 0 < dizi[1] < 1
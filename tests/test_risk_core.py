@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+import cohort_parallel
+import model_config
+import risk_core
+
+SONUC = ("bmi", "egfr", "chd10_taban", "chd10_after_bmi", "chd10_after_alcohol", "chd10", "kanser10")
+
+def _kayitlar(veri):
+    n = len(veri["yas"])
+    return [{k: (v[i].item() if hasattr(v[i], "item") else v[i]) for k, v in veri.items()} for i in range(n)]
+
+def _sinir_kayitlari():
+    """Kırılım noktalarının tam üstü ve kısıtların dışı (skaler/dizi ayrışmasının en olası yeri)."""
+    m = model_config.aktif()
+    temel = dict(risk_core.SKOR_VARSAYILAN)
+    kayitlar = [{**temel, "alkol_hafta": float(e)} for e in m.hr_alkol_chd.esikler]
+    kayitlar += [{**temel, "alkol_hafta": float(e)} for e in m.hr_alkol_kanser.esikler]
+    kayitlar += [{**temel, "yas": y} for y in (29, 30, 79, 85)]
+    kayitlar += [{**temel, "kilo": 200.0, "boy_cm": 150.0}, {**temel, "sbp": 200, "total_chol": 100}]
+    kayitlar += [{**temel, "egzersiz_seviyesi": s, "egzersiz_dk": d}
+                 for s in ("hafif ya da orta", "ağır", "none") for d in (0, 74, 75, 150, 600)]
+    return kayitlar
+
+def test_skaler_ve_toplu_ayni(sahte_chd):
+    kayitlar = _kayitlar(cohort_parallel.ornek_kohort(300, seed=1)) + _sinir_kayitlari()
+    veri = {k: np.array([r[k] for r in kayitlar]) for k in risk_core.KOHORT_SUTUNLARI}
+    toplu = risk_core.hesapla_toplu(veri)
+    assert toplu["model_version"] == model_config.aktif().version
+    for i, r in enumerate(kayitlar):
+        tek = risk_core.skorla(**r)
+        for k in SONUC:
+            assert tek[k] == pytest.approx(toplu[k][i], rel=1e-9, abs=1e-9), (i, k)
+        assert tek["egzersiz_kategori"] == toplu["egzersiz_kategori"][i]
+
+def test_skorla_parca_hatali_satirlar(sahte_chd):
+    iyi = dict(risk_core.SKOR_VARSAYILAN)
+    kayitlar = [iyi, {**iyi, "kilo": ""}, {**iyi, "sbp": "yüksek"}, {**iyi, "cinsiyet": "?"}, iyi]
+    out, n_hata = risk_core.skorla_parca(kayitlar)
+    assert n_hata == 3
+    assert [bool(r["error"]) for r in out] == [False, True, True, True, False]
+    assert out[1]["error"] == "ValueError: 'kilo' boş"
+    assert out[2]["error"] == "ValueError: 'sbp' sayı değil"
+    assert out[0]["chd10"] == pytest.approx(risk_core.skorla(**iyi)["chd10"])
+    assert out[1]["chd10"] is None
+
+def test_skorla_parca_arka_uc_hatasi(sahte_chd):
+    sahte_chd["hata"] = RuntimeError("çöktü")
+    out, n_hata = risk_core.skorla_parca([dict(risk_core.SKOR_VARSAYILAN)] * 2)
+    assert n_hata == 2
+    assert out[0]["error"] == "RuntimeError: çöktü"
@@ -0,0 +1,43 @@
+import json, os, subprocess, sys
+from pathlib import Path
+import pytest
+
+pytest.importorskip("resource")  # RSS ölçümü (yalnızca Unix)
+import bench
+
+KOK = Path(__file__).resolve().parent.parent
+# bench.py --max-import-ms 500 --max-import-rss-mb 80 ile aynı sınırlar
+MAX_IMPORT_S = 0.5
+MAX_RSS_MB = 80
+
+KOD = f"""
+import json, os, resource, sys, time
+t = time.perf_counter()
+import risk_core
+sn = time.perf_counter() - t
+cocuk = f"/proc/{{os.getpid()}}/task/{{os.getpid()}}/children"
+# Linux'ta ru_maxrss exec'ten sonra ebeveynin (pytest) tepe değerini taşır; VmHWM yalnızca bu sürecin
+hwm = [l for l in open("/proc/self/status") if l.startswith("VmHWM:")] if os.path.exists("/proc/self/status") else []
+print(json.dumps({{
+    "s": sn,
+    "rss_mb": int(hwm[0].split()[1]) / 1024 if hwm else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "agir": [m for m in {bench.AGIR_MODULLER!r} if m in sys.modules],
+    "r_havuzu": risk_core.chd_backend._POOL is not None,
+    "alt_surecler": open(cocuk).read().split() if os.path.exists(cocuk) else [],
+}}))
+"""
+
+@pytest.fixture(scope="module")
+def olcum():
+    cikti = subprocess.check_output([sys.executable, "-c", KOD], text=True, cwd=KOK,
+                                    env={**os.environ, "VIVA10_STARTUP": "off"})
+    return json.loads(cikti.strip().splitlines()[-1])
+
+def test_agir_moduller_ve_r_yuklenmez(olcum):
+    assert olcum["agir"] == []
+    assert not olcum["r_havuzu"]
+    assert olcum["alt_surecler"] == []  # Rscript başlatılmadı
+
+def test_import_suresi_ve_rss_sinirda(olcum):
+    assert olcum["s"] < MAX_IMPORT_S, f"import {olcum['s'] * 1e3:.0f} ms"
+    assert olcum["rss_mb"] < MAX_RSS_MB, f"RSS {olcum['rss_mb']:.0f} MB"
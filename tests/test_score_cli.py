@@ -0,0 +1,76 @@
+import csv, json
+import pytest
+import risk_core
+import score_cli
+
+def _csv_yaz(yol, kayitlar):
+    kolonlar = ["id"] + list(risk_core.KOHORT_SUTUNLARI)
+    with open(yol, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=kolonlar)
+        w.writeheader()
+        w.writerows(kayitlar)
+
+def _kayitlar(n):
+    kayitlar = [{"id": i, **risk_core.SKOR_VARSAYILAN, "yas": 40 + i} for i in range(n)]
+    if n > 4:
+        kayitlar[4]["kilo"] = ""  # hatalı satır: işi durdurmaz
+    return kayitlar
+
+def _oku(yol):
+    with open(yol, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+def test_csv_skorlama(sahte_chd, tmp_path):
+    _csv_yaz(tmp_path / "in.csv", _kayitlar(8))
+    score_cli.main([str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), "--chunk", "3", "--quiet"])
+    satirlar = _oku(tmp_path / "out.csv")
+    assert [r["id"] for r in satirlar] == [str(i) for i in range(8)]
+    assert [bool(r["error"]) for r in satirlar].count(True) == 1
+    assert satirlar[4]["error"] == "ValueError: 'kilo' boş"
+    ck = json.loads((tmp_path / "out.csv.ckpt").read_text())
+    assert (ck["rows"], ck["errors"]) == (8, 1)
+
+def test_kesinti_sonrasi_resume(sahte_chd, tmp_path, monkeypatch):
+    _csv_yaz(tmp_path / "in.csv", _kayitlar(8))
+    score_cli.main([str(tmp_path / "in.csv"), str(tmp_path / "tam.csv"), "--chunk", "3", "--quiet"])
+
+    asil, cagri = score_cli.skorla_parca, []
+    def kesilen(kayitlar):
+        cagri.append(1)
+        if len(cagri) == 2:
+            raise KeyboardInterrupt
+        return asil(kayitlar)
+    monkeypatch.setattr(score_cli, "skorla_parca", kesilen)
+    with pytest.raises(KeyboardInterrupt):
+        score_cli.main([str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), "--chunk", "3", "--quiet"])
+    assert json.loads((tmp_path / "out.csv.ckpt").read_text())["rows"] == 3
+    assert len(_oku(tmp_path / "out.csv")) == 3
+
+    monkeypatch.setattr(score_cli, "skorla_parca", asil)
+    score_cli.main([str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), "--chunk", "3", "--quiet", "--resume"])
+    assert (tmp_path / "out.csv").read_text() == (tmp_path / "tam.csv").read_text()
+    ck = json.loads((tmp_path / "out.csv.ckpt").read_text())
+    assert (ck["rows"], ck["errors"]) == (8, 1)
+
+def test_resume_baska_girdi_reddedilir(sahte_chd, tmp_path):
+    _csv_yaz(tmp_path / "a.csv", _kayitlar(2))
+    _csv_yaz(tmp_path / "b.csv", _kayitlar(2))
+    score_cli.main([str(tmp_path / "a.csv"), str(tmp_path / "out.csv"), "--quiet"])
+    with pytest.raises(SystemExit):
+        score_cli.main([str(tmp_path / "b.csv"), str(tmp_path / "out.csv"), "--quiet", "--resume"])
+
+def test_eksik_sutun_skorlamadan_once(sahte_chd, tmp_path):
+    with open(tmp_path / "in.csv", "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(risk_core.KOHORT_SUTUNLARI[1:])
+        w.writerow(["1"] * (len(risk_core.KOHORT_SUTUNLARI) - 1))
+    with pytest.raises(SystemExit, match="cinsiyet"):
+        score_cli.main([str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), "--quiet"])
+    assert sahte_chd["cagri"] == 0
+
+def test_bos_girdi_yalnizca_baslik(sahte_chd, tmp_path):
+    _csv_yaz(tmp_path / "in.csv", [])
+    score_cli.main([str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), "--quiet"])
+    baslik = (tmp_path / "out.csv").read_text(encoding="utf-8").splitlines()
+    assert len(baslik) == 1
+    assert baslik[0].split(",")[-1] == "error"